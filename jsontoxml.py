@@ -1,25 +1,44 @@
 import json
 import xml.etree.ElementTree as ET
 import os
+import re
 import io
-import subprocess
-import argparse
+import heapq
+import itertools
+import contextlib
+import time
 import sys
-import logging
-import copy
+from collections.abc import Mapping
 from dataclasses import dataclass, asdict
 from typing import Optional, List
 
-try:
-    import tkinter as tk
-    from tkinter import ttk, filedialog
-except ModuleNotFoundError:
-    tk = None
-    ttk = None
-    filedialog = None
+# UI and CLI modules (tkinter, curses, argparse, subprocess, logging, ...)
+# are imported where they are used, so conversions from Python and the
+# one-shot CLI never load them. ``tk``, ``ttk``, ``filedialog`` and
+# ``logger`` are resolved on first access through __getattr__.
+_TK_NAMES = ("tk", "ttk", "filedialog")
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
-logger = logging.getLogger("tgxml")
+
+def _load_tk():
+    """Import tkinter into this module's globals; returns ``tk`` (None without tkinter)."""
+    try:
+        import tkinter as tk
+        from tkinter import ttk, filedialog
+    except ModuleNotFoundError:
+        tk = ttk = filedialog = None
+    globals().update(tk=tk, ttk=ttk, filedialog=filedialog)
+    return tk
+
+
+def __getattr__(name):
+    if name in _TK_NAMES:
+        _load_tk()
+        return globals()[name]
+    if name == "logger":
+        import logging
+
+        return logging.getLogger("tgxml")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -46,6 +65,88 @@ class ConversionResult:
     validation_issues: Optional[list] = None
 
 
+class PipelineHooks:
+    """Instrumentation callbacks of a conversion; override the ones you need.
+
+    ``stage_start``/``stage_end`` bracket each stage (parse, validate,
+    compact, merge, anonymize, filter, build, indent, serialize, and scan
+    when streaming) with its wall time and the messages and bytes it
+    handled. ``progress`` reports messages processed so far (and bytes
+    written while serializing) every ``progress_interval`` messages.
+    Functions taking ``hooks=None`` do no extra work per message without
+    hooks.
+    """
+
+    progress_interval = 10_000
+
+    def stage_start(self, stage):
+        pass
+
+    def stage_end(self, stage, seconds, messages=0, nbytes=0):
+        pass
+
+    def progress(self, stage, messages, nbytes=0):
+        pass
+
+
+class HookChain(PipelineHooks):
+    """Forwards every event to several hooks, in order."""
+
+    def __init__(self, hooks):
+        self.hooks = list(hooks)
+        self.progress_interval = min(hook.progress_interval for hook in self.hooks)
+
+    def stage_start(self, stage):
+        for hook in self.hooks:
+            hook.stage_start(stage)
+
+    def stage_end(self, stage, seconds, messages=0, nbytes=0):
+        for hook in self.hooks:
+            hook.stage_end(stage, seconds, messages, nbytes)
+
+    def progress(self, stage, messages, nbytes=0):
+        for hook in self.hooks:
+            hook.progress(stage, messages, nbytes)
+
+
+def chain_hooks(*hooks):
+    """One hooks object for the given ones (``None`` entries skipped), or None."""
+    hooks = [hook for hook in hooks if hook is not None]
+    if not hooks:
+        return None
+    return hooks[0] if len(hooks) == 1 else HookChain(hooks)
+
+
+@contextlib.contextmanager
+def hook_stage(hooks, stage):
+    """Report the block as ``stage`` to ``hooks``; the yielded dict takes counts.
+
+    Set ``messages`` and ``bytes`` on the yielded dict; they are passed to
+    ``stage_end``.
+    """
+    counts = {"messages": 0, "bytes": 0}
+    if hooks is None:
+        yield counts
+        return
+    hooks.stage_start(stage)
+    started = time.perf_counter()
+    try:
+        yield counts
+    finally:
+        hooks.stage_end(stage, time.perf_counter() - started, counts["messages"], counts["bytes"])
+
+
+def iter_with_progress(items, hooks, stage):
+    """Yield ``items``, calling ``hooks.progress`` every ``progress_interval`` items."""
+    interval = hooks.progress_interval
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if count % interval == 0:
+            hooks.progress(stage, count)
+
+
 def validate_telegram_export(data):
     issues = []
     if not isinstance(data, dict):
@@ -55,117 +156,369 @@ def validate_telegram_export(data):
     elif not isinstance(data.get('messages'), list):
         issues.append("Field 'messages' must be an array")
     for i, msg in enumerate(data.get('messages', [])):
-        if not isinstance(msg, dict):
-            issues.append(f"messages[{i}] is not an object")
-            continue
-        if 'type' not in msg:
-            issues.append(f"messages[{i}] missing field 'type'")
-        if 'date' not in msg:
-            issues.append(f"messages[{i}] missing field 'date'")
+        issues.extend(validate_message_item(i, msg))
     return issues
 
 
-def anonymize_messages(messages):
-    user_map = {}
-    counter = 1
+def validate_message_item(index, msg):
+    if not isinstance(msg, dict):
+        return [f"messages[{index}] is not an object"]
+    issues = []
+    if 'type' not in msg:
+        issues.append(f"messages[{index}] missing field 'type'")
+    if 'date' not in msg:
+        issues.append(f"messages[{index}] missing field 'date'")
+    return issues
+
+
+def user_app_dir(kind):
+    """Per-user ``"cache"`` or ``"config"`` directory of the converter for this platform."""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        env, fallback = ("LOCALAPPDATA", "Local") if kind == "cache" else ("APPDATA", "Roaming")
+        base = os.environ.get(env) or os.path.join(home, "AppData", fallback)
+    elif sys.platform == "darwin":
+        base = os.path.join(home, "Library", "Caches" if kind == "cache" else "Application Support")
+    elif kind == "cache":
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+    return os.path.join(base, "tgxml")
+
+
+ANONYMIZE_KEY_FILE = "anonymize.key"
+
+
+def default_anonymize_key():
+    """Key of id pseudonyms when no alias map provides one.
+
+    ``TGXML_ANON_KEY`` if set, else a random key generated on first use and
+    kept (owner-readable only) in the per-user config directory, so
+    pseudonyms are stable on this machine but cannot be recomputed
+    elsewhere. If the key cannot be stored a fresh key is used for the run.
+    """
+    env_key = os.environ.get("TGXML_ANON_KEY")
+    if env_key:
+        return env_key.encode("utf-8")
+    path = os.path.join(user_app_dir("config"), ANONYMIZE_KEY_FILE)
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return bytes.fromhex(f.read().strip())
+    except (OSError, ValueError):
+        pass
+    key = os.urandom(32)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another run created it first; use that one.
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                return bytes.fromhex(f.read().strip())
+        except (OSError, ValueError):
+            return key
+    except OSError:
+        return key
+    with os.fdopen(fd, "w", encoding="ascii") as f:
+        f.write(key.hex())
+    return key
+
+
+class Anonymizer:
+    """Author aliases and id pseudonyms shared by every message of a run.
+
+    Authors become ``user_001``, ``user_002``, ... in order of first
+    appearance. Ids become ``id_<n>`` where ``n`` is a 64-bit keyed blake2b
+    hash, so they are stable across runs with the same key (see
+    default_anonymize_key); each distinct id is hashed once. ``load``/``save``
+    persist aliases and key as an alias map, keeping aliases consistent
+    across incremental exports.
+    """
+
+    def __init__(self, key=None, user_map=None):
+        import hashlib
+
+        self._blake2b = hashlib.blake2b
+        if key is None:
+            key = default_anonymize_key()
+        self.key = key
+        self.user_map = dict(user_map or {})
+        self._pseudonyms = {}
+
+    @classmethod
+    def load(cls, path):
+        """Anonymizer from the alias map at ``path``; a new random key when it does not exist."""
+        if not os.path.exists(path):
+            return cls(key=os.urandom(32))
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(key=bytes.fromhex(data["key"]), user_map=data.get("users", {}))
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key.hex(), "users": self.user_map}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
 
-    def alias(name):
-        nonlocal counter
+    def alias(self, name):
         if not name:
             return name
-        if name not in user_map:
-            user_map[name] = f"user_{counter:03d}"
-            counter += 1
-        return user_map[name]
+        alias = self.user_map.get(name)
+        if alias is None:
+            alias = self.user_map[name] = f"user_{len(self.user_map) + 1:03d}"
+        return alias
+
+    def pseudonym(self, value):
+        value = str(value)
+        pseudonym = self._pseudonyms.get(value)
+        if pseudonym is None:
+            digest = self._blake2b(value.encode("utf-8"), key=self.key, digest_size=8).digest()
+            pseudonym = self._pseudonyms[value] = f"id_{int.from_bytes(digest, 'big')}"
+        return pseudonym
+
+
+def anonymize_messages(messages, anonymizer=None):
+    return list(iter_anonymized_messages(messages, anonymizer))
+
+
+def iter_anonymized_messages(messages, anonymizer=None):
+    """Lazy variant of anonymize_messages; aliases follow first appearance.
+
+    Each message is replaced by a shallow copy with rewritten ``from``,
+    ``actor``, ``from_id`` and ``actor_id``; text, entities and media are
+    shared with the source message, never copied.
+    """
+    anonymizer = anonymizer if anonymizer is not None else Anonymizer()
+    alias = anonymizer.alias
+    pseudonym = anonymizer.pseudonym
 
-    out = []
     for msg in messages:
-        cp = copy.deepcopy(msg)
+        if not isinstance(msg, Mapping):
+            yield msg
+            continue
+        cp = msg.copy()
         cp['from'] = alias(cp.get('from', ''))
         if 'actor' in cp:
             cp['actor'] = alias(cp.get('actor', ''))
-        if 'from_id' in cp and cp.get('from_id'):
-            cp['from_id'] = f"id_{abs(hash(str(cp['from_id']))) % 10_000_000}"
-        if 'actor_id' in cp and cp.get('actor_id'):
-            cp['actor_id'] = f"id_{abs(hash(str(cp['actor_id']))) % 10_000_000}"
-        out.append(cp)
-    return out
+        if cp.get('from_id'):
+            cp['from_id'] = pseudonym(cp['from_id'])
+        if cp.get('actor_id'):
+            cp['actor_id'] = pseudonym(cp['actor_id'])
+        yield cp
 
 def normalize_text_content(text):
     """Normalize Telegram text field (string/list/misc) into plain string."""
+    if isinstance(text, str):
+        # Plain and already normalized text (see normalize_message_text) passes straight through.
+        return text
     if isinstance(text, list):
         return ''.join(
             part.get('text', '') if isinstance(part, dict) else str(part)
             for part in text
         )
-    if isinstance(text, str):
-        return text
     if text is None:
         return ''
     return str(text)
 
 
+def normalize_message_text(message):
+    """Replace a rich-text ``text`` list of ``message`` with its plain string, in place.
+
+    Done once at load, every later normalize_text_content call on the
+    message (filtering, size model, serialization) returns the string as is.
+    The normalized text is the field itself, so a transform that replaces
+    ``text`` can never leave a stale copy behind. Returns ``message``.
+    """
+    if isinstance(message, dict):
+        text = message.get('text')
+        if text is not None and not isinstance(text, str):
+            message['text'] = normalize_text_content(text)
+    return message
+
+
 def extract_message_date(message):
     return str(message.get('date', '')).split('T')[0]
 
 
-def filter_messages(messages, selected_authors=None, start_date='', end_date='',
-                    use_date_range=False, require_text=True, return_stats=False,
-                    include_service=False):
-    """Single filtering pipeline used by counters and export."""
-    selected_authors = selected_authors or set()
-    filtered = []
-    stats = {
-        "total_items": len(messages),
+_PARTIAL_DATE = re.compile(r'(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?')
+
+
+def normalize_date_bound(value, is_end=False):
+    """Expand a ``YYYY`` / ``YYYY-MM`` / ``YYYY-MM-DD`` bound to a full day.
+
+    Start bounds become the first day of the period and end bounds the last,
+    so ``--end-date 2024-12`` keeps all of December. Values that are not
+    such dates are returned stripped but otherwise unchanged.
+    """
+    value = (value or '').strip()
+    match = _PARTIAL_DATE.fullmatch(value)
+    if not match:
+        return value
+    year, month, day = match.groups()
+    if day is not None:
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    if month is None:
+        return f"{year}-12-31" if is_end else f"{year}-01-01"
+    if not 1 <= int(month) <= 12:
+        return value
+    if is_end:
+        import calendar
+
+        last_day = calendar.monthrange(int(year), int(month))[1]
+    else:
+        last_day = 1
+    return f"{year}-{int(month):02d}-{last_day:02d}"
+
+
+def new_filter_stats():
+    return {
+        "total_items": 0,
         "excluded_non_message": 0,
         "excluded_author": 0,
         "excluded_empty_text": 0,
         "excluded_date": 0,
         "excluded_service": 0,
+        "excluded_duplicate": 0,
         "included": 0,
     }
 
-    for msg in messages:
-        if not isinstance(msg, dict):
-            stats["excluded_non_message"] += 1
-            continue
 
-        msg_type = msg.get('type')
-        if msg_type != 'message':
-            if include_service and msg_type == 'service':
-                pass
-            else:
-                if msg_type == 'service':
-                    stats["excluded_service"] += 1
-                else:
-                    stats["excluded_non_message"] += 1
-                continue
+def filter_messages(messages, selected_authors=None, start_date='', end_date='',
+                    use_date_range=False, require_text=True, return_stats=False,
+                    include_service=False, hooks=None):
+    """Single filtering pipeline used by counters and export."""
+    stats = new_filter_stats()
+    with hook_stage(hooks, "filter") as counts:
+        if hooks is not None:
+            messages = iter_with_progress(messages, hooks, "filter")
+        filtered = list(iter_filter_messages(
+            messages,
+            selected_authors=selected_authors,
+            start_date=start_date,
+            end_date=end_date,
+            use_date_range=use_date_range,
+            require_text=require_text,
+            include_service=include_service,
+            stats=stats,
+        ))
+        counts["messages"] = stats["total_items"]
 
-        author = msg.get('from', '')
-        if selected_authors and author and author not in selected_authors:
-            stats["excluded_author"] += 1
-            continue
+    if return_stats:
+        return filtered, stats
+    return filtered
 
-        text = normalize_text_content(msg.get('text', ''))
-        if require_text and msg_type == 'message' and not text.strip():
-            stats["excluded_empty_text"] += 1
-            continue
 
-        if use_date_range:
-            date_str = extract_message_date(msg)
-            if start_date and date_str < start_date:
-                stats["excluded_date"] += 1
-                continue
-            if end_date and date_str > end_date:
-                stats["excluded_date"] += 1
-                continue
+def iter_filter_messages(messages, selected_authors=None, start_date='', end_date='',
+                         use_date_range=False, require_text=True, include_service=False,
+                         stats=None):
+    """Lazy form of filter_messages; counters are accumulated into ``stats``."""
+    selected_authors = selected_authors or set()
+    start_date = normalize_date_bound(start_date)
+    end_date = normalize_date_bound(end_date, is_end=True)
+    if stats is None:
+        stats = new_filter_stats()
 
-        filtered.append(msg)
-        stats["included"] += 1
+    for msg in messages:
+        stats["total_items"] += 1
+        verdict = classify_message(
+            msg, selected_authors, start_date, end_date, use_date_range, require_text, include_service
+        )
+        stats[verdict] += 1
+        if verdict == "included":
+            yield msg
 
-    if return_stats:
-        return filtered, stats
-    return filtered
+
+def filter_message_positions(messages, selected_authors=None, start_date='', end_date='',
+                             use_date_range=False, require_text=True, include_service=False,
+                             stats=None):
+    """Like filter_messages, but return indexes of the kept messages."""
+    selected_authors = selected_authors or set()
+    start_date = normalize_date_bound(start_date)
+    end_date = normalize_date_bound(end_date, is_end=True)
+    if stats is None:
+        stats = new_filter_stats()
+
+    positions = []
+    for pos, msg in enumerate(messages):
+        verdict = classify_message(
+            msg, selected_authors, start_date, end_date, use_date_range, require_text, include_service
+        )
+        stats[verdict] += 1
+        if verdict == "included":
+            positions.append(pos)
+    stats["total_items"] += len(messages)
+    return positions
+
+
+def classify_message(msg, selected_authors, start_date, end_date, use_date_range,
+                     require_text, include_service):
+    """Return the filter_stats key a message is counted under ("included" if kept).
+
+    Date bounds are compared as strings and should already be normalized
+    with normalize_date_bound.
+    """
+    if not isinstance(msg, Mapping):
+        return "excluded_non_message"
+
+    msg_type = msg.get('type')
+    if msg_type != 'message':
+        if not (include_service and msg_type == 'service'):
+            return "excluded_service" if msg_type == 'service' else "excluded_non_message"
+
+    author = msg.get('from', '')
+    if selected_authors and author and author not in selected_authors:
+        return "excluded_author"
+
+    if require_text and msg_type == 'message' and not normalize_text_content(msg.get('text', '')).strip():
+        return "excluded_empty_text"
+
+    if use_date_range:
+        date_str = extract_message_date(msg)
+        if start_date and date_str < start_date:
+            return "excluded_date"
+        if end_date and date_str > end_date:
+            return "excluded_date"
+
+    return "included"
+
+
+MEDIA_META_KEYS = (
+    "photo", "photo_file_size", "file", "file_name", "file_size", "mime_type",
+    "media_type", "width", "height", "duration_seconds", "thumbnail"
+)
+
+# Message fields read by filtering, anonymization and serialization regardless of options.
+BASE_MESSAGE_FIELDS = (
+    "id", "type", "date", "from", "from_id", "actor", "actor_id", "action",
+    "text", "reply_to_message_id",
+)
+
+
+def required_message_fields(include_reactions=True, include_media_meta=False,
+                            include_entities=False):
+    """Message fields a conversion with these options reads; loaders drop the rest."""
+    fields = set(BASE_MESSAGE_FIELDS)
+    if include_reactions:
+        fields.add("reactions")
+    if include_media_meta:
+        fields.update(MEDIA_META_KEYS)
+    if include_entities:
+        fields.add("text_entities")
+    return frozenset(fields)
+
+
+def project_message(message, fields):
+    """Copy of ``message`` keeping only ``fields``; non-dict items are returned as is.
+
+    Keys are taken from ``fields``, so all projected messages share one
+    string per key instead of each holding freshly decoded copies.
+    """
+    if not isinstance(message, dict):
+        return message
+    return {key: message[key] for key in fields if key in message}
 
 
 def build_message_element(root, message, include_reactions=True,
@@ -198,11 +551,7 @@ def build_message_element(root, message, include_reactions=True,
             reaction_element.set('count', str(reaction.get('count', 0)))
 
     if include_media_meta:
-        media_keys = [
-            "photo", "photo_file_size", "file", "file_name", "file_size", "mime_type",
-            "media_type", "width", "height", "duration_seconds", "thumbnail"
-        ]
-        media_payload = {k: message.get(k) for k in media_keys if k in message}
+        media_payload = {k: message.get(k) for k in MEDIA_META_KEYS if k in message}
         if media_payload:
             media_element = ET.SubElement(msg_element, "media")
             for key, value in media_payload.items():
@@ -221,6 +570,132 @@ def build_message_element(root, message, include_reactions=True,
     return msg_element
 
 
+# ElementTree's own escapers keep serialize_message_xml byte-identical to
+# tree.write() on every Python version (attribute escaping differs across them).
+_escape_attrib = ET._escape_attrib
+_escape_cdata = ET._escape_cdata
+
+# Indentation produced by indent_xml for children of <message> and of
+# <reactions>/<entities>; the last child keeps its sibling indentation.
+_CHILD_INDENT = "\n    "
+_GRANDCHILD_INDENT = "\n      "
+
+
+def serialize_message_parts(message, include_reactions=True, include_media_meta=False,
+                            include_entities=False):
+    """Return the XML pieces of one message without indentation.
+
+    Result is ``(start_tag, text, reactions, media, entities)``: ``reactions``
+    and ``entities`` are lists of child elements and ``media`` is an element,
+    each None when that element is not emitted.
+    """
+    msg_type = message.get('type', 'message')
+    parts = [
+        '<message kind="', _escape_attrib(msg_type),
+        '" id="', _escape_attrib(str(message.get('id', ''))),
+        '" date="', _escape_attrib(message.get('date', '')),
+        '" sender="', _escape_attrib(message.get('from', '')), '"',
+    ]
+    if msg_type == 'service':
+        if message.get('action'):
+            parts += [' action="', _escape_attrib(str(message.get('action'))), '"']
+        if message.get('actor'):
+            parts += [' actor="', _escape_attrib(str(message.get('actor'))), '"']
+    reply_to = message.get('reply_to_message_id')
+    if reply_to:
+        parts += [' reply_to="', _escape_attrib(str(reply_to)), '"']
+    parts.append('>')
+    start_tag = ''.join(parts)
+
+    text = normalize_text_content(message.get('text', '')).strip()
+    text_xml = f'<text>{_escape_cdata(text)}</text>' if text else '<text />'
+
+    reactions = None
+    if include_reactions and 'reactions' in message:
+        reactions = [
+            f'<reaction emoji="{_escape_attrib(reaction.get("emoji", ""))}" '
+            f'count="{_escape_attrib(str(reaction.get("count", 0)))}" />'
+            for reaction in message.get('reactions', [])
+        ]
+
+    media = None
+    if include_media_meta:
+        media_attrs = [
+            f' {key}="{_escape_attrib(str(message.get(key)))}"'
+            for key in MEDIA_META_KEYS if key in message
+        ]
+        if media_attrs:
+            media = '<media' + ''.join(media_attrs) + ' />'
+
+    entities = None
+    if include_entities and isinstance(message.get('text_entities'), list):
+        entities = []
+        for entity in message.get('text_entities', []):
+            if not isinstance(entity, dict):
+                continue
+            entity_xml = f'<entity type="{_escape_attrib(str(entity.get("type", "")))}"'
+            if "text" in entity:
+                entity_xml += f' text="{_escape_attrib(str(entity.get("text", "")))}"'
+            entities.append(entity_xml + ' />')
+
+    return start_tag, text_xml, reactions, media, entities
+
+
+def wrap_child_elements(tag, children, separator=''):
+    """Wrap serialized children in ``tag``, matching ElementTree's empty-element form."""
+    if not children:
+        return f'<{tag} />'
+    return f'<{tag}>{separator}{separator.join(children)}{separator}</{tag}>'
+
+
+def serialize_message_xml(message, include_reactions=True, include_media_meta=False,
+                          include_entities=False, human_readable=True):
+    """Serialize one message exactly as build_message_element + indent_xml + write would.
+
+    The returned text includes the element's trailing indentation, so
+    concatenating messages between the <messages> tags yields the document.
+    """
+    start_tag, text_xml, reactions, media, entities = serialize_message_parts(
+        message,
+        include_reactions=include_reactions,
+        include_media_meta=include_media_meta,
+        include_entities=include_entities,
+    )
+    child_sep = _CHILD_INDENT if human_readable else ''
+    inner_sep = _GRANDCHILD_INDENT if human_readable else ''
+
+    parts = [start_tag, child_sep, text_xml, child_sep]
+    if reactions is not None:
+        parts += [wrap_child_elements('reactions', reactions, inner_sep), child_sep]
+    if media is not None:
+        parts += [media, child_sep]
+    if entities is not None:
+        parts += [wrap_child_elements('entities', entities, inner_sep), child_sep]
+    parts.append('</message>\n  ' if human_readable else '</message>')
+    return ''.join(parts)
+
+
+def iter_xml_fragments(messages, include_reactions=True, human_readable=True,
+                       include_media_meta=False, include_entities=False):
+    """Yield the <messages> document (without XML declaration) piece by piece."""
+    started = False
+    for message in messages:
+        if not started:
+            started = True
+            yield "<messages>\n  " if human_readable else "<messages>"
+        yield serialize_message_xml(
+            message,
+            include_reactions=include_reactions,
+            include_media_meta=include_media_meta,
+            include_entities=include_entities,
+            human_readable=human_readable,
+        )
+    if not started:
+        yield "<messages />"
+    else:
+        yield "</messages>\n" if human_readable else "</messages>"
+
+
 def indent_xml(elem, level=0):
     i = "\n" + level * "  "
     if len(elem):
@@ -236,28 +711,364 @@ def indent_xml(elem, level=0):
         elem.tail = i
 
 
-def load_json_file(file_path):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return json.load(file)
+def load_json_file(file_path, fields=None):
+    """Parse an export; with ``fields``, messages keep only those fields.
+
+    Projected loads decode messages one at a time and drop unused fields
+    right away, so unused subtrees never accumulate in memory.
+    """
+    if fields is None:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    try:
+        with TelegramExportStream(file_path, fields=fields) as stream:
+            messages = list(stream.iter_messages()) if stream.state == 'messages' else None
+            data = dict(stream.header)
+    except ValueError:
+        # Not an object at the root, or malformed: let json report it.
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data, dict) and isinstance(data.get('messages'), list):
+            data['messages'] = [project_message(msg, fields) for msg in data['messages']]
+        return data
+    if messages is not None:
+        data['messages'] = messages
+    return data
+
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class TelegramExportStream:
+    """Incremental reader for a Telegram export JSON file.
+
+    Top-level fields (``name``, ``type``, ``id``, ...) are collected into
+    ``header`` while scanning; ``iter_messages`` decodes the ``messages``
+    array one element at a time, so only a single message is held in memory.
+    Fields placed after ``messages`` become available once iteration ends.
+    With ``fields``, each message is projected to those fields as soon as it
+    is decoded.
+    """
+
+    def __init__(self, file_path, chunk_size=1 << 20, fields=None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.fields = fields
+        self.header = {}
+        self._file = open(file_path, 'r', encoding='utf-8')
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self.state = 'header'
+        self._read_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def __iter__(self):
+        return self.iter_messages()
+
+    def _fill(self, min_size=0):
+        if self._eof:
+            return False
+        chunk = self._file.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > self.chunk_size:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next significant character."""
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"{self.file_path}: expected one of {chars!r} at offset {self._pos}, got {char!r}"
+            )
+        self._pos += 1
+        return char
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Value straddles the buffer end; grow geometrically so huge
+                # values are not re-parsed once per chunk.
+                if not self._fill(len(self._buf) - self._pos):
+                    raise
+                continue
+            # A number cut at the buffer end still decodes ("12" of "125"),
+            # so only accept values followed by a delimiter.
+            if (end == len(self._buf) or self._buf[end] not in ' \t\n\r,:]}') and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _read_header(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            self.state = 'done'
+            return
+        self._read_fields()
+
+    def _read_fields(self):
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key == 'messages' and self._peek() == '[':
+                self._pos += 1
+                self.state = 'messages'
+                return
+            self.header[key] = self._decode_value()
+            if self._expect(',}') == '}':
+                self.state = 'done'
+                return
+
+    def iter_messages(self):
+        if self.state != 'messages':
+            return
+        self.state = 'consumed'
+        fields = self.fields
+        if self._peek() == ']':
+            self._pos += 1
+        else:
+            while True:
+                if fields is None:
+                    yield self._decode_value()
+                else:
+                    yield project_message(self._decode_value(), fields)
+                if self._expect(',]') == ']':
+                    break
+        if self._expect(',}') == ',':
+            self._read_fields()
+        self.state = 'done'
+
+
+def iter_export_messages(file_path, header=None, validation_issues=None, fields=None):
+    """Yield messages from an export one by one.
+
+    ``header`` (a dict) receives top-level fields; ``validation_issues`` (a
+    list) receives the same issues validate_telegram_export would report.
+    ``fields`` projects messages as in load_json_file.
+    """
+    with TelegramExportStream(file_path, fields=fields) as stream:
+        if header is not None:
+            header.update(stream.header)
+        if validation_issues is not None and stream.state == 'done':
+            if 'messages' not in stream.header:
+                validation_issues.append("Missing required field: messages")
+            else:
+                validation_issues.append("Field 'messages' must be an array")
+        for i, msg in enumerate(stream.iter_messages()):
+            if validation_issues is not None:
+                validation_issues.extend(validate_message_item(i, msg))
+            yield msg
+        if header is not None:
+            header.update(stream.header)
+
+
+def message_sort_key(message):
+    """``(date, id)`` ordering key of merged sources; non-messages sort first."""
+    if not isinstance(message, Mapping):
+        return ('', -1)
+    msg_id = message.get('id')
+    return (str(message.get('date', '')), msg_id if isinstance(msg_id, int) else -1)
+
+
+def messages_in_date_order(messages):
+    """Whether ``messages`` never goes back in date, as Telegram writes exports."""
+    dates = (message_sort_key(message)[0] for message in messages)
+    previous = ''
+    for date in dates:
+        if date < previous:
+            return False
+        previous = date
+    return True
+
+
+class SourceOrderError(ValueError):
+    """Raised when a source read as a stream turns out not to be in date order.
+
+    By then the merge had already forgotten the ids of earlier dates, so
+    duplicates of them could not be recognized; merge again with
+    ``ordered=False``.
+    """
+
+
+def _track_date_order(stream, disorder):
+    """Pass ``(chat_id, message)`` pairs through; append to ``disorder`` if dates go back.
+
+    Only messages with an id count, as only they are checked for duplicates.
+    """
+    previous = ''
+    for pair in stream:
+        message = pair[1]
+        if isinstance(message, Mapping) and message.get('id') is not None:
+            date = str(message.get('date', ''))
+            if date < previous and not disorder:
+                disorder.append(True)
+            previous = date
+        yield pair
+
+
+def merge_message_streams(streams, stats=None, ordered=None):
+    """Merge sources into one stream ordered by ``(date, id)``, dropping duplicates.
+
+    ``streams`` holds one iterable of ``(chat_id, message)`` pairs per
+    source. The merge pulls one message per source at a time, so memory
+    grows with the number of sources, not messages. A message whose
+    ``(chat_id, id)`` was already seen with the same ``date``, in another
+    source or earlier in the same one, is a duplicate and is dropped;
+    dropped messages count as ``total_items`` and ``excluded_duplicate``
+    in ``stats``.
+
+    While every source is in date order only the current date's keys are
+    kept, and all duplicates are found. ``ordered=False`` (a source known
+    to go back in date) keeps every key instead. With ``ordered=None``
+    order is checked as messages are read: at the first step back every
+    key is kept from then on if none had been dropped yet, otherwise
+    SourceOrderError is raised, since duplicates of dates the merge had
+    left could be missed. Pass ``ordered`` from messages_in_date_order
+    when the sources are lists.
+    """
+    disorder = []
+    if ordered is None:
+        streams = [_track_date_order(stream, disorder) for stream in streams]
+    elif not ordered:
+        disorder.append(True)
+    if len(streams) == 1:
+        merged = streams[0]
+    else:
+        merged = heapq.merge(*streams, key=lambda pair: message_sort_key(pair[1]))
+
+    current_date = None
+    seen = {}
+    dropped_keys = False
+    for chat_id, message in merged:
+        if disorder and dropped_keys:
+            raise SourceOrderError("Source messages are not in date order; merge them again with ordered=False")
+        msg_id = message.get('id') if isinstance(message, Mapping) else None
+        if msg_id is not None:
+            date = str(message.get('date', ''))
+            if date != current_date:
+                if not disorder and seen:
+                    seen.clear()
+                    dropped_keys = True
+                current_date = date
+            keys = seen.get(date)
+            if keys is None:
+                keys = seen[date] = set()
+            key = (chat_id, msg_id)
+            if key in keys:
+                if stats is not None:
+                    stats['total_items'] += 1
+                    stats['excluded_duplicate'] += 1
+                continue
+            keys.add(key)
+        yield message
+
+
+def iter_streamed_messages(source_paths, selected_authors=None, start_date='', end_date='',
+                           use_date_range=False, include_service=False, anonymizer=None,
+                           fields=None, stats=None, headers=None, validation_issues=None,
+                           ordered=None):
+    """Read, merge, anonymize and filter sources message by message.
+
+    Memory stays bounded by one message per source. ``stats`` receives the
+    filter and duplicate counters, ``headers`` (a list) one dict of
+    top-level fields per source and ``validation_issues`` the issues of
+    every source, prefixed with its path, once the sources are exhausted.
+
+    Duplicates are keyed by the export's top-level ``id`` as in the
+    in-memory path. An export that only lists ``id`` after ``messages``
+    is keyed by its path instead, since the id is not known while its
+    messages are merged; its messages are then deduplicated only against
+    each other.
+
+    ``ordered`` is passed to merge_message_streams: with the default,
+    iterating raises SourceOrderError if a source goes back in date after
+    ids were forgotten; ``ordered=False`` keeps every id instead.
+    """
+    source_headers = [{} for _ in source_paths]
+    source_issues = [[] if validation_issues is not None else None for _ in source_paths]
+    if headers is not None:
+        headers.extend(source_headers)
+
+    def _read_source(src, header, issues):
+        chat_id = None
+        for message in iter_export_messages(src, header=header, validation_issues=issues, fields=fields):
+            if chat_id is None:
+                chat_id = header.get('id', ('path', os.path.abspath(src)))
+            yield chat_id, message
+
+    def _merged():
+        streams = [
+            _read_source(src, header, issues)
+            for src, header, issues in zip(source_paths, source_headers, source_issues)
+        ]
+        yield from merge_message_streams(streams, stats=stats, ordered=ordered)
+        if validation_issues is not None:
+            for src, issues in zip(source_paths, source_issues):
+                validation_issues.extend([f"{src}: {x}" for x in issues])
+
+    # Normalize rich text once; filtering and serialization then share it.
+    messages = map(normalize_message_text, _merged())
+    if anonymizer is not None:
+        messages = iter_anonymized_messages(messages, anonymizer)
+    return iter_filter_messages(
+        messages,
+        selected_authors=selected_authors,
+        start_date=start_date,
+        end_date=end_date,
+        use_date_range=use_date_range,
+        require_text=True,
+        include_service=include_service,
+        stats=stats,
+    )
 
 
 def get_available_authors(messages):
     return sorted({
         msg.get('from', '')
         for msg in messages
-        if isinstance(msg, dict) and msg.get('type') == 'message' and msg.get('from')
+        if isinstance(msg, Mapping) and msg.get('type') == 'message' and msg.get('from')
     })
 
 
 def get_date_range_from_messages(messages):
-    dates = sorted([extract_message_date(msg) for msg in messages if extract_message_date(msg)])
+    dates = [date_str for date_str in map(extract_message_date, messages) if date_str]
     if not dates:
         return '', ''
-    return dates[0], dates[-1]
+    return min(dates), max(dates)
 
 
 def get_message_dates_range_label(messages):
     start_date, end_date = get_date_range_from_messages(messages)
+    return format_dates_range_label(start_date, end_date)
+
+
+def format_dates_range_label(start_date, end_date):
     if not start_date:
         return ""
     if start_date == end_date:
@@ -272,76 +1083,288 @@ def sanitize_path_component(value):
     return text or "chat"
 
 
-def build_export_label(chat_name, messages):
+def build_export_label(chat_name, messages=None, date_range=None):
+    """Build ``chat_(start_to_end)`` label from messages or a known (start, end) range."""
     safe_chat_name = sanitize_path_component(chat_name)
-    date_range = get_message_dates_range_label(messages)
+    if date_range is not None:
+        date_range = format_dates_range_label(*date_range)
+    else:
+        date_range = get_message_dates_range_label(messages)
     if date_range:
         return f"{safe_chat_name}_{date_range}"
     return safe_chat_name
 
 
 def build_xml_tree(messages, include_reactions=True, human_readable=True,
-                   include_media_meta=False, include_entities=False):
+                   include_media_meta=False, include_entities=False, hooks=None):
     root = ET.Element("messages")
-    for message in messages:
-        build_message_element(
-            root,
-            message,
-            include_reactions=include_reactions,
-            include_media_meta=include_media_meta,
-            include_entities=include_entities,
-        )
+    with hook_stage(hooks, "build") as counts:
+        if hooks is not None:
+            messages = iter_with_progress(messages, hooks, "build")
+        for message in messages:
+            build_message_element(
+                root,
+                message,
+                include_reactions=include_reactions,
+                include_media_meta=include_media_meta,
+                include_entities=include_entities,
+            )
+        counts["messages"] = len(root)
     if human_readable:
-        indent_xml(root)
+        with hook_stage(hooks, "indent") as counts:
+            indent_xml(root)
+            counts["messages"] = len(root)
     return ET.ElementTree(root)
 
 
+class ConversionCancelled(Exception):
+    """Raised when a conversion is stopped through its cancel event."""
+
+
+def write_xml_stream(messages, output_path, include_reactions=True, human_readable=True,
+                     include_media_meta=False, include_entities=False, workers=1,
+                     progress=None, cancel_event=None, timings=None, hooks=None):
+    """Serialize messages to output_path one at a time; returns the message count.
+
+    Produces the same bytes as build_xml_tree(...).write(...) without
+    building an element tree. ``workers`` other than 1 serializes chunks in
+    that many processes (0 = one per CPU) with identical output.
+
+    ``progress(count)`` is called after each message is taken for writing.
+    Setting ``cancel_event`` (anything with ``is_set()``) stops the export
+    with ConversionCancelled. If writing fails or is cancelled, the partial
+    file is removed.
+
+    ``timings`` (a dict), when given, receives ``write_seconds`` and
+    ``write_cpu_seconds`` spent writing fragments to the file, as opposed
+    to producing them. ``hooks`` get a ``serialize`` stage with progress
+    events carrying the bytes written so far.
+    """
+    count = 0
+
+    def _counted(items):
+        nonlocal count
+        for item in items:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ConversionCancelled(f"Cancelled after {count} messages")
+            count += 1
+            if progress is not None:
+                progress(count)
+            yield item
+
+    serialize = iter_xml_fragments
+    extra = {}
+    if workers != 1:
+        from src.tgxml.parallel import iter_xml_fragments_parallel
+
+        serialize = iter_xml_fragments_parallel
+        extra = {'workers': workers}
+    fragments = serialize(
+        _counted(messages),
+        include_reactions=include_reactions,
+        human_readable=human_readable,
+        include_media_meta=include_media_meta,
+        include_entities=include_entities,
+        **extra,
+    )
+    with hook_stage(hooks, "serialize") as counts:
+        out = open(output_path, 'w', encoding='utf-8', errors='xmlcharrefreplace')
+        try:
+            with out:
+                out.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                if timings is None and hooks is None:
+                    for fragment in fragments:
+                        out.write(fragment)
+                else:
+                    interval = hooks.progress_interval if hooks is not None else 0
+                    next_progress = interval
+                    wall = cpu = 0.0
+                    for fragment in fragments:
+                        started = time.perf_counter(), time.process_time()
+                        out.write(fragment)
+                        wall += time.perf_counter() - started[0]
+                        cpu += time.process_time() - started[1]
+                        if interval and count >= next_progress:
+                            hooks.progress("serialize", count, out.tell())
+                            next_progress += interval
+                    if timings is not None:
+                        timings['write_seconds'] = wall
+                        timings['write_cpu_seconds'] = cpu
+        except BaseException:
+            fragments.close()
+            os.remove(output_path)
+            raise
+        counts["messages"] = count
+        counts["bytes"] = os.path.getsize(output_path)
+    return count
+
+
 def convert_json_to_xml_file(source_path, output_path, selected_authors=None,
                              start_date='', end_date='', use_date_range=False,
                              include_reactions=True, human_readable=True,
                              include_service=False, include_media_meta=False,
                              include_entities=False, anonymize=False,
-                             validate_input=False):
+                             validate_input=False, use_cache=True, workers=1,
+                             alias_map=None, hooks=None, load_workers=1):
+    """Convert one or more exports to ``output_path``; returns counts and stats.
+
+    ``workers`` processes serialize the XML and ``load_workers`` processes
+    parse the sources; both default to in-process work, which is fastest
+    unless sources are large and several. ``hooks`` (a PipelineHooks) receive start/end events of every stage and
+    progress events while filtering and writing; with hooks, validation is
+    reported as its own stage.
+    """
     source_paths = source_path if isinstance(source_path, list) else [source_path]
-    merged_messages = []
-    validation_issues = []
-
-    for path in source_paths:
-        data = load_json_file(path)
-        if validate_input:
-            validation_issues.extend([f"{path}: {issue}" for issue in validate_telegram_export(data)])
-        merged_messages.extend(data.get('messages', []))
-
-    if anonymize:
-        merged_messages = anonymize_messages(merged_messages)
-
-    messages, filter_stats = filter_messages(
-        merged_messages,
-        selected_authors=selected_authors or set(),
+    prepared = prepare_messages(
+        source_paths,
+        selected_authors=selected_authors,
         start_date=start_date,
         end_date=end_date,
         use_date_range=use_date_range,
-        require_text=True,
-        return_stats=True,
+        include_reactions=include_reactions,
         include_service=include_service,
+        include_media_meta=include_media_meta,
+        include_entities=include_entities,
+        anonymize=anonymize,
+        validate_input=validate_input,
+        use_cache=use_cache,
+        load_workers=load_workers,
+        alias_map=alias_map,
+        hooks=hooks,
     )
-    tree = build_xml_tree(
+    messages = prepared['messages']
+    write_xml_stream(
         messages,
+        output_path,
         include_reactions=include_reactions,
         human_readable=human_readable,
         include_media_meta=include_media_meta,
         include_entities=include_entities,
+        workers=workers,
+        hooks=hooks,
     )
-    tree.write(output_path, encoding='utf-8', xml_declaration=True)
+    if alias_map and prepared['anonymizer'] is not None:
+        prepared['anonymizer'].save(alias_map)
     return {
         'messages': len(messages),
         'output_path': output_path,
+        'filter_stats': prepared['filter_stats'],
+        'validation_issues': prepared['validation_issues'],
+    }
+
+
+def prepare_messages(source_paths, selected_authors=None, start_date='', end_date='',
+                     use_date_range=False, include_reactions=True, include_service=False,
+                     include_media_meta=False, include_entities=False, anonymize=False,
+                     validate_input=False, use_cache=True, load_workers=1, alias_map=None,
+                     anonymizer=None, session=None, hooks=None):
+    """Load, merge, anonymize and filter sources: the in-memory conversion pipeline.
+
+    Sources come from ``session`` (a SourceSession) when given, else are
+    parsed ``load_workers`` at a time through the parsed-source cache (unless
+    ``use_cache`` is false), keeping only the fields the options need as
+    compact MessageRecords. With ``anonymize``, ``anonymizer`` is used
+    when given, else one is created from ``alias_map``. ``hooks`` receive
+    the parse, validate, compact, merge, anonymize and filter stages; with
+    hooks or a session, validation runs as its own stage.
+
+    Returns a dict with the filtered ``messages``, ``filter_stats``,
+    ``validation_issues``, the ``anonymizer`` used and the first source's
+    ``chat_name``.
+    """
+    from src.tgxml.parallel import load_sources
+    from src.tgxml.records import compact_messages
+
+    streams = []
+    validation_issues = []
+    chat_name = "chat"
+    fields = required_message_fields(
+        include_reactions=include_reactions,
+        include_media_meta=include_media_meta,
+        include_entities=include_entities,
+    )
+    validate_separately = validate_input and (session is not None or hooks is not None)
+
+    with hook_stage(hooks, "parse") as counts:
+        if session is not None:
+            loaded = [(data, []) for data in map(session.load, source_paths)]
+        else:
+            loaded = load_sources(source_paths, load_workers, use_cache=use_cache, fields=fields,
+                                  validate=validate_input and not validate_separately)
+        counts["messages"] = sum(len(data['messages']) for data, _ in loaded
+                                 if isinstance(data.get('messages'), list))
+        counts["bytes"] = sum(map(os.path.getsize, source_paths))
+    if validate_separately:
+        with hook_stage(hooks, "validate"):
+            loaded = [(data, validate_telegram_export(data)) for data, _ in loaded]
+    ordered = True
+    with hook_stage(hooks, "compact") as counts:
+        for idx, (path, (data, issues)) in enumerate(zip(source_paths, loaded)):
+            if idx == 0:
+                chat_name = data.get('name', 'chat')
+            validation_issues.extend([f"{path}: {issue}" for issue in issues])
+            messages = data.get('messages', [])
+            if isinstance(messages, list):
+                # Session sources are shared with the frontend and stay dicts.
+                if session is None:
+                    compact_messages(messages)
+                counts["messages"] += len(messages)
+                ordered = ordered and messages_in_date_order(messages)
+            streams.append(zip(itertools.repeat(data.get('id')), messages))
+
+    merge_stats = new_filter_stats()
+    with hook_stage(hooks, "merge") as counts:
+        merged_messages = list(merge_message_streams(streams, stats=merge_stats, ordered=ordered))
+        counts["messages"] = len(merged_messages)
+    del streams, loaded
+
+    if anonymize:
+        if anonymizer is None:
+            anonymizer = Anonymizer.load(alias_map) if alias_map else Anonymizer()
+        with hook_stage(hooks, "anonymize") as counts:
+            merged_messages = anonymize_messages(merged_messages, anonymizer)
+            counts["messages"] = len(merged_messages)
+
+    filter_kwargs = dict(
+        selected_authors=selected_authors or set(),
+        start_date=start_date,
+        end_date=end_date,
+        use_date_range=use_date_range,
+        require_text=True,
+        return_stats=True,
+        include_service=include_service,
+    )
+    if session is not None and len(source_paths) == 1 and not anonymize and not merge_stats['excluded_duplicate']:
+        # Interactive frontends re-filter the same source; reuse its table.
+        # The table covers the source as loaded, so only when the merge
+        # dropped nothing from it.
+        with hook_stage(hooks, "filter") as counts:
+            messages, filter_stats = session.table(source_paths[0]).filter_messages(**filter_kwargs)
+            counts["messages"] = filter_stats['total_items']
+    else:
+        messages, filter_stats = filter_messages(merged_messages, hooks=hooks, **filter_kwargs)
+    filter_stats['total_items'] += merge_stats['total_items']
+    filter_stats['excluded_duplicate'] += merge_stats['excluded_duplicate']
+    return {
+        'messages': messages,
         'filter_stats': filter_stats,
         'validation_issues': validation_issues,
+        'anonymizer': anonymizer,
+        'chat_name': chat_name,
     }
 
+
 class ConversionGUI:
+    # Quiet period after the last change before counters are recomputed
+    COUNTERS_DEBOUNCE_MS = 150
+    # Minimum seconds between export progress updates
+    EXPORT_PROGRESS_INTERVAL = 0.25
+
     def __init__(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from src.tgxml.session import SourceSession
+
+        _load_tk()
         self.window = tk.Tk()
         self.window.title("JSON to XML Converter")
         
@@ -391,6 +1414,17 @@ class ConversionGUI:
         self.years = []
         self.months = [str(i).zfill(2) for i in range(1, 13)]
         self.days = [str(i).zfill(2) for i in range(1, 32)]
+
+        # Parsed source and everything derived from it, reused across refreshes
+        self.session = SourceSession()
+
+        # Counters are computed off the Tk thread; only the newest request is applied
+        self._counters_executor = ThreadPoolExecutor(max_workers=1)
+        self._counters_generation = 0
+        self._counters_after_id = None
+        self._counter_selection = None
+        # Set while an export runs; setting the event cancels it
+        self._export_cancel = None
         
         self.create_widgets()
         
@@ -620,6 +1654,21 @@ class ConversionGUI:
         )
         convert_btn.pack(side="left", padx=5)
         convert_btn.name = "convert_button"
+        self.convert_btn = convert_btn
+
+        # Cancel button, enabled while an export runs
+        cancel_btn = tk.Button(
+            button_frame,
+            text="CANCEL",
+            command=self.cancel_conversion,
+            font=('Arial', 12, 'bold'),
+            width=15,
+            height=2,
+            state=tk.DISABLED
+        )
+        cancel_btn.pack(side="left", padx=5)
+        cancel_btn.name = "cancel_button"
+        self.cancel_btn = cancel_btn
         
         # Help button
         help_btn = tk.Button(
@@ -652,6 +1701,8 @@ class ConversionGUI:
         if not self.source_path.get() or not self.output_dir.get():
             self.status_var.set("Please select source file and output directory")
             return
+        if self._export_cancel is not None:
+            return
         
         self.status_var.set("Converting...")
         self.progress_var.set(0)
@@ -666,8 +1717,7 @@ class ConversionGUI:
         source = self.source_path.get()
         if not source:
             raise ValueError("Source file is not selected")
-        with open(source, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self.session.load(source)
 
     def _current_date_bounds(self):
         if not self.use_date_range.get():
@@ -677,34 +1727,38 @@ class ConversionGUI:
             self.get_date_string(self.end_year, self.end_month, self.end_day),
         )
 
-    def _get_filtered_messages(self, data=None, use_selected_date_range=True):
-        data = data if data is not None else self._load_source_data()
+    def _filter_key(self, use_selected_date_range=True):
         start_date, end_date = ('', '')
         if use_selected_date_range:
             start_date, end_date = self._current_date_bounds()
-
-        return filter_messages(
-            data.get('messages', []),
-            selected_authors=self.selected_authors,
-            start_date=start_date,
-            end_date=end_date,
-            use_date_range=use_selected_date_range and self.use_date_range.get(),
-            require_text=True,
+        return (
+            frozenset(self.selected_authors),
+            start_date,
+            end_date,
+            use_selected_date_range and self.use_date_range.get(),
         )
 
-    def _build_xml_tree(self, messages, include_reactions, human_readable):
-        root = ET.Element("messages")
-        for message in messages:
-            build_message_element(root, message, include_reactions=include_reactions)
-        if human_readable:
-            self.indent(root)
-        return ET.ElementTree(root)
+    def _filtered_positions_for(self, source, key):
+        """Indexes of messages matching a _filter_key snapshot; safe to call from workers."""
+        table = self.session.table(source)
+
+        def _filter(source_data):
+            selected_authors, start_date, end_date, use_date_range = key
+            return table.filter_positions(
+                selected_authors=selected_authors,
+                start_date=start_date,
+                end_date=end_date,
+                use_date_range=use_date_range,
+                require_text=True,
+            )
 
-    def _xml_size_for_settings(self, messages, human_readable, include_reactions):
-        tree = self._build_xml_tree(messages, include_reactions, human_readable)
-        with io.BytesIO() as bio:
-            tree.write(bio, encoding='utf-8', xml_declaration=True)
-            return len(bio.getvalue())
+        return self.session.derived(source, 'filtered_positions', _filter, key=key)
+
+    def _xml_size(self, human_readable, include_reactions):
+        """Output size for the selection the counters were last computed for."""
+        if self._counter_selection is None:
+            return 0
+        return self._counter_selection.xml_size(human_readable, include_reactions)
 
     def get_message_dates_range(self, messages):
         """Get date range for filtered messages"""
@@ -735,12 +1789,7 @@ class ConversionGUI:
 
                 self.is_private_chat = data.get('type') == 'personal_chat'
 
-                self.authors = {
-                    msg.get('from', '')
-                    for msg in messages
-                    if isinstance(msg, dict) and msg.get('type') == 'message' and msg.get('from')
-                }
-                self.authors.discard('')
+                self.authors = set(self.session.profile(source).authors)
 
                 self.authors_listbox.delete(0, tk.END)
                 for author in sorted(self.authors):
@@ -774,40 +1823,110 @@ class ConversionGUI:
         return build_message_element(root, message, include_reactions=self.include_reactions.get())
 
     def convert_json_to_xml(self):
+        """Export the current selection; the file is written by a worker thread"""
         try:
             if not self.source_path.get() or not self.output_filename.get():
                 self.status_var.set("Error: Please select source file and output filename")
                 return
 
-            data = self._load_source_data()
-            messages = self._get_filtered_messages(data=data, use_selected_date_range=True)
-
-            if not messages:
-                self.status_var.set("Error: No messages to export")
-                self.progress_var.set(0)
-                return
-
-            total_messages = len(messages)
-            root = ET.Element("messages")
-            for index, message in enumerate(messages, start=1):
-                self.process_message(message, root)
-                self.progress_var.set((index / total_messages) * 100)
-                self.window.update_idletasks()
-
-            tree = ET.ElementTree(root)
-            if self.human_readable.get():
-                self.indent(root)
-
             output_path = os.path.join(self.output_dir.get(), self.output_filename.get())
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            tree.write(output_path, encoding='utf-8', xml_declaration=True)
-
-            self.status_var.set(f"Converted successfully: {total_messages:,} messages")
-            self.progress_var.set(100)
         except Exception as e:
             print(f"Error converting file: {str(e)}")
             self.status_var.set(f"Error: {str(e)}")
             self.progress_var.set(0)
+            return
+
+        import threading
+
+        self._export_cancel = threading.Event()
+        self._set_exporting(True)
+        worker = threading.Thread(
+            target=self._run_export,
+            args=(
+                self.source_path.get(),
+                self._filter_key(use_selected_date_range=True),
+                output_path,
+                self.include_reactions.get(),
+                self.human_readable.get(),
+                self._export_cancel,
+            ),
+            daemon=True,
+        )
+        worker.start()
+
+    def _run_export(self, source, key, output_path, include_reactions, human_readable, cancel_event):
+        """Worker thread: select and stream messages, reporting progress a few times per second"""
+        try:
+            positions = self._filtered_positions_for(source, key)
+        except Exception as e:
+            self.window.after(0, self._finish_export, None, e)
+            return
+        if not positions:
+            self.window.after(0, self._finish_export, None, ValueError("No messages to export"))
+            return
+        source_messages = self.session.messages(source)
+        messages = (source_messages[pos] for pos in positions)
+        total = len(positions)
+        started = time.monotonic()
+        last_report = started
+
+        def _progress(count):
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report >= self.EXPORT_PROGRESS_INTERVAL:
+                last_report = now
+                self.window.after(0, self._show_export_progress, count, total, now - started)
+
+        count, error = None, None
+        try:
+            count = write_xml_stream(
+                messages,
+                output_path,
+                include_reactions=include_reactions,
+                human_readable=human_readable,
+                progress=_progress,
+                cancel_event=cancel_event,
+            )
+        except ConversionCancelled:
+            pass
+        except Exception as e:
+            error = e
+        self.window.after(0, self._finish_export, count, error)
+
+    def _show_export_progress(self, count, total, elapsed):
+        if self._export_cancel is None or self._export_cancel.is_set():
+            return
+        rate = count / elapsed if elapsed > 0 else 0
+        eta = (total - count) / rate if rate else 0
+        self.progress_var.set((count / total) * 100)
+        self.status_var.set(
+            f"Converting... {count:,}/{total:,} messages ({rate:,.0f} msg/s, ETA {eta:.0f}s)"
+        )
+
+    def _finish_export(self, count, error):
+        self._export_cancel = None
+        self._set_exporting(False)
+        if error is not None:
+            print(f"Error converting file: {str(error)}")
+            self.status_var.set(f"Error: {str(error)}")
+            self.progress_var.set(0)
+        elif count is None:
+            self.status_var.set("Conversion cancelled, partial output removed")
+            self.progress_var.set(0)
+        else:
+            self.status_var.set(f"Converted successfully: {count:,} messages")
+            self.progress_var.set(100)
+
+    def _set_exporting(self, running):
+        self.convert_btn.configure(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_btn.configure(state=tk.NORMAL if running else tk.DISABLED)
+
+    def cancel_conversion(self):
+        """Stop a running export"""
+        if self._export_cancel is not None:
+            self._export_cancel.set()
+            self.status_var.set("Cancelling...")
 
     def show_help(self):
         help_window = tk.Toplevel(self.window)
@@ -965,6 +2084,8 @@ Click 'Close' to return to the converter."""
         if status_text:
             try:
                 # Use pbcopy for macOS clipboard
+                import subprocess
+
                 process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
                 process.communicate(status_text.encode('utf-8'))
                 
@@ -1014,19 +2135,9 @@ Click 'Close' to return to the converter."""
             if not self.source_path.get() or not self.selected_authors:
                 return
 
-            data = self._load_source_data()
-            messages = filter_messages(
-                data.get('messages', []),
-                selected_authors=self.selected_authors,
-                use_date_range=False,
-                require_text=True,
-            )
-            dates = sorted([extract_message_date(msg) for msg in messages if extract_message_date(msg)])
-
-            if dates:
-                min_date = dates[0]
-                max_date = dates[-1]
+            min_date, max_date = self._selected_authors_date_bounds()
 
+            if min_date:
                 self.start_year.set(min_date[:4])
                 self.start_month.set(min_date[5:7])
                 self.start_day.set(min_date[8:10])
@@ -1038,99 +2149,135 @@ Click 'Close' to return to the converter."""
         except Exception as e:
             print(f"Error updating date range for authors: {str(e)}")
 
-    def update_all_counters(self):
-        """Update all counters based on current selection"""
+    def _selected_authors_date_bounds(self):
+        """First and last date among the selected authors' messages."""
+        index = self.session.index(self.source_path.get())
+        return index.date_bounds(index.filter_positions(selected_authors=self.selected_authors))
+
+    def update_all_counters(self, *args):
+        """Schedule a counter refresh; a burst of changes results in one recomputation"""
+        if self._counters_after_id is not None:
+            self.window.after_cancel(self._counters_after_id)
+        self._counters_after_id = self.window.after(self.COUNTERS_DEBOUNCE_MS, self._start_counters_job)
+
+    def _start_counters_job(self):
+        """Snapshot the selection on the Tk thread and hand it to the counters worker"""
+        self._counters_after_id = None
+        # Results of any job still in flight are dropped when they arrive
+        self._counters_generation += 1
+        generation = self._counters_generation
+
+        source = self.source_path.get()
+        if not source:
+            return
+        if not self.selected_authors:
+            self._counter_selection = None
+            self._show_empty_counters("No messages selected", "No authors selected")
+            return
+
+        key = self._filter_key(use_selected_date_range=True)
+        self._counters_executor.submit(self._compute_counters, generation, source, key)
+
+    def _compute_counters(self, generation, source, key):
+        """Worker thread: query the rollup cube unless a newer request superseded this one"""
+        if generation != self._counters_generation:
+            return
         try:
-            if not self.source_path.get():
-                return
-            
-            if not self.selected_authors:
-                # Handle zero state
-                self.reactions_var.set("No messages selected")
-                self.stats_var.set("Messages: 0\nDate range: (no messages)")
-                self.format_info.set("(0 characters)")
-                self.reactions_info.set("(0 characters)")
-                self.summary_info.set(
-                    "Total characters: 0\n"
-                    "Estimated tokens: 0"
-                )
-                self.status_var.set("No authors selected")
+            cube = self.session.rollup(source)
+            if generation != self._counters_generation:
                 return
-            
-            data = self._load_source_data()
-            messages = self._get_filtered_messages(data=data, use_selected_date_range=True)
-
-            if not messages:
-                self.reactions_var.set("No messages found")
-                self.stats_var.set("Messages: 0\nDate range: (no messages)")
-                self.format_info.set("(0 characters)")
-                self.reactions_info.set("(0 characters)")
-                self.summary_info.set(
-                    "Total characters: 0\n"
-                    "Estimated tokens: 0"
-                )
-                self.status_var.set("No messages to export")
-                return
-
-            reactions_count = {}
-            for message in messages:
-                for reaction in message.get('reactions', []):
-                    emoji = reaction.get('emoji', '')
-                    count = reaction.get('count', 0)
-                    if emoji and count > 0:
-                        reactions_count[emoji] = reactions_count.get(emoji, 0) + count
-
-            if reactions_count:
-                reactions_list = sorted(reactions_count.items(), key=lambda x: (-x[1], x[0]))
-                window_width = self.window.winfo_width()
-                available_width = window_width - 40
-                avg_item_width = 12
-                min_spacing = 3
-                items_per_row = max(4, available_width // ((avg_item_width + min_spacing) * 8))
-                total_items = len(reactions_list)
-                num_rows = min(6, (total_items + items_per_row - 1) // items_per_row)
-                items_per_row = (total_items + num_rows - 1) // num_rows
-
-                reactions_rows = []
-                for row_start in range(0, total_items, items_per_row):
-                    row_items = reactions_list[row_start:row_start + items_per_row]
-                    spacing = " " * max(
-                        3,
-                        (available_width // 8 - len(row_items) * avg_item_width) //
-                        (len(row_items) - 1 if len(row_items) > 1 else 1),
-                    )
-                    row = spacing.join(f"{emoji}: {count}" for emoji, count in row_items)
-                    reactions_rows.append(row)
-                reactions_text = "Reactions:\n" + "\n".join(reactions_rows)
-            else:
-                reactions_text = "No reactions found"
-
-            self.reactions_var.set(reactions_text)
-            date_range = self.get_message_dates_range(messages)
-            self.stats_var.set(f"Messages: {len(messages)}\nDate range: {date_range}")
-            self.update_format_info()
-            self.status_var.set("Ready to convert")
-
-            self.window.update_idletasks()
-            required_height = self.main_container.winfo_reqheight() + 40
-            current_height = self.window.winfo_height()
-            if required_height > current_height:
-                self.window.geometry(f"{self.window.winfo_width()}x{required_height}")
-                
+            selection = self.session.derived(
+                source, 'selection_rollup', lambda data: cube.query(*key), key=key
+            )
+            error = None
         except Exception as e:
-            print(f"Error updating counters: {str(e)}")
+            selection, error = None, e
+        self.window.after(0, self._apply_counters, generation, selection, error)
+
+    def _apply_counters(self, generation, selection, error):
+        """Tk thread: show counters computed by the worker"""
+        if generation != self._counters_generation:
+            return
+        if error is not None:
+            print(f"Error updating counters: {str(error)}")
+            self._counter_selection = None
             self.reactions_var.set("")
             self.stats_var.set("")
             self.format_info.set("")
             self.reactions_info.set("")
             self.summary_info.set("")
-            self.status_var.set(f"Error: {str(e)}")
+            self.status_var.set(f"Error: {str(error)}")
+            return
+
+        self._counter_selection = selection
+        if not selection.messages:
+            self._show_empty_counters("No messages found", "No messages to export")
+            return
+
+        self.render_reactions()
+        date_range = format_dates_range_label(
+            selection.first_date.split('T')[0],
+            selection.last_date.split('T')[0],
+        )
+        self.stats_var.set(f"Messages: {selection.messages}\nDate range: {date_range}")
+        self.update_format_info()
+        self.status_var.set("Ready to convert")
+
+        self.window.update_idletasks()
+        required_height = self.main_container.winfo_reqheight() + 40
+        current_height = self.window.winfo_height()
+        if required_height > current_height:
+            self.window.geometry(f"{self.window.winfo_width()}x{required_height}")
+
+    def _show_empty_counters(self, reactions_text, status_text):
+        self.reactions_var.set(reactions_text)
+        self.stats_var.set("Messages: 0\nDate range: (no messages)")
+        self.format_info.set("(0 characters)")
+        self.reactions_info.set("(0 characters)")
+        self.summary_info.set(
+            "Total characters: 0\n"
+            "Estimated tokens: 0"
+        )
+        self.status_var.set(status_text)
+
+    def render_reactions(self):
+        """Lay out the reaction summary for the current window width"""
+        if self._counter_selection is None or not self._counter_selection.messages:
+            return
+        reactions_count = self._counter_selection.reactions
+
+        if reactions_count:
+            reactions_list = sorted(reactions_count.items(), key=lambda x: (-x[1], x[0]))
+            window_width = self.window.winfo_width()
+            available_width = window_width - 40
+            avg_item_width = 12
+            min_spacing = 3
+            items_per_row = max(4, available_width // ((avg_item_width + min_spacing) * 8))
+            total_items = len(reactions_list)
+            num_rows = min(6, (total_items + items_per_row - 1) // items_per_row)
+            items_per_row = (total_items + num_rows - 1) // num_rows
+
+            reactions_rows = []
+            for row_start in range(0, total_items, items_per_row):
+                row_items = reactions_list[row_start:row_start + items_per_row]
+                spacing = " " * max(
+                    3,
+                    (available_width // 8 - len(row_items) * avg_item_width) //
+                    (len(row_items) - 1 if len(row_items) > 1 else 1),
+                )
+                row = spacing.join(f"{emoji}: {count}" for emoji, count in row_items)
+                reactions_rows.append(row)
+            reactions_text = "Reactions:\n" + "\n".join(reactions_rows)
+        else:
+            reactions_text = "No reactions found"
+
+        self.reactions_var.set(reactions_text)
 
     def on_window_resize(self, event=None):
         """Handle window resize events"""
         if event.widget == self.window:
-            # Update counters to adjust to new size
-            self.update_all_counters()
+            # Only the reaction layout depends on the window size
+            self.render_reactions()
 
     def filter_messages_by_date(self, messages):
         """Filter messages by date range if enabled"""
@@ -1170,19 +2317,11 @@ Click 'Close' to return to the converter."""
         """Update available dates based on the loaded file"""
         try:
             if self.source_path.get():
-                data = self._load_source_data()
-                messages = filter_messages(
-                    data.get('messages', []),
-                    selected_authors=set(),
-                    use_date_range=False,
-                    require_text=False,
-                )
-                dates = sorted([extract_message_date(msg) for msg in messages if extract_message_date(msg)])
+                profile = self.session.profile(self.source_path.get())
+                min_date, max_date = profile.message_date_range
 
-                if dates:
-                    min_date = dates[0]
-                    max_date = dates[-1]
-                    self.years = sorted(list(set(d[:4] for d in dates)))
+                if min_date:
+                    self.years = profile.years
 
                     for dropdown in [self.start_year_cb, self.end_year_cb]:
                         dropdown['values'] = [''] + self.years
@@ -1267,19 +2406,9 @@ Click 'Close' to return to the converter."""
             if not self.source_path.get() or not self.selected_authors:
                 return
 
-            data = self._load_source_data()
-            messages = filter_messages(
-                data.get('messages', []),
-                selected_authors=self.selected_authors,
-                use_date_range=False,
-                require_text=True,
-            )
-            dates = sorted([extract_message_date(msg) for msg in messages if extract_message_date(msg)])
-
-            if dates:
-                min_date = dates[0]
-                max_date = dates[-1]
+            min_date, max_date = self._selected_authors_date_bounds()
 
+            if min_date:
                 self.start_year.set(min_date[:4])
                 self.start_month.set(min_date[5:7])
                 self.start_day.set(min_date[8:10])
@@ -1300,16 +2429,7 @@ Click 'Close' to return to the converter."""
             if not self.source_path.get():
                 return 0
 
-            data = self._load_source_data()
-            messages = self._get_filtered_messages(data=data, use_selected_date_range=True)
-            if not messages:
-                return 0
-
-            return self._xml_size_for_settings(
-                messages,
-                human_readable=human_readable,
-                include_reactions=with_reactions,
-            )
+            return self._xml_size(human_readable, with_reactions)
                 
         except Exception as e:
             print(f"Error calculating total chars: {str(e)}")
@@ -1321,21 +2441,8 @@ Click 'Close' to return to the converter."""
             if not self.source_path.get():
                 return 0
 
-            data = self._load_source_data()
-            messages = self._get_filtered_messages(data=data, use_selected_date_range=True)
-            if not messages:
-                return 0
-
-            with_reactions = self._xml_size_for_settings(
-                messages,
-                human_readable=self.human_readable.get(),
-                include_reactions=True,
-            )
-            without_reactions = self._xml_size_for_settings(
-                messages,
-                human_readable=self.human_readable.get(),
-                include_reactions=False,
-            )
+            with_reactions = self._xml_size(self.human_readable.get(), True)
+            without_reactions = self._xml_size(self.human_readable.get(), False)
             return max(0, with_reactions - without_reactions)
                 
         except Exception as e:
@@ -1505,6 +2612,8 @@ def _print_banner(use_plain=False):
 
 
 def _parse_cli_args(argv):
+    import argparse
+
     examples = (
         "Quick start:\n"
         "  python3 jsontoxml.py --cli\n\n"
@@ -1544,7 +2653,16 @@ def _parse_cli_args(argv):
     parser.add_argument("--include-media-meta", action="store_true", help="Include media metadata in XML")
     parser.add_argument("--include-entities", action="store_true", help="Include text_entities in XML")
     parser.add_argument("--anonymize", action="store_true", help="Anonymize authors and identifiers in output")
+    parser.add_argument("--alias-map", help="JSON file keeping --anonymize aliases stable across runs (created if missing)")
     parser.add_argument("--validate-input", action="store_true", help="Validate input JSON structure before conversion")
+    parser.add_argument("--stream", action="store_true", help="Stream sources and output with bounded memory (reads input twice)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the parsed-source cache")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to serialize XML (0 = one per CPU)")
+    parser.add_argument("--load-workers", type=int, default=1, help="Processes used to parse --sources files (0 = one per CPU)")
+    parser.add_argument("--profile", action="store_true", help="Report per-stage wall/CPU time, throughput and peak memory")
+    parser.add_argument("--profile-dump", help="Write cProfile stats of the slowest stage to this file (implies --profile)")
+    parser.add_argument("--metrics", help="Send stage metrics to a file, udp://host:port or unix:///path")
+    parser.add_argument("--metrics-format", choices=["statsd", "openmetrics"], default="statsd", help="Format of --metrics output")
     parser.add_argument("--plain", action="store_true", help="Plain interactive output (no TUI decorations)")
     parser.add_argument("--no-color", action="store_true", help="Disable ANSI colors in CLI output")
     parser.add_argument("--preset", help="Load conversion preset by name")
@@ -1586,6 +2704,17 @@ def run_cli(args):
 
     _print_banner(use_plain=plain)
 
+    profile = None
+    if args.profile or args.profile_dump:
+        from src.tgxml.run_profile import RunProfile, format_profile_report
+
+        profile = RunProfile(dump_path=args.profile_dump)
+    metrics = None
+    if args.metrics:
+        from src.tgxml.metrics import MetricsHooks
+
+        metrics = MetricsHooks(args.metrics, fmt=args.metrics_format)
+
     presets = _load_presets()
     if args.preset:
         preset_data = presets.get(args.preset)
@@ -1603,15 +2732,18 @@ def run_cli(args):
         anonymize = bool(preset_data.get("anonymize", anonymize))
         validate_input = bool(preset_data.get("validate_input", validate_input))
 
+    session = None
     if args.interactive:
+        from src.tgxml.session import SourceSession
+
         if not source_paths:
             single_source = input("Source JSON path: ").strip()
             source_paths = [single_source]
 
-        data = load_json_file(source_paths[0])
-        messages = data.get('messages', [])
-        available_authors = get_available_authors(messages)
-        min_date, max_date = get_date_range_from_messages(messages)
+        session = SourceSession(use_cache=not args.no_cache)
+        source_profile = session.profile(source_paths[0])
+        available_authors = source_profile.authors
+        min_date, max_date = source_profile.min_date, source_profile.max_date
 
         mode_index = _menu_single_select(
             "Interactive CLI",
@@ -1627,13 +2759,22 @@ def run_cli(args):
 
         if mode_index == 2:
             print(f"Source: {source_paths[0]}")
-            print(f"Raw items: {len(messages)}")
+            print(f"Raw items: {source_profile.total_items}")
+            print("Item types: " + ", ".join(
+                f"{msg_type}={count}" for msg_type, count in sorted(
+                    source_profile.type_counts.items(), key=lambda x: (-x[1], str(x[0]))
+                )
+            ))
             print(f"Message authors: {len(available_authors)}")
             if min_date and max_date:
-                print(f"Date range: {min_date} .. {max_date}")
+                print(f"Date range: {min_date} .. {max_date} ({len(source_profile.day_counts)} active days)")
             print("Authors:")
-            for author in available_authors:
-                print(f"  - {author}")
+            for author, count in source_profile.top_authors():
+                print(f"  - {author} ({count})")
+            if source_profile.reaction_totals:
+                print("Top reactions: " + "  ".join(
+                    f"{emoji} {count}" for emoji, count in source_profile.top_reactions(10)
+                ))
             return
 
         if mode_index == 3:
@@ -1669,7 +2810,7 @@ def run_cli(args):
             include_reactions = True
             human_readable = True
         else:
-            print(f"Detected {len(available_authors)} authors and {len(messages)} raw messages.")
+            print(f"Detected {len(available_authors)} authors and {source_profile.total_items} raw messages.")
             if min_date and max_date:
                 print(f"Detected date range: {min_date} .. {max_date}")
 
@@ -1769,9 +2910,16 @@ def run_cli(args):
         human_readable=human_readable,
         anonymize=anonymize,
         validate_input=validate_input,
+        alias_map=args.alias_map,
+        workers=args.workers,
+        load_workers=args.load_workers,
+        streaming=args.stream,
+        use_cache=not args.no_cache,
+        session=session,
+        profile=profile,
+        hooks=metrics,
     )
     output_path = payload["output_path"]
-    report = create_report(payload, dry_run=dry_run)
 
     if args.save_preset:
         presets[args.save_preset] = {
@@ -1792,14 +2940,23 @@ def run_cli(args):
         }
         _save_presets(presets)
 
+    if not dry_run:
+        write_xml(payload, workers=args.workers)
+    if metrics is not None:
+        metrics.close()
+    if profile is not None:
+        profile.finish()
+    report = create_report(payload, dry_run=dry_run)
+
     if dry_run:
         if args.report_json:
             print(report_as_json(report))
         else:
             print(format_dry_run_report(report))
+            if profile is not None:
+                print(format_profile_report(report["profile"]))
         return
 
-    write_xml(payload)
     filter_stats = payload["filter_stats"]
     validation_issues = payload["validation_issues"]
 
@@ -1815,9 +2972,14 @@ def run_cli(args):
         replay = build_replay_command(payload, no_color=no_color, plain=plain)
         print("Replay command:")
         print("  " + replay)
+        if profile is not None:
+            print(format_profile_report(report["profile"]))
 
 
 def main():
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     args = _parse_cli_args(sys.argv[1:])
 
     # If user passed direct sources without explicit mode, keep one-shot behavior.
@@ -1850,7 +3012,7 @@ def main():
         run_cli(args)
         return
 
-    if tk is None:
+    if _load_tk() is None:
         raise RuntimeError(
             "Tkinter is not available in this Python environment. "
             "Use CLI mode (--cli) or one-shot (--cli --run --source ...), or install Tkinter to run GUI."
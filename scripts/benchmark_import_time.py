@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Cold-start import budget for the converter.
+
+Runs each target in a fresh interpreter under ``python -X importtime``, sums
+the time of the modules it imports (minus interpreter startup) and checks
+that no UI/CLI-only module is loaded on the conversion path.
+
+    python3 scripts/benchmark_import_time.py
+    python3 scripts/benchmark_import_time.py --budget-ms core=40 --output imports.json
+
+Exits with status 1 when a target is over its budget or loads a module it
+must not.
+"""
+
+import argparse
+import compileall
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Budgets are generous defaults for a laptop; pass --budget-ms for CI hosts.
+TARGETS = {
+    "core": {
+        "code": "import src.tgxml.core",
+        "budget_ms": 60,
+        "forbidden": ("tkinter", "curses", "textual", "numpy", "argparse", "subprocess", "logging",
+                      "multiprocessing", "concurrent"),
+    },
+    "cli": {
+        "code": "import src.tgxml.cli",
+        "budget_ms": 60,
+        "forbidden": ("tkinter", "curses", "textual", "numpy", "argparse", "subprocess", "logging",
+                      "multiprocessing", "concurrent"),
+    },
+    "one-shot": {
+        "code": (
+            "import contextlib, io, sys\n"
+            "from src.tgxml.cli import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    main(['--cli', '--run', '--plain', '--no-cache', '--no-date-filter',\n"
+            "          '--source', sys.argv[1], '--output', sys.argv[2]])\n"
+        ),
+        "budget_ms": 100,
+        "forbidden": ("tkinter", "curses", "textual", "numpy", "subprocess", "multiprocessing", "concurrent"),
+    },
+}
+
+SAMPLE_EXPORT = {
+    "name": "Import benchmark",
+    "type": "personal_chat",
+    "id": 1,
+    "messages": [
+        {"id": 1, "type": "message", "date": "2024-01-01T10:00:00", "from": "Author 1", "from_id": "user1", "text": "hello"},
+    ],
+}
+
+
+def import_times(code, args=()):
+    """``({top-level module: cumulative us}, {module: self us})`` for ``code``."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    top_level = {}
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        self_times[name.strip()] = int(own.split(":")[1])
+        # Nested imports are already included in their parent's cumulative time.
+        if not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+    return top_level, self_times
+
+
+def all_modules(code, args=()):
+    """Names of every module loaded by ``code`` (including nested imports)."""
+    probe = code + "\nimport sys as _sys; print('\\n'.join(_sys.modules))\n"
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", probe, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def measure(target, startup, repeat, args):
+    best = None
+    for _ in range(repeat):
+        top_level, self_times = import_times(target["code"], args)
+        total = sum(us for module, us in top_level.items() if module not in startup)
+        if best is None or total < best:
+            best, heaviest = total, self_times
+    loaded = all_modules(target["code"], args)
+    forbidden = sorted(
+        module for module in loaded
+        if module.split(".")[0].lstrip("_") in target["forbidden"]
+    )
+    top = sorted(
+        ((module, us) for module, us in heaviest.items() if module not in startup),
+        key=lambda item: -item[1],
+    )[:5]
+    return {
+        "import_ms": round(best / 1000, 1),
+        "budget_ms": target["budget_ms"],
+        "forbidden_loaded": forbidden,
+        "heaviest_self": [{"module": module, "ms": round(us / 1000, 1)} for module, us in top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per target; the fastest is reported")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="TARGET=MS",
+                        help="Override a target's budget (repeatable)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    targets = {name: dict(target) for name, target in TARGETS.items()}
+    for item in args.budget_ms:
+        name, _, value = item.partition("=")
+        if name not in targets:
+            parser.error(f"unknown target {name!r}; choose from {', '.join(targets)}")
+        targets[name]["budget_ms"] = float(value)
+
+    # Measure warm .pyc imports even under PYTHONDONTWRITEBYTECODE.
+    compileall.compile_file(str(ROOT / "jsontoxml.py"), quiet=1)
+    compileall.compile_dir(str(ROOT / "src"), quiet=1)
+    startup = set(import_times("pass")[1])
+    failed = False
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "result.json")
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump(SAMPLE_EXPORT, f)
+        run_args = (source, os.path.join(tmp, "out.xml"))
+        for name, target in targets.items():
+            result = measure(target, startup, args.repeat, run_args)
+            results[name] = result
+            over = result["import_ms"] > result["budget_ms"]
+            status = "OVER BUDGET" if over else "ok"
+            print(f"{name:<10} {result['import_ms']:7.1f} ms  budget {result['budget_ms']:6.1f} ms  {status}")
+            for item in result["heaviest_self"]:
+                print(f"    {item['module']:<32} {item['ms']:7.1f} ms")
+            if result["forbidden_loaded"]:
+                print(f"    loads {', '.join(result['forbidden_loaded'])}")
+            failed = failed or over or bool(result["forbidden_loaded"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "targets": results}, f, indent=2)
+        print(f"Results: {args.output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Performance baseline for large exports.
+
+Generates a deterministic synthetic Telegram export (see synthetic_export.py)
+or uses --source, then times each conversion stage and an end-to-end CLI
+run, and measures the memory held by loaded messages as plain dicts and
+as compact MessageRecords.
+
+    python3 scripts/benchmark_large_export.py --messages 200000 --output bench.json
+    python3 scripts/benchmark_large_export.py --compare bench.json
+
+Results are written as JSON with --output. --compare flags stages that got
+slower than the stored baseline by more than --tolerance and exits with
+status 1 when there are any.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import (  # noqa: E402
+    _parse_cli_args,
+    anonymize_messages,
+    build_xml_tree,
+    filter_messages,
+    indent_xml,
+    load_json_file,
+    required_message_fields,
+    run_cli,
+    write_xml_stream,
+)
+from src.tgxml.records import compact_messages  # noqa: E402
+from synthetic_export import add_spec_arguments, spec_from_args, write_export  # noqa: E402
+
+RESULTS_FORMAT = 1
+
+
+def time_stage(name, func, count, repeat, setup=None):
+    """Best and median wall time of ``func`` over ``repeat`` runs.
+
+    ``setup`` builds a fresh argument for every run outside the timed part.
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        started = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - started)
+        del arg
+    best = min(times)
+    result = {
+        "seconds": best,
+        "median_seconds": statistics.median(times),
+        "messages": count,
+        "messages_per_second": count / best if best else 0.0,
+    }
+    print(f"  {name:<26} {best:8.3f}s  median {result['median_seconds']:8.3f}s  {result['messages_per_second']:>12,.0f} msg/s")
+    return result
+
+
+def held_memory(func):
+    """(held, peak) MiB allocated by ``func`` while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return round(current / 2**20, 1), round(peak / 2**20, 1)
+
+
+def run_stages(source, tmp, repeat):
+    data = load_json_file(source)
+    messages = data.get("messages", [])
+    count = len(messages)
+    fields = required_message_fields()
+    output = os.path.join(tmp, "out.xml")
+    filtered = filter_messages(messages)
+
+    def fresh_tree(pretty=False):
+        return build_xml_tree(filtered, human_readable=pretty)
+
+    def write_tree(tree):
+        tree.write(output, encoding="utf-8", xml_declaration=True)
+
+    def end_to_end(_):
+        args = _parse_cli_args(["--cli", "--run", "--plain", "--no-cache", "--no-date-filter",
+                                "--source", source, "--output", output])
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_cli(args)
+
+    print("Stages:")
+    stages = {
+        "load_json_file": time_stage("load_json_file", lambda _: load_json_file(source), count, repeat),
+        "load_json_file_projected": time_stage(
+            "load_json_file (projected)", lambda _: load_json_file(source, fields), count, repeat
+        ),
+        "compact_messages": time_stage(
+            "compact_messages", compact_messages, count, repeat,
+            setup=lambda: load_json_file(source, fields)["messages"],
+        ),
+        "anonymize_messages": time_stage("anonymize_messages", lambda _: anonymize_messages(messages), count, repeat),
+        "filter_messages": time_stage("filter_messages", lambda _: filter_messages(messages), count, repeat),
+        "build_xml_tree": time_stage("build_xml_tree", lambda _: fresh_tree(), len(filtered), repeat),
+        "indent_xml": time_stage(
+            "indent_xml", lambda tree: indent_xml(tree.getroot()), len(filtered), repeat, setup=fresh_tree
+        ),
+        "tree_write": time_stage(
+            "tree.write", write_tree, len(filtered), repeat, setup=lambda: fresh_tree(pretty=True)
+        ),
+        "write_xml_stream": time_stage(
+            "write_xml_stream", lambda _: write_xml_stream(filtered, output), len(filtered), repeat
+        ),
+        "run_cli": time_stage("run_cli (end to end)", end_to_end, count, repeat),
+    }
+    del data, messages, filtered
+
+    print("Memory held by loaded messages:")
+    memory = {}
+    for name, func in (
+        ("full_dicts", lambda: load_json_file(source)),
+        ("projected_dicts", lambda: load_json_file(source, fields)),
+        ("records", lambda: compact_messages(load_json_file(source, fields)["messages"])),
+    ):
+        held, peak = held_memory(func)
+        memory[name] = {"held_mib": held, "peak_mib": peak}
+        print(f"  {name:<26} held {held:8.1f} MiB  peak {peak:8.1f} MiB")
+    return stages, memory
+
+
+def compare_results(current, baseline, tolerance):
+    """Print per-stage ratios against ``baseline``; return names of regressed stages."""
+    regressions = []
+    print(f"Compared with baseline (tolerance {tolerance:.0%}):")
+    for name, stage in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or not base["seconds"]:
+            print(f"  {name:<26} (not in baseline)")
+            continue
+        ratio = stage["seconds"] / base["seconds"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ("faster" if ratio < 1 - tolerance else "ok")
+        if flag == "REGRESSION":
+            regressions.append(name)
+        print(f"  {name:<26} {base['seconds']:8.3f}s -> {stage['seconds']:8.3f}s  x{ratio:5.2f}  {flag}")
+    if current.get("spec") != baseline.get("spec"):
+        print("  note: baseline was measured on a different export; ratios are not comparable")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", help="Benchmark an existing export instead of a synthetic one")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is reported")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before a stage is flagged")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.source
+        if not source:
+            source = os.path.join(tmp, "export.json")
+            write_export(source, spec)
+        print(f"Source: {source} ({os.path.getsize(source) / 2**20:.1f} MiB)")
+        stages, memory = run_stages(source, tmp, args.repeat)
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "spec": {"source": args.source} if args.source else asdict(spec),
+        "repeat": args.repeat,
+        "stages": stages,
+        "memory": memory,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results: {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+# End-to-end smoke test of the one-shot CLI on a synthetic export.
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+cd "$ROOT_DIR"
+
+PYTHON_BIN="${PYTHON_BIN:-python3}"
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+export TGXML_CACHE_DIR="$WORK_DIR/cache"
+export TGXML_ANON_KEY="smoke-test"
+
+run_cli() {
+  "$PYTHON_BIN" jsontoxml.py --cli --run --plain --no-date-filter "$@" >/dev/null
+}
+
+echo "[smoke] Generating synthetic exports"
+"$PYTHON_BIN" scripts/synthetic_export.py --messages 20000 "$WORK_DIR/first.json" >/dev/null
+"$PYTHON_BIN" scripts/synthetic_export.py --messages 5000 --seed 1 "$WORK_DIR/second.json" >/dev/null
+
+echo "[smoke] One-shot, streaming, cached and parallel runs"
+run_cli --source "$WORK_DIR/first.json" --output "$WORK_DIR/default.xml"
+run_cli --source "$WORK_DIR/first.json" --output "$WORK_DIR/cached.xml"
+run_cli --source "$WORK_DIR/first.json" --output "$WORK_DIR/stream.xml" --stream
+run_cli --source "$WORK_DIR/first.json" --output "$WORK_DIR/parallel.xml" --workers 2 --no-cache
+for variant in cached stream parallel; do
+  if ! cmp -s "$WORK_DIR/default.xml" "$WORK_DIR/$variant.xml"; then
+    echo "[smoke] $variant output differs from the default run" >&2
+    exit 1
+  fi
+done
+
+echo "[smoke] Merged, anonymized and profiled runs"
+run_cli --sources "$WORK_DIR/first.json" "$WORK_DIR/second.json" --output "$WORK_DIR/merged.xml" \
+  --anonymize --include-entities --include-media-meta --validate-input
+run_cli --sources "$WORK_DIR/first.json" "$WORK_DIR/second.json" --output "$WORK_DIR/merged_stream.xml" \
+  --anonymize --include-entities --include-media-meta --validate-input --stream
+run_cli --sources "$WORK_DIR/first.json" "$WORK_DIR/second.json" --output "$WORK_DIR/merged_load.xml" \
+  --anonymize --include-entities --include-media-meta --validate-input --load-workers 2 --no-cache
+for variant in merged_stream merged_load; do
+  if ! cmp -s "$WORK_DIR/merged.xml" "$WORK_DIR/$variant.xml"; then
+    echo "[smoke] $variant output differs from the in-memory merge" >&2
+    exit 1
+  fi
+done
+"$PYTHON_BIN" jsontoxml.py --cli --run --plain --no-date-filter --source "$WORK_DIR/first.json" \
+  --output "$WORK_DIR/dry.xml" --dry-run --report-json --profile --metrics "$WORK_DIR/metrics.statsd" \
+  | "$PYTHON_BIN" -c 'import json, sys; report = json.load(sys.stdin); assert report["profile"]["stages"], report'
+test -s "$WORK_DIR/metrics.statsd"
+test ! -e "$WORK_DIR/dry.xml"
+
+echo "[smoke] XML well-formedness"
+"$PYTHON_BIN" - "$WORK_DIR"/default.xml "$WORK_DIR"/merged.xml <<'EOF'
+import sys
+import xml.etree.ElementTree as ET
+
+for path in sys.argv[1:]:
+    root = ET.parse(path).getroot()
+    assert root.tag == "messages" and len(root), path
+EOF
+
+echo "[smoke] OK"
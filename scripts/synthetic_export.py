@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic Telegram export generator for benchmarks.
+
+The same options and seed always produce the same file.
+
+    python3 scripts/synthetic_export.py out.json --messages 100000 --authors 50
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, asdict
+
+WORDS = (
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing",
+    "elit", "привет", "мир", "数据", "🙂", "<tag>", "&", "\"quoted\"",
+)
+EMOJI = ("👍", "❤", "🔥", "😂", "👎", "🎉", "🤔", "😢")
+ENTITY_TYPES = ("bold", "italic", "link", "code", "mention", "hashtag")
+SERVICE_ACTIONS = ("pin_message", "invite_members", "edit_group_title", "join_group_by_link")
+# Start of the generated timeline (2023-01-01T00:00:00Z) and mean gap between messages.
+EPOCH = 1672531200
+MEAN_GAP_SECONDS = 600
+
+
+@dataclass
+class ExportSpec:
+    """Shape of a synthetic export; shares are fractions of all messages."""
+
+    messages: int = 100_000
+    authors: int = 40
+    rich_text_share: float = 0.3
+    reaction_share: float = 0.2
+    entity_share: float = 0.3
+    media_share: float = 0.1
+    service_share: float = 0.02
+    empty_text_share: float = 0.05
+    seed: int = 0
+
+
+def _format_date(timestamp):
+    # Avoid datetime/time zone work in the hot loop: days since EPOCH map to a
+    # fixed 28-day month calendar, which keeps dates valid and ordered.
+    seconds = timestamp - EPOCH
+    day, rest = divmod(seconds, 86400)
+    year = 2023 + day // 336
+    month = 1 + day // 28 % 12
+    return (
+        f"{year:04d}-{month:02d}-{1 + day % 28:02d}"
+        f"T{rest // 3600:02d}:{rest // 60 % 60:02d}:{rest % 60:02d}"
+    )
+
+
+def _sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randrange(1, 40)))
+
+
+def iter_messages(spec):
+    """Yield the messages of ``spec`` in date order, as Telegram writes them."""
+    rng = random.Random(spec.seed)
+    authors = [(f"Author {i}", f"user{1000 + i}") for i in range(1, spec.authors + 1)]
+    timestamp = EPOCH
+    for msg_id in range(1, spec.messages + 1):
+        timestamp += rng.randrange(1, 2 * MEAN_GAP_SECONDS)
+        name, user_id = rng.choice(authors)
+        message = {
+            "id": msg_id,
+            "type": "message",
+            "date": _format_date(timestamp),
+            "date_unixtime": str(timestamp),
+            "from": name,
+            "from_id": user_id,
+        }
+        roll = rng.random()
+        if roll < spec.service_share:
+            message.update(type="service", actor=name, actor_id=user_id, action=rng.choice(SERVICE_ACTIONS))
+            message.pop("from")
+            message.pop("from_id")
+            message["text"] = ""
+            message["text_entities"] = []
+            yield message
+            continue
+
+        if rng.random() < spec.empty_text_share:
+            text = ""
+        else:
+            text = _sentence(rng)
+        if text and rng.random() < spec.rich_text_share:
+            parts = [text, {"type": rng.choice(ENTITY_TYPES), "text": _sentence(rng)}, " " + _sentence(rng)]
+            message["text"] = parts
+        else:
+            message["text"] = text
+        entities = []
+        if text and rng.random() < spec.entity_share:
+            entities = [
+                {"type": rng.choice(ENTITY_TYPES), "text": rng.choice(WORDS)}
+                for _ in range(rng.randrange(1, 4))
+            ]
+        message["text_entities"] = entities
+        if rng.random() < spec.reaction_share:
+            message["reactions"] = [
+                {"type": "emoji", "count": rng.randrange(1, 20), "emoji": emoji, "recent": []}
+                for emoji in rng.sample(EMOJI, rng.randrange(1, 4))
+            ]
+        if rng.random() < spec.media_share:
+            message.update(
+                photo="(File not included. Change data exporting settings to download.)",
+                photo_file_size=rng.randrange(10_000, 2_000_000),
+                width=rng.choice((640, 1280, 1920)),
+                height=rng.choice((480, 960, 1080)),
+            )
+        if msg_id > 1 and rng.random() < 0.1:
+            message["reply_to_message_id"] = rng.randrange(1, msg_id)
+        if rng.random() < 0.05:
+            message["edited"] = message["date"]
+            message["edited_unixtime"] = message["date_unixtime"]
+        yield message
+
+
+def write_export(path, spec):
+    """Write the export described by ``spec`` to ``path``."""
+    data = {
+        "name": "Synthetic benchmark chat",
+        "type": "private_supergroup",
+        "id": 1000 + spec.seed,
+        "messages": list(iter_messages(spec)),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def add_spec_arguments(parser):
+    defaults = ExportSpec()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=type(value),
+            default=value,
+            help=f"default: {value}",
+        )
+
+
+def spec_from_args(args):
+    return ExportSpec(**{name: getattr(args, name) for name in asdict(ExportSpec())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="Path of the JSON export to write")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    write_export(args.output, spec_from_args(args))
+
+
+if __name__ == "__main__":
+    main()
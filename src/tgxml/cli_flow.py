@@ -7,21 +7,34 @@ import os
 import shlex
 import sys
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from jsontoxml import (  # noqa: E402
-    anonymize_messages,
+    Anonymizer,
+    PipelineHooks,
+    SourceOrderError,
     build_export_label,
-    build_xml_tree,
-    filter_messages,
-    load_json_file,
-    validate_telegram_export,
+    chain_hooks,
+    extract_message_date,
+    hook_stage,
+    iter_streamed_messages,
+    iter_with_progress,
+    new_filter_stats,
+    prepare_messages,
+    required_message_fields,
+    write_xml_stream,
 )
 
+if TYPE_CHECKING:
+    # Annotations only: the session pulls in the columnar/NumPy stack, which
+    # one-shot conversions do not need.
+    from src.tgxml.run_profile import RunProfile
+    from src.tgxml.session import SourceSession
+
 
 def build_conversion_payload(
     *,
@@ -39,37 +52,124 @@ def build_conversion_payload(
     human_readable: bool,
     anonymize: bool,
     validate_input: bool,
+    alias_map: str | None = None,
+    workers: int = 1,
+    load_workers: int = 1,
+    streaming: bool = False,
+    use_cache: bool = True,
+    session: SourceSession | None = None,
+    profile: RunProfile | None = None,
+    hooks: PipelineHooks | None = None,
 ) -> dict[str, Any]:
-    """Load sources, apply filters, and prepare conversion payload."""
-    all_messages = []
-    validation_issues = []
-    first_chat_name = "chat"
+    """Load sources, apply filters, and prepare conversion payload.
 
-    for idx, src in enumerate(source_paths):
-        data = load_json_file(src)
-        if idx == 0:
-            first_chat_name = data.get("name", "chat")
-        if validate_input:
-            validation_issues.extend([f"{src}: {x}" for x in validate_telegram_export(data)])
-        all_messages.extend(data.get("messages", []))
+    Several sources are merged by ``(date, id)`` and messages present in
+    more than one of them are kept once (see merge_message_streams); without
+    a session they are parsed and validated ``load_workers`` at a time.
+    ``workers``, the processes write_xml serializes with, is only kept in
+    the payload for the replay command.
 
+    With ``streaming`` the sources are scanned incrementally and only filter
+    statistics are kept; ``write_xml`` then re-reads the sources, so peak
+    memory does not depend on export size. A source found to go back in
+    date is scanned again keeping every message id (``ordered`` in the
+    payload), so duplicates are dropped as in memory. Otherwise
+    prepare_messages loads the sources from ``session`` when given, or
+    through the parsed-source cache unless ``use_cache`` is false, and
+    holds the filtered messages. With ``anonymize``, aliases start from the
+    ``alias_map`` file when given; ``write_xml`` saves it back.
+
+    ``profile`` and ``hooks`` receive start/end events of each stage
+    (parse, validate, compact, merge, anonymize, filter; a single ``scan``
+    when streaming) and progress events; with either, validation runs in
+    this process as its own stage. Both are kept in the payload for
+    ``write_xml``.
+    """
+    validation_issues = []
+    first_chat_name = "chat"
+    payload_hooks = hooks
+    hooks = chain_hooks(profile, hooks)
+    anonymizer = None
     if anonymize:
-        all_messages = anonymize_messages(all_messages)
-
-    filtered_messages, filter_stats = filter_messages(
-        all_messages,
-        selected_authors=selected_authors,
-        start_date=start_date,
-        end_date=end_date,
-        use_date_range=use_date_range,
-        require_text=True,
-        return_stats=True,
-        include_service=include_service,
-    )
+        anonymizer = Anonymizer.load(alias_map) if alias_map else Anonymizer()
+
+    ordered = None
+    if streaming:
+        filtered_messages = None
+        with hook_stage(hooks, "scan") as stage:
+            while True:
+                headers = []
+                filter_stats = new_filter_stats()
+                scan_issues = []
+                date_range = ["", ""]
+                messages = iter_streamed_messages(
+                    source_paths,
+                    selected_authors=selected_authors,
+                    start_date=start_date,
+                    end_date=end_date,
+                    use_date_range=use_date_range,
+                    include_service=include_service,
+                    anonymizer=anonymizer,
+                    fields=required_message_fields(
+                        include_reactions=include_reactions,
+                        include_media_meta=include_media_meta,
+                        include_entities=include_entities,
+                    ),
+                    stats=filter_stats,
+                    headers=headers,
+                    validation_issues=scan_issues if validate_input else None,
+                    ordered=ordered,
+                )
+                if hooks is not None:
+                    messages = iter_with_progress(messages, hooks, "scan")
+                try:
+                    for msg in messages:
+                        date_str = extract_message_date(msg)
+                        if not date_str:
+                            continue
+                        if not date_range[0] or date_str < date_range[0]:
+                            date_range[0] = date_str
+                        if date_str > date_range[1]:
+                            date_range[1] = date_str
+                except SourceOrderError:
+                    # A source goes back in date: scan again keeping every
+                    # id, and have write_xml read the sources the same way.
+                    ordered = False
+                    continue
+                break
+            validation_issues.extend(scan_issues)
+            stage["messages"] = filter_stats["total_items"]
+            stage["bytes"] = sum(map(os.path.getsize, source_paths))
+        if headers:
+            first_chat_name = headers[0].get("name", "chat")
+    else:
+        prepared = prepare_messages(
+            source_paths,
+            selected_authors=selected_authors,
+            start_date=start_date,
+            end_date=end_date,
+            use_date_range=use_date_range,
+            include_reactions=include_reactions,
+            include_service=include_service,
+            include_media_meta=include_media_meta,
+            include_entities=include_entities,
+            anonymize=anonymize,
+            validate_input=validate_input,
+            use_cache=use_cache,
+            load_workers=load_workers,
+            anonymizer=anonymizer,
+            session=session,
+            hooks=hooks,
+        )
+        filtered_messages = prepared["messages"]
+        filter_stats = prepared["filter_stats"]
+        validation_issues = prepared["validation_issues"]
+        first_chat_name = prepared["chat_name"]
+        date_range = None
 
     resolved_output = output_path
     if not resolved_output:
-        export_label = build_export_label(first_chat_name, filtered_messages)
+        export_label = build_export_label(first_chat_name, filtered_messages, date_range=date_range)
         if output_dir:
             resolved_output = os.path.join(output_dir, f"{export_label}.xml")
         else:
@@ -91,11 +191,41 @@ def build_conversion_payload(
         "include_media_meta": include_media_meta,
         "include_entities": include_entities,
         "anonymize": anonymize,
+        "anonymizer": anonymizer,
+        "alias_map": alias_map,
         "validate_input": validate_input,
         "human_readable": human_readable,
+        "streaming": streaming,
+        "ordered": ordered,
+        "use_cache": use_cache,
+        "workers": workers,
+        "load_workers": load_workers,
+        "profile": profile,
+        "hooks": payload_hooks,
     }
 
 
+def iter_payload_messages(payload: dict[str, Any]):
+    """Yield filtered messages of a payload, re-reading sources when streaming."""
+    if not payload.get("streaming"):
+        return iter(payload["filtered_messages"])
+    return iter_streamed_messages(
+        payload["source_paths"],
+        selected_authors=payload["selected_authors"],
+        start_date=payload["start_date"],
+        end_date=payload["end_date"],
+        use_date_range=payload["use_date_range"],
+        include_service=payload["include_service"],
+        anonymizer=payload["anonymizer"],
+        fields=required_message_fields(
+            include_reactions=payload["include_reactions"],
+            include_media_meta=payload["include_media_meta"],
+            include_entities=payload["include_entities"],
+        ),
+        ordered=payload.get("ordered"),
+    )
+
+
 def create_report(payload: dict[str, Any], *, dry_run: bool) -> dict[str, Any]:
     """Build structured report for dry-run/export output."""
     return {
@@ -110,11 +240,14 @@ def create_report(payload: dict[str, Any], *, dry_run: bool) -> dict[str, Any]:
         "include_media_meta": payload["include_media_meta"],
         "include_entities": payload["include_entities"],
         "anonymize": payload["anonymize"],
+        "alias_map": payload.get("alias_map"),
         "validate_input": payload["validate_input"],
         "human_readable": payload["human_readable"],
+        "streaming": payload.get("streaming", False),
         "selected_authors_count": len(payload["selected_authors"]),
         "filter_stats": payload["filter_stats"],
         "validation_issues": payload["validation_issues"],
+        "profile": payload["profile"].as_dict() if payload.get("profile") is not None else None,
     }
 
 
@@ -131,6 +264,7 @@ def format_dry_run_report(report: dict[str, Any]) -> str:
         f"  Excluded by author: {stats['excluded_author']}",
         f"  Excluded empty text: {stats['excluded_empty_text']}",
         f"  Excluded by date: {stats['excluded_date']}",
+        f"  Excluded duplicates: {stats.get('excluded_duplicate', 0)}",
     ]
     if report["validation_issues"]:
         lines.append("  Validation issues:")
@@ -138,17 +272,51 @@ def format_dry_run_report(report: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def write_xml(payload: dict[str, Any]) -> None:
-    """Write XML output using prepared payload."""
-    tree = build_xml_tree(
-        payload["filtered_messages"],
+def write_xml(
+    payload: dict[str, Any],
+    workers: int = 1,
+    progress: Callable[[int], None] | None = None,
+    cancel_event: Any = None,
+    profile: RunProfile | None = None,
+    hooks: PipelineHooks | None = None,
+) -> int:
+    """Write XML output using prepared payload, serializing in ``workers`` processes.
+
+    ``progress`` and ``cancel_event`` are passed through to write_xml_stream.
+    Saves the payload's alias map once the output is written. Returns the
+    number of messages written.
+
+    ``profile`` and ``hooks`` (default: the payload's) get the
+    ``serialize`` stage; ``profile`` also a ``write`` stage split off it.
+    When streaming, ``serialize`` includes re-reading and filtering the
+    sources.
+    """
+    if profile is None:
+        profile = payload.get("profile")
+    if hooks is None:
+        hooks = payload.get("hooks")
+    timings = {} if profile is not None else None
+    os.makedirs(os.path.dirname(payload["output_path"]) or ".", exist_ok=True)
+    count = write_xml_stream(
+        iter_payload_messages(payload),
+        payload["output_path"],
         include_reactions=payload["include_reactions"],
         human_readable=payload["human_readable"],
         include_media_meta=payload["include_media_meta"],
         include_entities=payload["include_entities"],
+        workers=workers,
+        progress=progress,
+        cancel_event=cancel_event,
+        timings=timings,
+        hooks=chain_hooks(profile, hooks),
     )
-    os.makedirs(os.path.dirname(payload["output_path"]) or ".", exist_ok=True)
-    tree.write(payload["output_path"], encoding="utf-8", xml_declaration=True)
+    if profile is not None:
+        profile.split("serialize", "write", timings["write_seconds"], timings["write_cpu_seconds"])
+        profile.stages["write"]["messages"] += count
+        profile.stages["write"]["bytes"] += os.path.getsize(payload["output_path"])
+    if payload.get("alias_map") and payload.get("anonymizer") is not None:
+        payload["anonymizer"].save(payload["alias_map"])
+    return count
 
 
 def build_replay_command(payload: dict[str, Any], *, no_color: bool, plain: bool) -> str:
@@ -181,8 +349,32 @@ def build_replay_command(payload: dict[str, Any], *, no_color: bool, plain: bool
         parts.append("--include-entities")
     if payload["anonymize"]:
         parts.append("--anonymize")
+        if payload.get("alias_map"):
+            parts.extend(["--alias-map", payload["alias_map"]])
     if payload["validate_input"]:
         parts.append("--validate-input")
+    if payload.get("streaming"):
+        parts.append("--stream")
+    if not payload.get("use_cache", True):
+        parts.append("--no-cache")
+    if payload.get("workers", 1) != 1:
+        parts.extend(["--workers", str(payload["workers"])])
+    if payload.get("load_workers", 1) != 1:
+        parts.extend(["--load-workers", str(payload["load_workers"])])
+    profile = payload.get("profile")
+    if profile is not None:
+        if profile.dump_path:
+            parts.extend(["--profile-dump", profile.dump_path])
+        else:
+            parts.append("--profile")
+    hooks = payload.get("hooks")
+    if hooks is not None:
+        from src.tgxml.metrics import MetricsHooks
+
+        if isinstance(hooks, MetricsHooks):
+            parts.extend(["--metrics", hooks.target])
+            if hooks.fmt != "statsd":
+                parts.extend(["--metrics-format", hooks.fmt])
     if no_color:
         parts.append("--no-color")
     if plain:
@@ -0,0 +1,155 @@
+"""Optional NumPy-backed columnar view of a loaded export.
+
+With NumPy installed, filter queries run as boolean-mask operations over
+the columns. Without it the same API answers through MessageIndex, so
+callers never need to check which backend is in use.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import new_filter_stats  # noqa: E402
+from src.tgxml.message_index import (  # noqa: E402
+    KIND_EMPTY,
+    KIND_OTHER,
+    KIND_SERVICE,
+    MessageIndex,
+    bound_ordinal,
+)
+
+# Author code of messages without a (truthy) sender.
+NO_AUTHOR = -1
+
+
+class MessageTable:
+    """Per-message columns: day ordinal, author code and kind.
+
+    Columns are NumPy arrays when NumPy is available and ``array`` objects
+    otherwise. ``author_names[code]`` maps author codes back to names.
+    """
+
+    def __init__(self, messages: list[Any], index: MessageIndex | None = None):
+        self.index = index if index is not None else MessageIndex(messages)
+        self.messages = self.index.messages
+        count = len(self.messages)
+
+        self.author_names: list[Any] = []
+        self.author_codes: dict[Any, int] = {}
+        author = array("l", [NO_AUTHOR]) * count
+        kinds = self.index.kinds
+        for pos, name in enumerate(self.index.authors):
+            if kinds[pos] == KIND_OTHER:
+                continue
+            if name:
+                code = self.author_codes.get(name)
+                if code is None:
+                    code = self.author_codes[name] = len(self.author_names)
+                    self.author_names.append(name)
+                author[pos] = code
+
+        if np is not None:
+            self.day = np.asarray(self.index.dates.ordinals, dtype=np.int64)
+            self.author = np.asarray(author, dtype=np.int32)
+            self.kind = np.frombuffer(bytes(kinds), dtype=np.uint8)
+        else:
+            self.day = self.index.dates.ordinals
+            self.author = author
+            self.kind = kinds
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def filter_positions(
+        self,
+        selected_authors: Iterable[str] | None = None,
+        start_date: str = "",
+        end_date: str = "",
+        use_date_range: bool = False,
+        require_text: bool = True,
+        include_service: bool = False,
+        stats: dict[str, int] | None = None,
+    ) -> Sequence[int]:
+        """Same result as filter_message_positions over the table's messages."""
+        start = end = None
+        if use_date_range:
+            start = bound_ordinal(start_date) if start_date else None
+            end = bound_ordinal(end_date, is_end=True) if end_date else None
+        vectorizable = (
+            np is not None
+            and not (start_date and use_date_range and start is None)
+            and not (end_date and use_date_range and end is None)
+            and not (self.index.irregular_dates and (start or end))
+        )
+        if not vectorizable:
+            return self.index.filter_positions(
+                selected_authors=selected_authors,
+                start_date=start_date,
+                end_date=end_date,
+                use_date_range=use_date_range,
+                require_text=require_text,
+                include_service=include_service,
+                stats=stats,
+            )
+
+        # Masks follow the check order of classify_message, so every
+        # message lands in the same stats bucket.
+        kind = self.kind
+        is_service = kind == KIND_SERVICE
+        passed = kind >= KIND_EMPTY
+        if include_service:
+            passed |= is_service
+        counts = {
+            "excluded_non_message": int(np.count_nonzero(kind == KIND_OTHER)),
+            "excluded_service": 0 if include_service else int(np.count_nonzero(is_service)),
+        }
+
+        selected = set(selected_authors or ())
+        if selected:
+            codes = [self.author_codes[a] for a in selected if a in self.author_codes]
+            author_ok = (self.author == NO_AUTHOR) | np.isin(self.author, codes)
+            counts["excluded_author"] = int(np.count_nonzero(passed & ~author_ok))
+            passed &= author_ok
+
+        if require_text:
+            empty = passed & (kind == KIND_EMPTY)
+            counts["excluded_empty_text"] = int(np.count_nonzero(empty))
+            passed &= ~empty
+
+        if start is not None or end is not None:
+            in_range = np.ones(len(kind), dtype=bool)
+            if start is not None:
+                in_range &= self.day >= start
+            if end is not None:
+                in_range &= self.day <= end
+            counts["excluded_date"] = int(np.count_nonzero(passed & ~in_range))
+            passed &= in_range
+
+        positions = np.flatnonzero(passed)
+        if stats is not None:
+            counts["total_items"] = len(kind)
+            counts["included"] = len(positions)
+            for key, value in counts.items():
+                stats[key] += value
+        return positions.tolist()
+
+    def filter_messages(self, *args: Any, return_stats: bool = False, **kwargs: Any):
+        """Same result as filter_messages over the table's messages."""
+        stats = new_filter_stats()
+        positions = self.filter_positions(*args, stats=stats, **kwargs)
+        messages = self.messages
+        filtered = [messages[pos] for pos in positions]
+        return (filtered, stats) if return_stats else filtered
+
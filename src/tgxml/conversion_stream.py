@@ -0,0 +1,193 @@
+"""Conversion as an iterator of encoded XML chunks, for sockets, uploads and compressors."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import (  # noqa: E402
+    Anonymizer,
+    ConversionCancelled,
+    PipelineHooks,
+    hook_stage,
+    iter_streamed_messages,
+    iter_xml_fragments,
+    new_filter_stats,
+    prepare_messages,
+    required_message_fields,
+)
+from .models import ConversionOptions, ConversionResult  # noqa: E402
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+
+class ConversionStream:
+    """Iterable of UTF-8 XML chunks for ``options``; ``result`` once exhausted.
+
+    Iterating runs the conversion and yields ``bytes`` of about
+    ``chunk_size`` characters each; joined, they are exactly the file
+    convert_json_to_xml_file writes for the same options.
+    ``options.output_path`` is only echoed in the result. ``result`` (a
+    ConversionResult) is set after the last chunk; validation issues and
+    filter stats are complete only then.
+
+    Without ``streaming`` the filtered messages are held as compact records
+    before the first chunk; with it, sources are read, filtered and
+    serialized message by message. A streamed source that goes back in
+    date after earlier message ids were forgotten stops iteration with
+    SourceOrderError, as duplicates could slip through; iterate a new
+    stream with ``ordered=False`` (keeps every id) or without
+    ``streaming``. ``workers``, ``load_workers``, ``use_cache``,
+    ``alias_map`` and ``hooks`` work as in convert_json_to_xml_file; the
+    ``serialize`` stage also spans the time the consumer takes between
+    chunks. Setting ``cancel_event`` stops iteration with
+    ConversionCancelled. A stream can be iterated once.
+    """
+
+    def __init__(
+        self,
+        options: ConversionOptions,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        streaming: bool = False,
+        workers: int = 1,
+        load_workers: int = 1,
+        ordered: bool | None = None,
+        use_cache: bool = True,
+        alias_map: str | None = None,
+        hooks: PipelineHooks | None = None,
+        cancel_event: Any = None,
+    ):
+        self.options = options
+        self.chunk_size = chunk_size
+        self.streaming = streaming
+        self.workers = workers
+        self.load_workers = load_workers
+        self.ordered = ordered
+        self.use_cache = use_cache
+        self.alias_map = alias_map
+        self.hooks = hooks
+        self.cancel_event = cancel_event
+        self.result: ConversionResult | None = None
+        self._chunks: Iterator[bytes] | None = None
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._chunks is None:
+            self._chunks = self._generate()
+        return self._chunks
+
+    def close(self) -> None:
+        """Stop a partially consumed stream and release its sources."""
+        if self._chunks is not None:
+            self._chunks.close()
+
+    def _generate(self) -> Iterator[bytes]:
+        opts = self.options
+        source_paths = list(opts.source_paths)
+        validation_issues: list[str] = []
+        if self.streaming:
+            anonymizer = None
+            if opts.anonymize:
+                anonymizer = Anonymizer.load(self.alias_map) if self.alias_map else Anonymizer()
+            filter_stats = new_filter_stats()
+            messages = iter_streamed_messages(
+                source_paths,
+                selected_authors=opts.selected_authors or set(),
+                start_date=opts.start_date,
+                end_date=opts.end_date,
+                use_date_range=opts.use_date_range,
+                include_service=opts.include_service,
+                anonymizer=anonymizer,
+                fields=required_message_fields(
+                    include_reactions=opts.include_reactions,
+                    include_media_meta=opts.include_media_meta,
+                    include_entities=opts.include_entities,
+                ),
+                stats=filter_stats,
+                validation_issues=validation_issues if opts.validate_input else None,
+                ordered=self.ordered,
+            )
+        else:
+            prepared = prepare_messages(
+                source_paths,
+                selected_authors=opts.selected_authors,
+                start_date=opts.start_date,
+                end_date=opts.end_date,
+                use_date_range=opts.use_date_range,
+                include_reactions=opts.include_reactions,
+                include_service=opts.include_service,
+                include_media_meta=opts.include_media_meta,
+                include_entities=opts.include_entities,
+                anonymize=opts.anonymize,
+                validate_input=opts.validate_input,
+                use_cache=self.use_cache,
+                load_workers=self.load_workers,
+                alias_map=self.alias_map,
+                hooks=self.hooks,
+            )
+            messages = prepared["messages"]
+            filter_stats = prepared["filter_stats"]
+            validation_issues = prepared["validation_issues"]
+            anonymizer = prepared["anonymizer"]
+
+        serialize = iter_xml_fragments
+        extra = {}
+        if self.workers != 1:
+            from .parallel import iter_xml_fragments_parallel
+
+            serialize = iter_xml_fragments_parallel
+            extra = {"workers": self.workers}
+        fragments = serialize(
+            self._checked(messages),
+            include_reactions=opts.include_reactions,
+            human_readable=opts.human_readable,
+            include_media_meta=opts.include_media_meta,
+            include_entities=opts.include_entities,
+            **extra,
+        )
+        try:
+            with hook_stage(self.hooks, "serialize") as counts:
+                pending = [XML_DECLARATION]
+                size = len(XML_DECLARATION)
+                for fragment in fragments:
+                    pending.append(fragment)
+                    size += len(fragment)
+                    if size >= self.chunk_size:
+                        chunk = "".join(pending).encode("utf-8", "xmlcharrefreplace")
+                        counts["bytes"] += len(chunk)
+                        yield chunk
+                        pending.clear()
+                        size = 0
+                counts["messages"] = filter_stats["included"]
+                if pending:
+                    chunk = "".join(pending).encode("utf-8", "xmlcharrefreplace")
+                    counts["bytes"] += len(chunk)
+                    yield chunk
+        finally:
+            fragments.close()
+
+        if self.alias_map and anonymizer is not None:
+            anonymizer.save(self.alias_map)
+        self.result = ConversionResult(
+            messages=filter_stats["included"],
+            output_path=opts.output_path,
+            filter_stats=filter_stats,
+            validation_issues=validation_issues,
+        )
+
+    def _checked(self, messages):
+        cancel_event = self.cancel_event
+        if cancel_event is None:
+            yield from messages
+            return
+        for count, message in enumerate(messages):
+            if cancel_event.is_set():
+                raise ConversionCancelled(f"Cancelled after {count} messages")
+            yield message
+
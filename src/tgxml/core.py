@@ -9,30 +9,66 @@ if str(ROOT) not in sys.path:
 
 from jsontoxml import (
     normalize_text_content,
+    normalize_message_text,
     extract_message_date,
     filter_messages,
+    iter_filter_messages,
+    filter_message_positions,
+    normalize_date_bound,
     build_message_element,
+    serialize_message_xml,
+    iter_xml_fragments,
     indent_xml,
     load_json_file,
+    TelegramExportStream,
+    iter_export_messages,
+    merge_message_streams,
+    messages_in_date_order,
+    SourceOrderError,
+    iter_streamed_messages,
     get_available_authors,
     get_date_range_from_messages,
     build_xml_tree,
     convert_json_to_xml_file,
+    write_xml_stream,
+    ConversionCancelled,
+    PipelineHooks,
+    chain_hooks,
     validate_telegram_export,
     anonymize_messages,
+    Anonymizer,
 )
+from .conversion_stream import ConversionStream
 
 __all__ = [
     "normalize_text_content",
+    "normalize_message_text",
     "extract_message_date",
     "filter_messages",
+    "iter_filter_messages",
+    "filter_message_positions",
+    "normalize_date_bound",
     "build_message_element",
+    "serialize_message_xml",
+    "iter_xml_fragments",
     "indent_xml",
     "load_json_file",
+    "TelegramExportStream",
+    "iter_export_messages",
+    "merge_message_streams",
+    "messages_in_date_order",
+    "SourceOrderError",
+    "iter_streamed_messages",
     "get_available_authors",
     "get_date_range_from_messages",
     "build_xml_tree",
     "convert_json_to_xml_file",
+    "write_xml_stream",
+    "ConversionCancelled",
+    "PipelineHooks",
+    "chain_hooks",
     "validate_telegram_export",
     "anonymize_messages",
+    "Anonymizer",
+    "ConversionStream",
 ]
@@ -0,0 +1,281 @@
+"""Per-source message index answering filter queries without rescanning messages."""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from datetime import date
+from itertools import chain
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import (  # noqa: E402
+    extract_message_date,
+    filter_message_positions,
+    new_filter_stats,
+    normalize_date_bound,
+    normalize_text_content,
+)
+
+# What a message is, as far as the filters are concerned.
+KIND_OTHER = 0
+KIND_SERVICE = 1
+KIND_EMPTY = 2
+KIND_TEXT = 3
+
+# Day ordinal of messages without a usable date; sorts before every real day.
+NO_DATE = 0
+
+
+def date_ordinal(date_str: str) -> int:
+    """Day ordinal of a ``YYYY-MM-DD`` string, NO_DATE when it is not one."""
+    if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+        return NO_DATE
+    try:
+        return date.fromisoformat(date_str).toordinal()
+    except (TypeError, ValueError):
+        return NO_DATE
+
+
+def bound_ordinal(bound: str, is_end: bool = False) -> int | None:
+    """Day ordinal of a filter bound, or None when it cannot be indexed."""
+    bound = normalize_date_bound(bound, is_end=is_end)
+    ordinal = date_ordinal(bound)
+    return ordinal if ordinal != NO_DATE else None
+
+
+class DateIndex:
+    """Message day ordinals kept sorted for bisect-based range queries.
+
+    Exports are sorted by date, so positions usually are the sorted order
+    and a range is a plain ``range``. Unsorted inputs (merged sources) keep
+    an extra permutation and pay a sort of the matching positions.
+    """
+
+    def __init__(self, ordinals: Sequence[int]):
+        self.ordinals = array("l", ordinals)
+        self.is_sorted = all(a <= b for a, b in zip(self.ordinals, self.ordinals[1:]))
+        if self.is_sorted:
+            self._order = None
+            self._sorted = self.ordinals
+        else:
+            self._order = array("l", sorted(range(len(self.ordinals)), key=self.ordinals.__getitem__))
+            self._sorted = array("l", [self.ordinals[pos] for pos in self._order])
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def span(self, start: int | None = None, end: int | None = None) -> tuple[int, int]:
+        """Slice of the sorted ordinals that lies within ``[start, end]``."""
+        lo = bisect_left(self._sorted, start) if start is not None else 0
+        hi = bisect_right(self._sorted, end) if end is not None else len(self._sorted)
+        return lo, max(lo, hi)
+
+    def positions(self, start: int | None = None, end: int | None = None) -> Sequence[int]:
+        """Ascending message positions whose day lies within ``[start, end]``."""
+        lo, hi = self.span(start, end)
+        if self._order is None:
+            return range(lo, hi)
+        return sorted(self._order[lo:hi])
+
+    def count(self, start: int | None = None, end: int | None = None) -> int:
+        lo, hi = self.span(start, end)
+        return hi - lo
+
+    def first_last(self) -> tuple[int, int] | None:
+        """Earliest and latest dated day, or None when nothing is dated."""
+        lo = bisect_right(self._sorted, NO_DATE)
+        if lo >= len(self._sorted):
+            return None
+        return self._sorted[lo], self._sorted[-1]
+
+
+def classify_kind(message: Any) -> int:
+    if not isinstance(message, Mapping):
+        return KIND_OTHER
+    msg_type = message.get("type")
+    if msg_type == "service":
+        return KIND_SERVICE
+    if msg_type != "message":
+        return KIND_OTHER
+    if normalize_text_content(message.get("text", "")).strip():
+        return KIND_TEXT
+    return KIND_EMPTY
+
+
+class MessageIndex:
+    """Filter-relevant columns of a message list, built in one pass.
+
+    Holds each message's kind, author and day plus per-author kind counts.
+    Date-filtered queries only visit messages inside the range; counters for
+    everything else follow from the per-author counts, so ``filter_stats``
+    match filter_messages exactly.
+    """
+
+    def __init__(self, messages: list[Any]):
+        self.messages = messages
+        self.kinds = bytearray(len(messages))
+        self.authors: list[Any] = [None] * len(messages)
+        self.kind_counts: dict[Any, list[int]] = {}
+        # Ascending positions of the messages sent by each author.
+        self.author_positions: dict[Any, array] = {}
+        # Dates that are neither empty nor YYYY-MM-DD compare as strings in
+        # filter_messages; queries fall back to it when any are present.
+        self.irregular_dates = 0
+        ordinals = array("l", [NO_DATE]) * len(messages)
+        for pos, message in enumerate(messages):
+            kind = classify_kind(message)
+            self.kinds[pos] = kind
+            if kind == KIND_OTHER:
+                self.kind_counts.setdefault(None, [0, 0, 0, 0])[kind] += 1
+                continue
+            author = message.get("from", "")
+            self.authors[pos] = author
+            self.kind_counts.setdefault(author, [0, 0, 0, 0])[kind] += 1
+            self.author_positions.setdefault(author, array("l")).append(pos)
+            day = extract_message_date(message)
+            ordinals[pos] = date_ordinal(day)
+            if day and ordinals[pos] == NO_DATE:
+                self.irregular_dates += 1
+        self.dates = DateIndex(ordinals)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def filter_positions(
+        self,
+        selected_authors: Iterable[str] | None = None,
+        start_date: str = "",
+        end_date: str = "",
+        use_date_range: bool = False,
+        require_text: bool = True,
+        include_service: bool = False,
+        stats: dict[str, int] | None = None,
+    ) -> list[int]:
+        """Same result as filter_message_positions over the indexed messages."""
+        selected_authors = set(selected_authors or ())
+        start = end = None
+        if use_date_range:
+            start = bound_ordinal(start_date) if start_date else None
+            end = bound_ordinal(end_date, is_end=True) if end_date else None
+            unindexable = (start_date and start is None) or (end_date and end is None)
+            if unindexable or (self.irregular_dates and (start or end)):
+                return filter_message_positions(
+                    self.messages,
+                    selected_authors=selected_authors,
+                    start_date=start_date,
+                    end_date=end_date,
+                    use_date_range=use_date_range,
+                    require_text=require_text,
+                    include_service=include_service,
+                    stats=stats,
+                )
+
+        if selected_authors:
+            # Unnamed senders are never filtered out by author.
+            keys = [a for a in self.author_positions if not a or a in selected_authors]
+            candidates = self.positions_for_authors(keys, start, end)
+        else:
+            candidates = self.dates.positions(start, end)
+
+        kinds = self.kinds
+        kept = []
+        for pos in candidates:
+            kind = kinds[pos]
+            if kind == KIND_OTHER or (kind == KIND_SERVICE and not include_service):
+                continue
+            if kind == KIND_EMPTY and require_text:
+                continue
+            kept.append(pos)
+
+        if stats is not None:
+            self._count(stats, selected_authors, require_text, include_service, len(kept))
+        return kept
+
+    def positions_for_authors(
+        self,
+        authors: Iterable[Any],
+        start: int | None = None,
+        end: int | None = None,
+    ) -> list[int]:
+        """Ascending positions sent by any of ``authors`` with a day in ``[start, end]``."""
+        lists = [self.author_positions[a] for a in authors if a in self.author_positions]
+        if start is None and end is None:
+            parts = lists
+        elif self.dates.is_sorted:
+            # Positions are in date order, so the range is a position slice
+            # and each list is cut with two bisects.
+            lo, hi = self.dates.span(start, end)
+            parts = [p[bisect_left(p, lo):bisect_left(p, hi)] for p in lists]
+        else:
+            ordinals = self.dates.ordinals
+            parts = [
+                [
+                    pos for pos in p
+                    if (start is None or ordinals[pos] >= start) and (end is None or ordinals[pos] <= end)
+                ]
+                for p in lists
+            ]
+        if len(parts) == 1:
+            return list(parts[0])
+        # Each part is an ascending run; sorting their concatenation is a merge.
+        return sorted(chain.from_iterable(parts))
+
+    def available_authors(self) -> list[str]:
+        """Same as get_available_authors over the indexed messages."""
+        return sorted(
+            author for author, counts in self.kind_counts.items()
+            if author and (counts[KIND_EMPTY] or counts[KIND_TEXT])
+        )
+
+    def date_bounds(self, positions: Sequence[int]) -> tuple[str, str]:
+        """Earliest and latest message date among ``positions``, as in get_date_range_from_messages."""
+        if self.irregular_dates:
+            messages = self.messages
+            dates = [d for d in (extract_message_date(messages[pos]) for pos in positions) if d]
+            return (min(dates), max(dates)) if dates else ("", "")
+        ordinals = self.dates.ordinals
+        dated = [ordinals[pos] for pos in positions if ordinals[pos] != NO_DATE]
+        if not dated:
+            return "", ""
+        return date.fromordinal(min(dated)).isoformat(), date.fromordinal(max(dated)).isoformat()
+
+    def filter_messages(self, *args: Any, return_stats: bool = False, **kwargs: Any):
+        """Same result as filter_messages over the indexed messages."""
+        stats = new_filter_stats()
+        positions = self.filter_positions(*args, stats=stats, **kwargs)
+        messages = self.messages
+        filtered = [messages[pos] for pos in positions]
+        return (filtered, stats) if return_stats else filtered
+
+    def _count(
+        self,
+        stats: dict[str, int],
+        selected_authors: set[str],
+        require_text: bool,
+        include_service: bool,
+        included: int,
+    ) -> None:
+        # Date is checked last, so every other counter is date-independent.
+        passed = 0
+        for author, (other, service, empty, text) in self.kind_counts.items():
+            stats["excluded_non_message"] += other
+            if not include_service:
+                stats["excluded_service"] += service
+                service = 0
+            if selected_authors and author and author not in selected_authors:
+                stats["excluded_author"] += service + empty + text
+                continue
+            if require_text:
+                stats["excluded_empty_text"] += empty
+                empty = 0
+            passed += service + empty + text
+        stats["total_items"] += len(self.messages)
+        stats["included"] += included
+        stats["excluded_date"] += passed - included
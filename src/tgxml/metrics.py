@@ -0,0 +1,131 @@
+"""Pipeline hooks that export stage metrics as StatsD lines or OpenMetrics text."""
+
+from __future__ import annotations
+
+import os
+import re
+import socket
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import PipelineHooks  # noqa: E402
+
+METRICS_FORMATS = ("statsd", "openmetrics")
+_UNSAFE_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+class MetricsHooks(PipelineHooks):
+    """Send stage durations, counts and progress to ``target``.
+
+    ``target`` is a file path, ``udp://host:port`` or ``unix:///path``
+    (a datagram socket). In ``statsd`` format each event becomes a few
+    lines (``tgxml.stage.parse.duration:412.0|ms``, ``...messages:N|c``,
+    ``tgxml.progress.serialize.bytes:N|g``) appended to the file or sent
+    as one datagram. In ``openmetrics`` format the current values of all
+    stages are rewritten to the file after each event, for textfile
+    collectors; it needs a file target. Call ``close`` when the run is done.
+    """
+
+    def __init__(self, target: str, fmt: str = "statsd", prefix: str = "tgxml"):
+        if fmt not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format: {fmt}")
+        self.target = target
+        self.fmt = fmt
+        self.prefix = _UNSAFE_NAME.sub("_", prefix)
+        self._socket = None
+        self._address: Any = None
+        self._file = None
+        self._stages: dict[str, dict[str, float]] = {}
+        if target.startswith(("udp://", "unix://")):
+            if fmt != "statsd":
+                raise ValueError("OpenMetrics output needs a file target")
+            if target.startswith("udp://"):
+                host, _, port = target[len("udp://"):].rpartition(":")
+                self._address = (host or "127.0.0.1", int(port))
+                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            else:
+                self._address = target[len("unix://"):]
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        elif fmt == "statsd":
+            self._file = open(target, "a", encoding="utf-8")
+
+    def _entry(self, stage: str) -> dict[str, float]:
+        return self._stages.setdefault(stage, {"seconds": 0.0, "messages": 0, "bytes": 0, "progress": 0})
+
+    def stage_start(self, stage: str) -> None:
+        self._entry(stage)
+
+    def stage_end(self, stage: str, seconds: float, messages: int = 0, nbytes: int = 0) -> None:
+        entry = self._entry(stage)
+        entry["seconds"] += seconds
+        entry["messages"] += messages
+        entry["bytes"] += nbytes
+        entry["progress"] = max(entry["progress"], messages)
+        name = f"{self.prefix}.stage.{_UNSAFE_NAME.sub('_', stage)}"
+        self._emit(
+            [
+                f"{name}.duration:{seconds * 1000:.3f}|ms",
+                f"{name}.messages:{messages}|c",
+                f"{name}.bytes:{nbytes}|c",
+            ]
+        )
+
+    def progress(self, stage: str, messages: int, nbytes: int = 0) -> None:
+        self._entry(stage)["progress"] = messages
+        name = f"{self.prefix}.progress.{_UNSAFE_NAME.sub('_', stage)}"
+        lines = [f"{name}.messages:{messages}|g"]
+        if nbytes:
+            lines.append(f"{name}.bytes:{nbytes}|g")
+        self._emit(lines)
+
+    def _emit(self, statsd_lines: list[str]) -> None:
+        if self.fmt == "openmetrics":
+            self._write_openmetrics()
+        elif self._socket is not None:
+            try:
+                self._socket.sendto("\n".join(statsd_lines).encode("utf-8"), self._address)
+            except OSError:
+                # Metrics are best effort; a missing collector must not fail the export.
+                pass
+        else:
+            self._file.write("\n".join(statsd_lines) + "\n")
+            self._file.flush()
+
+    def render_openmetrics(self) -> str:
+        """OpenMetrics text of the stage totals so far."""
+        families = (
+            ("stage_duration_seconds", "seconds", "Wall time spent in a conversion stage."),
+            ("stage_messages", "messages", "Messages handled by a conversion stage."),
+            ("stage_bytes", "bytes", "Bytes read or written by a conversion stage."),
+            ("stage_progress_messages", "progress", "Messages processed so far by a running stage."),
+        )
+        lines = []
+        for family, key, help_text in families:
+            metric = f"{self.prefix}_{family}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"# HELP {metric} {help_text}")
+            for stage, entry in self._stages.items():
+                lines.append(f'{metric}{{stage="{stage}"}} {entry[key]}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _write_openmetrics(self) -> None:
+        tmp_path = f"{self.target}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_openmetrics())
+        os.replace(tmp_path, self.target)
+
+    def close(self) -> None:
+        if self.fmt == "openmetrics":
+            self._write_openmetrics()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
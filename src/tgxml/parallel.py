@@ -0,0 +1,163 @@
+"""Process-pool source loading and XML serialization for large exports on multi-core hosts."""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections import deque
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import serialize_message_xml, validate_telegram_export  # noqa: E402
+from src.tgxml.source_cache import load_source  # noqa: E402
+
+DEFAULT_CHUNK_BYTES = 1 << 20
+MAX_CHUNK_MESSAGES = 20_000
+# Fixed per-message markup (tags, id, date, sender) and per-child overhead.
+_MESSAGE_OVERHEAD_BYTES = 120
+_CHILD_OVERHEAD_BYTES = 40
+
+
+def resolve_workers(workers: int | None) -> int:
+    """Map a worker option to a process count; 0 or None means one per CPU."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _load_source_task(
+    path: str,
+    use_cache: bool,
+    fields: frozenset[str] | None,
+    validate: bool,
+) -> tuple[Any, list[str]]:
+    data = load_source(path, use_cache=use_cache, fields=fields)
+    return data, validate_telegram_export(data) if validate else []
+
+
+def load_sources(
+    paths: list[str],
+    workers: int | None = 1,
+    *,
+    use_cache: bool = True,
+    fields: frozenset[str] | None = None,
+    validate: bool = False,
+) -> list[tuple[Any, list[str]]]:
+    """Parse (and validate) ``paths``, ``workers`` files at a time.
+
+    Returns ``(data, validation_issues)`` per path, in the order of
+    ``paths``, so merging the results does not depend on which file
+    finished first. Each file is parsed and validated in one worker
+    process; with one worker or one path everything runs in-process.
+    """
+    workers = min(resolve_workers(workers), len(paths))
+    if workers <= 1:
+        return [_load_source_task(path, use_cache, fields, validate) for path in paths]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_load_source_task, path, use_cache, fields, validate) for path in paths]
+        return [future.result() for future in futures]
+
+
+def estimate_message_bytes(message: Any) -> int:
+    """Cheap upper-bound guess of a message's serialized size, used for chunking."""
+    if not isinstance(message, Mapping):
+        return _MESSAGE_OVERHEAD_BYTES
+    text = message.get("text", "")
+    if isinstance(text, list):
+        size = sum(
+            len(part.get("text", "")) if isinstance(part, dict) else len(str(part))
+            for part in text
+        )
+    else:
+        size = len(text) if isinstance(text, str) else 0
+    children = len(message.get("reactions") or ()) + len(message.get("text_entities") or ())
+    return _MESSAGE_OVERHEAD_BYTES + size + children * _CHILD_OVERHEAD_BYTES
+
+
+def chunk_messages(
+    messages: Iterable[Any],
+    target_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[list[Any]]:
+    """Group messages into chunks of roughly ``target_bytes`` of output each.
+
+    Chunks of short messages hold many of them and chunks of long messages
+    few, so every task costs a worker about the same.
+    """
+    chunk: list[Any] = []
+    chunk_bytes = 0
+    for message in messages:
+        chunk.append(message)
+        chunk_bytes += estimate_message_bytes(message)
+        if chunk_bytes >= target_bytes or len(chunk) >= MAX_CHUNK_MESSAGES:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+    if chunk:
+        yield chunk
+
+
+def _serialize_chunk(chunk: list[Any], options: dict[str, bool]) -> str:
+    return "".join([serialize_message_xml(message, **options) for message in chunk])
+
+
+def iter_xml_fragments_parallel(
+    messages: Iterable[Any],
+    workers: int | None = None,
+    include_reactions: bool = True,
+    human_readable: bool = True,
+    include_media_meta: bool = False,
+    include_entities: bool = False,
+    target_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[str]:
+    """Parallel counterpart of iter_xml_fragments with identical output.
+
+    Chunks are serialized in worker processes and yielded in input order.
+    At most two chunks per worker are in flight, so ``messages`` may be a
+    lazy stream.
+    """
+    options = {
+        "include_reactions": include_reactions,
+        "include_media_meta": include_media_meta,
+        "include_entities": include_entities,
+        "human_readable": human_readable,
+    }
+    workers = resolve_workers(workers)
+    started = False
+    for fragment in _iter_serialized_chunks(messages, workers, options, target_chunk_bytes):
+        if not started:
+            started = True
+            yield "<messages>\n  " if human_readable else "<messages>"
+        yield fragment
+    if not started:
+        yield "<messages />"
+    else:
+        yield "</messages>\n" if human_readable else "</messages>"
+
+
+def _iter_serialized_chunks(
+    messages: Iterable[Any],
+    workers: int,
+    options: dict[str, bool],
+    target_chunk_bytes: int,
+) -> Iterator[str]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for chunk in chunk_messages(messages, target_chunk_bytes):
+                pending.append(pool.submit(_serialize_chunk, chunk, options))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,110 @@
+"""Single-pass source profile behind the inspect screens and GUI widgets."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class SourceProfile:
+    """What a source contains, gathered in one pass over its messages.
+
+    Dates are the ``YYYY-MM-DD`` part of the ``date`` field and are ordered
+    as strings, like the rest of the converter. ``min_date``/``max_date``
+    cover every dated item; ``day_counts`` and the author tallies cover
+    regular (``type == "message"``) messages only.
+    """
+
+    total_items: int = 0
+    non_dict_items: int = 0
+    type_counts: Dict[str, int] = field(default_factory=dict)
+    author_counts: Dict[str, int] = field(default_factory=dict)
+    min_date: str = ""
+    max_date: str = ""
+    day_counts: Dict[str, int] = field(default_factory=dict)
+    author_day_counts: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    reaction_totals: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def authors(self) -> List[str]:
+        """Same as get_available_authors over the profiled messages."""
+        return sorted(self.author_counts)
+
+    @property
+    def years(self) -> List[str]:
+        return sorted({day[:4] for day in self.day_counts})
+
+    @property
+    def message_date_range(self) -> Tuple[str, str]:
+        """First and last day of regular messages."""
+        if not self.day_counts:
+            return "", ""
+        return min(self.day_counts), max(self.day_counts)
+
+    def top_authors(self, limit: int | None = None) -> List[Tuple[str, int]]:
+        ranked = sorted(self.author_counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def top_reactions(self, limit: int | None = None) -> List[Tuple[str, int]]:
+        ranked = sorted(self.reaction_totals.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_items": self.total_items,
+            "non_dict_items": self.non_dict_items,
+            "type_counts": dict(self.type_counts),
+            "authors": self.top_authors(),
+            "date_range": [self.min_date, self.max_date],
+            "years": self.years,
+            "reaction_totals": self.top_reactions(),
+        }
+
+
+def profile_messages(messages: list[Any]) -> SourceProfile:
+    """Build a SourceProfile with a single pass over ``messages``."""
+    profile = SourceProfile(total_items=len(messages))
+    type_counts = profile.type_counts
+    author_counts = profile.author_counts
+    day_counts = profile.day_counts
+    author_day_counts = profile.author_day_counts
+    reaction_totals = profile.reaction_totals
+    min_date = max_date = ""
+
+    for msg in messages:
+        if not isinstance(msg, dict):
+            profile.non_dict_items += 1
+            continue
+        msg_type = msg.get("type")
+        type_counts[msg_type] = type_counts.get(msg_type, 0) + 1
+
+        day = str(msg.get("date", "")).split("T")[0]
+        if day:
+            if not min_date or day < min_date:
+                min_date = day
+            if day > max_date:
+                max_date = day
+
+        for reaction in msg.get("reactions") or ():
+            if not isinstance(reaction, dict):
+                continue
+            emoji = reaction.get("emoji", "")
+            count = reaction.get("count", 0)
+            if emoji and isinstance(count, int) and count > 0:
+                reaction_totals[emoji] = reaction_totals.get(emoji, 0) + count
+
+        if msg_type != "message":
+            continue
+        if day:
+            day_counts[day] = day_counts.get(day, 0) + 1
+        author = msg.get("from", "")
+        if author:
+            author_counts[author] = author_counts.get(author, 0) + 1
+            if day:
+                per_day = author_day_counts.setdefault(author, {})
+                per_day[day] = per_day.get(day, 0) + 1
+
+    profile.min_date = min_date
+    profile.max_date = max_date
+    return profile
@@ -0,0 +1,173 @@
+"""Compact ``__slots__`` records for messages held in memory during a conversion."""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import MEDIA_META_KEYS, normalize_text_content  # noqa: E402
+
+_MISSING = object()
+
+# Message key -> slot holding its value ("from" is a keyword).
+_KEY_SLOTS = {
+    "id": "id",
+    "type": "type",
+    "date": "date",
+    "from": "sender",
+    "from_id": "from_id",
+    "actor": "actor",
+    "actor_id": "actor_id",
+    "action": "action",
+    "text": "text",
+    "reply_to_message_id": "reply_to",
+}
+_MEDIA_KEYS = frozenset(MEDIA_META_KEYS)
+_INTERNED_KEYS = frozenset(("type", "from", "actor", "action"))
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class MessageRecord(Mapping):
+    """Read-mostly mapping view of one message with a fixed set of slots.
+
+    Holds exactly what filtering and serialization read: the scalar fields,
+    ``text`` normalized once to a string, reactions as ``(emoji, count)``
+    pairs, entities as ``(type, text)`` pairs (``(type,)`` without text)
+    and media fields in one dict.
+    Author names, types, emoji and entity types are interned. Reactions and
+    entities are handed out as lists of dicts, so the record can stand in
+    for the message dict anywhere; ``to_dict`` returns a plain copy.
+    """
+
+    __slots__ = tuple(_KEY_SLOTS.values()) + ("_reactions", "_entities", "_media")
+
+    @classmethod
+    def from_message(cls, message: Mapping) -> "MessageRecord":
+        """Record of ``message``; fields nothing reads are dropped."""
+        record = cls()
+        for key, value in message.items():
+            record._store(key, value)
+        return record
+
+    def _store(self, key: str, value: Any) -> bool:
+        slot = _KEY_SLOTS.get(key)
+        if slot is not None:
+            if key == "text":
+                value = normalize_text_content(value)
+            elif key in _INTERNED_KEYS:
+                value = _intern(value)
+            setattr(self, slot, value)
+        elif key == "reactions":
+            if isinstance(value, list):
+                value = tuple(
+                    (_intern(r.get("emoji", "")), r.get("count", 0)) if isinstance(r, dict) else r
+                    for r in value
+                )
+            self._reactions = value
+        elif key == "text_entities":
+            if isinstance(value, list):
+                value = tuple(
+                    (_intern(e.get("type", "")), e["text"]) if "text" in e else (_intern(e.get("type", "")),)
+                    for e in value if isinstance(e, dict)
+                )
+            self._entities = value
+        elif key in _MEDIA_KEYS:
+            media = getattr(self, "_media", None)
+            if media is None:
+                media = self._media = {}
+            media[key] = value
+        else:
+            return False
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        slot = _KEY_SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot, default)
+        if key == "reactions":
+            reactions = getattr(self, "_reactions", _MISSING)
+            if reactions is _MISSING:
+                return default
+            if not isinstance(reactions, tuple):
+                return reactions
+            return [
+                {"emoji": r[0], "count": r[1]} if type(r) is tuple else r
+                for r in reactions
+            ]
+        if key == "text_entities":
+            entities = getattr(self, "_entities", _MISSING)
+            if entities is _MISSING:
+                return default
+            if not isinstance(entities, tuple):
+                return entities
+            return [
+                {"type": entity[0], "text": entity[1]} if len(entity) == 2 else {"type": entity[0]}
+                for entity in entities
+            ]
+        media = getattr(self, "_media", None)
+        if media is not None:
+            return media.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not self._store(key, value):
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in _KEY_SLOTS.items():
+            if hasattr(self, slot):
+                yield key
+        if hasattr(self, "_reactions"):
+            yield "reactions"
+        if hasattr(self, "_entities"):
+            yield "text_entities"
+        yield from getattr(self, "_media", None) or ()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"MessageRecord({self.to_dict()!r})"
+
+    def copy(self) -> "MessageRecord":
+        """Shallow copy; media fields get their own dict."""
+        record = MessageRecord()
+        for slot in self.__slots__:
+            value = getattr(self, slot, _MISSING)
+            if value is not _MISSING:
+                setattr(record, slot, dict(value) if slot == "_media" else value)
+        return record
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: self[key] for key in self}
+
+
+def compact_messages(messages: list[Any]) -> list[Any]:
+    """Replace message dicts in ``messages`` with MessageRecords, in place.
+
+    Each dict is released as soon as its record exists, so peak memory stays
+    at the size of the dict list. Non-dict items are left untouched.
+    """
+    from_message = MessageRecord.from_message
+    for pos, message in enumerate(messages):
+        if isinstance(message, dict):
+            messages[pos] = from_message(message)
+    return messages
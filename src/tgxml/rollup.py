@@ -0,0 +1,166 @@
+"""Pre-aggregated (author, day) rollup behind the interactive counters."""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import extract_message_date, normalize_date_bound  # noqa: E402
+from src.tgxml.message_index import KIND_TEXT, MessageIndex  # noqa: E402
+from src.tgxml.size_model import (  # noqa: E402
+    ROOT_BYTES_COMPACT,
+    ROOT_BYTES_PRETTY,
+    XML_DECLARATION_BYTES,
+    XmlSizeModel,
+)
+
+# (human_readable, include_reactions) combinations the cube keeps sizes for;
+# media and entities are not offered by the interactive frontends.
+SIZE_VARIANTS: Tuple[Tuple[bool, bool], ...] = (
+    (True, True),
+    (True, False),
+    (False, True),
+    (False, False),
+)
+
+
+@dataclass
+class RollupSlice:
+    """Totals for one author/date selection."""
+
+    messages: int = 0
+    sizes: Dict[Tuple[bool, bool], int] = field(default_factory=dict)
+    reactions: Dict[str, int] = field(default_factory=dict)
+    first_date: str = ""
+    last_date: str = ""
+
+    def xml_size(self, human_readable: bool = True, include_reactions: bool = True) -> int:
+        """Bytes of the XML file for this selection, 0 when it is empty."""
+        if not self.messages:
+            return 0
+        root = ROOT_BYTES_PRETTY if human_readable else ROOT_BYTES_COMPACT
+        return XML_DECLARATION_BYTES + root + self.sizes[(human_readable, include_reactions)]
+
+
+class _AuthorRollup:
+    """One author's messages grouped by day, with prefix sums over days."""
+
+    __slots__ = ("days", "counts", "sizes", "reactions", "first_dates", "last_dates")
+
+    def __init__(self, cells: Dict[str, list]):
+        self.days = sorted(cells)
+        self.counts = array("q", [0])
+        self.sizes = [array("q", [0]) for _ in SIZE_VARIANTS]
+        self.reactions: List[Dict[str, int] | None] = []
+        self.first_dates: List[str] = []
+        self.last_dates: List[str] = []
+        for day in self.days:
+            count, sizes, reactions, first, last = cells[day]
+            self.counts.append(self.counts[-1] + count)
+            for column, size in zip(self.sizes, sizes):
+                column.append(column[-1] + size)
+            self.reactions.append(reactions or None)
+            self.first_dates.append(first)
+            self.last_dates.append(last)
+
+    def span(self, start: str, end: str) -> Tuple[int, int]:
+        lo = bisect_left(self.days, start) if start else 0
+        hi = bisect_right(self.days, end) if end else len(self.days)
+        return lo, max(lo, hi)
+
+
+class RollupCube:
+    """Per-(author, day) message counts, XML sizes and reaction totals.
+
+    Only messages the interactive frontends can export are rolled up:
+    regular messages with non-empty text. A selection of authors and a
+    date range is answered from prefix sums over each author's days, so
+    counters never revisit the messages themselves. Day keys are compared
+    as strings with normalized bounds, exactly like filter_messages.
+    """
+
+    def __init__(self, messages: list[Any], index: MessageIndex | None = None,
+                 size_model: XmlSizeModel | None = None):
+        index = index if index is not None else MessageIndex(messages)
+        size_model = size_model if size_model is not None else XmlSizeModel(messages)
+        cells: Dict[Any, Dict[str, list]] = {}
+        kinds = index.kinds
+        for pos, message in enumerate(messages):
+            if kinds[pos] != KIND_TEXT:
+                continue
+            day = extract_message_date(message)
+            per_day = cells.setdefault(index.authors[pos], {})
+            cell = per_day.get(day)
+            if cell is None:
+                cell = per_day[day] = [0, [0] * len(SIZE_VARIANTS), {}, "", ""]
+            cell[0] += 1
+            sizes = cell[1]
+            for i, (human_readable, include_reactions) in enumerate(SIZE_VARIANTS):
+                sizes[i] += size_model.message_size(
+                    pos,
+                    human_readable=human_readable,
+                    include_reactions=include_reactions,
+                )
+            for reaction in message.get("reactions") or ():
+                if not isinstance(reaction, dict):
+                    continue
+                emoji = reaction.get("emoji", "")
+                count = reaction.get("count", 0)
+                if emoji and isinstance(count, int) and count > 0:
+                    cell[2][emoji] = cell[2].get(emoji, 0) + count
+            date_value = message.get("date")
+            if date_value and isinstance(date_value, str):
+                if not cell[3] or date_value < cell[3]:
+                    cell[3] = date_value
+                if date_value > cell[4]:
+                    cell[4] = date_value
+        self._authors = {author: _AuthorRollup(per_day) for author, per_day in cells.items()}
+
+    @property
+    def authors(self) -> List[Any]:
+        return list(self._authors)
+
+    def query(
+        self,
+        selected_authors: Iterable[str] | None = None,
+        start_date: str = "",
+        end_date: str = "",
+        use_date_range: bool = False,
+    ) -> RollupSlice:
+        """Totals for the messages filter_messages would keep with the same
+        authors and dates (require_text on, service messages off)."""
+        selected = set(selected_authors or ())
+        start = end = ""
+        if use_date_range:
+            start = normalize_date_bound(start_date)
+            end = normalize_date_bound(end_date, is_end=True)
+
+        result = RollupSlice(sizes={variant: 0 for variant in SIZE_VARIANTS})
+        first_dates = []
+        last_dates = []
+        for author, rollup in self._authors.items():
+            if selected and author and author not in selected:
+                continue
+            lo, hi = rollup.span(start, end)
+            if lo == hi:
+                continue
+            result.messages += rollup.counts[hi] - rollup.counts[lo]
+            for variant, column in zip(SIZE_VARIANTS, rollup.sizes):
+                result.sizes[variant] += column[hi] - column[lo]
+            for reactions in rollup.reactions[lo:hi]:
+                if reactions:
+                    for emoji, count in reactions.items():
+                        result.reactions[emoji] = result.reactions.get(emoji, 0) + count
+            first_dates.extend(d for d in rollup.first_dates[lo:hi] if d)
+            last_dates.extend(d for d in rollup.last_dates[lo:hi] if d)
+        result.first_date = min(first_dates, default="")
+        result.last_date = max(last_dates, default="")
+        return result
@@ -0,0 +1,135 @@
+"""Per-stage timings, throughput and peak memory of one conversion (``--profile``)."""
+
+from __future__ import annotations
+
+import cProfile
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import PipelineHooks  # noqa: E402
+
+
+def _peak_rss_mib(who: int) -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _new_stage() -> dict[str, Any]:
+    return {"wall_seconds": 0.0, "cpu_seconds": 0.0, "messages": 0, "bytes": 0}
+
+
+class RunProfile(PipelineHooks):
+    """Wall and CPU time, message and byte counts per pipeline stage.
+
+    Collects the stage events of the conversion it is passed to as hooks;
+    a stage reported several times accumulates. CPU time is that of this process,
+    so work done in ``--workers``/``--load-workers`` processes shows up as
+    wall time only.
+    With ``dump_path`` every stage runs under its own cProfile profiler and
+    ``finish`` writes the stats of the slowest one there. Stages must not
+    nest.
+    """
+
+    def __init__(self, dump_path: str | None = None):
+        self.dump_path = dump_path
+        self.stages: dict[str, dict[str, Any]] = {}
+        self._profilers: dict[str, cProfile.Profile] = {}
+        self._open: dict[str, tuple[float, float]] = {}
+        self._started = (time.perf_counter(), time.process_time())
+        self._finished: tuple[float, float] | None = None
+        self.pstats_stage: str | None = None
+
+    def stage_start(self, stage: str) -> None:
+        if self.dump_path:
+            self._profilers.setdefault(stage, cProfile.Profile()).enable()
+        self._open[stage] = (time.perf_counter(), time.process_time())
+
+    def stage_end(self, stage: str, seconds: float, messages: int = 0, nbytes: int = 0) -> None:
+        wall, cpu = self._open.pop(stage)
+        entry = self.stages.setdefault(stage, _new_stage())
+        entry["wall_seconds"] += time.perf_counter() - wall
+        entry["cpu_seconds"] += time.process_time() - cpu
+        if self.dump_path:
+            self._profilers[stage].disable()
+        entry["messages"] += messages
+        entry["bytes"] += nbytes
+
+    def split(self, name: str, into: str, wall_seconds: float, cpu_seconds: float = 0.0) -> None:
+        """Move time measured inside stage ``name`` to stage ``into``."""
+        source = self.stages[name]
+        target = self.stages.setdefault(into, _new_stage())
+        source["wall_seconds"] -= wall_seconds
+        source["cpu_seconds"] -= cpu_seconds
+        target["wall_seconds"] += wall_seconds
+        target["cpu_seconds"] += cpu_seconds
+
+    def finish(self) -> None:
+        """Stop the overall clock and write the cProfile dump, if requested."""
+        if self._finished is not None:
+            return
+        self._finished = (time.perf_counter(), time.process_time())
+        if self._profilers:
+            self.pstats_stage = max(self._profilers, key=lambda name: self.stages[name]["wall_seconds"])
+            self._profilers[self.pstats_stage].dump_stats(self.dump_path)
+
+    def as_dict(self) -> dict[str, Any]:
+        """JSON-ready summary, as shown under ``profile`` in ``--report-json``."""
+        end = self._finished or (time.perf_counter(), time.process_time())
+        stages = {}
+        for name, entry in self.stages.items():
+            wall = entry["wall_seconds"]
+            stages[name] = {
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(entry["cpu_seconds"], 4),
+                "messages": entry["messages"],
+                "bytes": entry["bytes"],
+                "messages_per_second": round(entry["messages"] / wall, 1) if wall > 0 and entry["messages"] else None,
+                "bytes_per_second": round(entry["bytes"] / wall, 1) if wall > 0 and entry["bytes"] else None,
+            }
+        return {
+            "stages": stages,
+            "wall_seconds": round(end[0] - self._started[0], 4),
+            "cpu_seconds": round(end[1] - self._started[1], 4),
+            "peak_rss_mib": _peak_rss_mib(resource.RUSAGE_SELF) if resource else None,
+            "children_peak_rss_mib": _peak_rss_mib(resource.RUSAGE_CHILDREN) if resource else None,
+            "pstats": {"stage": self.pstats_stage, "path": self.dump_path} if self.pstats_stage else None,
+        }
+
+
+def format_profile_report(profile: dict[str, Any]) -> str:
+    """Render ``RunProfile.as_dict()`` as a text table."""
+    lines = ["Profile:"]
+    for name, stage in profile["stages"].items():
+        rate = ""
+        if stage["messages_per_second"]:
+            rate += f"  {stage['messages_per_second']:>12,.0f} msg/s"
+        if stage["bytes_per_second"]:
+            rate += f"  {stage['bytes_per_second'] / 2**20:>8.1f} MiB/s"
+        lines.append(
+            f"  {name:<10} wall {stage['wall_seconds']:8.3f}s  cpu {stage['cpu_seconds']:8.3f}s{rate}"
+        )
+    lines.append(f"  {'total':<10} wall {profile['wall_seconds']:8.3f}s  cpu {profile['cpu_seconds']:8.3f}s")
+    memory = []
+    if profile["peak_rss_mib"] is not None:
+        memory.append(f"peak RSS {profile['peak_rss_mib']:.1f} MiB")
+    if profile["children_peak_rss_mib"]:
+        memory.append(f"child processes {profile['children_peak_rss_mib']:.1f} MiB")
+    if memory:
+        lines.append("  Memory: " + ", ".join(memory))
+    if profile["pstats"]:
+        lines.append(f"  cProfile stats of {profile['pstats']['stage']}: {profile['pstats']['path']}")
+    return "\n".join(lines)
@@ -0,0 +1,136 @@
+"""In-process source session shared by GUI, TUI and interactive CLI."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import normalize_message_text  # noqa: E402
+from src.tgxml.columnar import MessageTable  # noqa: E402
+from src.tgxml.message_index import MessageIndex  # noqa: E402
+from src.tgxml.profiler import SourceProfile, profile_messages  # noqa: E402
+from src.tgxml.rollup import RollupCube  # noqa: E402
+from src.tgxml.size_model import XmlSizeModel  # noqa: E402
+from src.tgxml.source_cache import load_source  # noqa: E402
+
+
+class _LoadedSource:
+    __slots__ = ("stat_key", "data", "derived")
+
+    def __init__(self, stat_key: tuple[int, int], data: Any):
+        self.stat_key = stat_key
+        self.data = data
+        self.derived: dict[str, tuple[Hashable, Any]] = {}
+
+
+def _stat_key(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class SourceSession:
+    """Parsed sources and data derived from them, kept for a frontend's lifetime.
+
+    A source is parsed once (through the parsed-source cache) and re-parsed
+    only when its size or mtime changes; everything derived from it is
+    dropped at the same time. Rich-text messages have their ``text``
+    normalized once at load, shared by filtering, the size model and
+    serialization.
+    """
+
+    def __init__(self, use_cache: bool = True):
+        self.use_cache = use_cache
+        self._sources: dict[str, _LoadedSource] = {}
+        # Frontends query the session from worker threads as well as the UI thread.
+        self._lock = threading.RLock()
+
+    def _entry(self, path: str) -> _LoadedSource:
+        key = os.path.abspath(path)
+        stat_key = _stat_key(path)
+        with self._lock:
+            entry = self._sources.get(key)
+            if entry is None or entry.stat_key != stat_key:
+                data = load_source(path, use_cache=self.use_cache)
+                if isinstance(data, dict) and isinstance(data.get("messages"), list):
+                    for message in data["messages"]:
+                        normalize_message_text(message)
+                entry = _LoadedSource(stat_key, data)
+                self._sources[key] = entry
+            return entry
+
+    def load(self, path: str) -> Any:
+        """Return parsed JSON of ``path``."""
+        return self._entry(path).data
+
+    def messages(self, path: str) -> list[Any]:
+        data = self.load(path)
+        return data.get("messages", []) if isinstance(data, dict) else []
+
+    def index(self, path: str) -> MessageIndex:
+        """Filter index over the messages of ``path``, built on first use."""
+        return self.derived(
+            path,
+            "message_index",
+            lambda data: MessageIndex(data.get("messages", []) if isinstance(data, dict) else []),
+        )
+
+    def table(self, path: str) -> MessageTable:
+        """Columnar view of ``path`` sharing its index; vectorized when NumPy is installed."""
+        index = self.index(path)
+        return self.derived(path, "message_table", lambda data: MessageTable(index.messages, index))
+
+    def profile(self, path: str) -> SourceProfile:
+        """Single-pass profile of ``path`` (authors, dates, types, reactions)."""
+        return self.derived(
+            path,
+            "profile",
+            lambda data: profile_messages(data.get("messages", []) if isinstance(data, dict) else []),
+        )
+
+    def size_model(self, path: str) -> XmlSizeModel:
+        """Per-message XML size model of ``path``; rows are filled on demand."""
+        return self.derived(path, "xml_size_model", lambda data: XmlSizeModel(self.messages(path)))
+
+    def rollup(self, path: str) -> RollupCube:
+        """(author, day) rollup of ``path`` for instant selection counters."""
+        index = self.index(path)
+        size_model = self.size_model(path)
+        return self.derived(path, "rollup", lambda data: RollupCube(index.messages, index, size_model))
+
+    def derived(
+        self,
+        path: str,
+        name: str,
+        factory: Callable[[Any], Any],
+        key: Hashable = None,
+    ) -> Any:
+        """Return ``factory(data)`` for ``path``, memoized under ``name``.
+
+        Each name holds one value; it is rebuilt when ``key`` differs from
+        the key it was built with or when the source changes. Builds run
+        outside the session lock, so a slow factory does not block readers
+        of other values.
+        """
+        entry = self._entry(path)
+        with self._lock:
+            cached = entry.derived.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = factory(entry.data)
+        with self._lock:
+            entry.derived[name] = (key, value)
+        return value
+
+    def invalidate(self, path: str | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._sources.clear()
+            else:
+                self._sources.pop(os.path.abspath(path), None)
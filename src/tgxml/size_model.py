@@ -0,0 +1,150 @@
+"""Analytical model of serialized XML size for any combination of output options."""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterable
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import serialize_message_parts, wrap_child_elements  # noqa: E402
+
+# "<?xml version='1.0' encoding='utf-8'?>\n"
+XML_DECLARATION_BYTES = 39
+EMPTY_ROOT_BYTES = len("<messages />")
+ROOT_BYTES_COMPACT = len("<messages>") + len("</messages>")
+# Pretty root adds "\n  " after <messages> and "\n" after </messages>.
+ROOT_BYTES_PRETTY = ROOT_BYTES_COMPACT + 3 + 1
+_END_TAG_BYTES = len("</message>")
+# indent_xml adds "\n    " after <message ...> and after <text>, plus the
+# message's own "\n  " tail.
+_MESSAGE_INDENT_BYTES = 5 + 5 + 3
+# Each further child gets a "\n    " tail; a non-empty <reactions>/<entities>
+# also gets "\n      " before every grandchild and before its end tag.
+_CHILD_INDENT_BYTES = 5
+_GRANDCHILD_INDENT_BYTES = 7
+
+_ABSENT = -1
+
+
+def encoded_size(text: str) -> int:
+    """Byte length of ``text`` as written by the XML writers."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8", "xmlcharrefreplace"))
+
+
+class XmlSizeModel:
+    """Per-message byte contributions, so output size is summed rather than serialized.
+
+    Rows are computed on first use and kept: the compact size of the message
+    with just its text, the compact size of its <reactions>, <media> and
+    <entities> elements (-1 when not emitted) and the number of
+    reaction/entity children, which determines the indentation overhead.
+    """
+
+    def __init__(self, messages: list[Any]):
+        self.messages = messages
+        count = len(messages)
+        self._base = array("q", [_ABSENT]) * count
+        self._reactions = array("q", [_ABSENT]) * count
+        self._reaction_children = array("q", [0]) * count
+        self._media = array("q", [_ABSENT]) * count
+        self._entities = array("q", [_ABSENT]) * count
+        self._entity_children = array("q", [0]) * count
+
+    def _compute_row(self, pos: int) -> None:
+        start_tag, text_xml, reactions, media, entities = serialize_message_parts(
+            self.messages[pos],
+            include_reactions=True,
+            include_media_meta=True,
+            include_entities=True,
+        )
+        self._base[pos] = encoded_size(start_tag) + encoded_size(text_xml) + _END_TAG_BYTES
+        if reactions is not None:
+            self._reactions[pos] = encoded_size(wrap_child_elements("reactions", reactions))
+            self._reaction_children[pos] = len(reactions)
+        if media is not None:
+            self._media[pos] = encoded_size(media)
+        if entities is not None:
+            self._entities[pos] = encoded_size(wrap_child_elements("entities", entities))
+            self._entity_children[pos] = len(entities)
+
+    def message_size(
+        self,
+        pos: int,
+        *,
+        human_readable: bool = True,
+        include_reactions: bool = True,
+        include_media_meta: bool = False,
+        include_entities: bool = False,
+    ) -> int:
+        """Bytes written for ``messages[pos]``, including its indentation."""
+        if self._base[pos] == _ABSENT:
+            self._compute_row(pos)
+        size = self._base[pos]
+        children = []
+        if include_reactions and self._reactions[pos] != _ABSENT:
+            size += self._reactions[pos]
+            children.append(self._reaction_children[pos])
+        if include_media_meta and self._media[pos] != _ABSENT:
+            size += self._media[pos]
+            children.append(0)
+        if include_entities and self._entities[pos] != _ABSENT:
+            size += self._entities[pos]
+            children.append(self._entity_children[pos])
+        if human_readable:
+            size += _MESSAGE_INDENT_BYTES
+            for grandchildren in children:
+                size += _CHILD_INDENT_BYTES
+                if grandchildren:
+                    size += _GRANDCHILD_INDENT_BYTES * (grandchildren + 1)
+        return size
+
+    def total_size(
+        self,
+        positions: Iterable[int],
+        *,
+        human_readable: bool = True,
+        include_reactions: bool = True,
+        include_media_meta: bool = False,
+        include_entities: bool = False,
+    ) -> int:
+        """Size of the whole XML file written for ``messages[pos]`` at ``positions``."""
+        positions = list(positions)
+        if not positions:
+            return XML_DECLARATION_BYTES + EMPTY_ROOT_BYTES
+
+        base = self._base
+        for pos in positions:
+            if base[pos] == _ABSENT:
+                self._compute_row(pos)
+
+        size = sum([base[pos] for pos in positions])
+        if human_readable:
+            size += _MESSAGE_INDENT_BYTES * len(positions)
+        optional = []
+        if include_reactions:
+            optional.append((self._reactions, self._reaction_children))
+        if include_media_meta:
+            optional.append((self._media, None))
+        if include_entities:
+            optional.append((self._entities, self._entity_children))
+        for column, child_counts in optional:
+            for pos in positions:
+                element_size = column[pos]
+                if element_size == _ABSENT:
+                    continue
+                size += element_size
+                if human_readable:
+                    size += _CHILD_INDENT_BYTES
+                    grandchildren = child_counts[pos] if child_counts is not None else 0
+                    if grandchildren:
+                        size += _GRANDCHILD_INDENT_BYTES * (grandchildren + 1)
+
+        root = ROOT_BYTES_PRETTY if human_readable else ROOT_BYTES_COMPACT
+        return XML_DECLARATION_BYTES + root + size
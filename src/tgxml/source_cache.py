@@ -0,0 +1,312 @@
+"""Persistent on-disk cache of parsed Telegram exports.
+
+Parsed sources are stored as pickles named by the blake2b digest of the
+source bytes, plus a tag of the message fields kept for projected loads
+(see required_message_fields). One small index file per source path
+records its last seen size, mtime and digest, so an unchanged file is
+resolved without re-hashing; each is replaced atomically, so concurrent
+runs on different sources never overwrite each other's records. A changed
+file is re-hashed; identical content found under another path or mtime
+reuses the existing entry. Entries live in a local, user-owned directory;
+never point the cache at a location others can write to.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from jsontoxml import load_json_file, user_app_dir  # noqa: E402
+
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+# Small exports parse faster than a cache round-trip is worth.
+DEFAULT_MIN_SOURCE_BYTES = 1024 ** 2
+
+_INDEX_DIR = "index"
+_INDEX_SUFFIX = ".json"
+_ENTRY_SUFFIX = ".pickle"
+
+
+def default_cache_dir() -> str:
+    """``TGXML_CACHE_DIR``, else the per-user cache directory of the platform."""
+    return os.environ.get("TGXML_CACHE_DIR") or user_app_dir("cache")
+
+
+def projection_tag(fields: frozenset[str] | None) -> str:
+    """Entry name suffix of a projection; empty for complete messages."""
+    if fields is None:
+        return ""
+    return "-" + hashlib.blake2b("\0".join(sorted(fields)).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceCache:
+    """Parsed-source cache with size/age eviction and change invalidation."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        min_source_bytes: int = DEFAULT_MIN_SOURCE_BYTES,
+    ):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.min_source_bytes = min_source_bytes
+
+    def load(self, path: str, fields: frozenset[str] | None = None) -> Any:
+        """Return parsed JSON of ``path``, from cache when the file is unchanged.
+
+        ``fields`` projects messages as in load_json_file. Each projection
+        is parsed and cached on its own, so a projected load never holds
+        the complete messages, even on a miss.
+        """
+        try:
+            before = os.stat(path)
+        except OSError:
+            return load_json_file(path, fields)
+        if before.st_size < self.min_source_bytes:
+            return load_json_file(path, fields)
+
+        key = os.path.abspath(path)
+        known = self._read_record(key)
+        if known and known["size"] == before.st_size and known["mtime_ns"] == before.st_mtime_ns:
+            digest = known["digest"]
+        else:
+            digest = file_digest(path)
+
+        data = self._read_entry(digest, fields)
+        if data is not None:
+            self._remember(key, known, before, digest)
+            return data
+
+        data = load_json_file(path, fields)
+        after = os.stat(path)
+        # Skip caching if the file changed while it was being read.
+        if (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns):
+            try:
+                self._write_entry(digest, data, fields)
+                self._remember(key, known, before, digest)
+                self.evict()
+            except OSError:
+                pass
+        return data
+
+    def invalidate(self, path: str) -> None:
+        """Forget ``path`` and drop its entry unless another path shares it."""
+        key = os.path.abspath(path)
+        known = self._read_record(key)
+        if known is None:
+            return
+        self._remove_record(key)
+        if not self._digest_in_use(known["digest"]):
+            self._remove_entry(known["digest"])
+
+    def evict(self) -> None:
+        """Drop entries older than max_age_seconds, then oldest-used until under max_bytes."""
+        entries = []
+        now = time.time()
+        for name in self._entry_names():
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(entry_path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age_seconds:
+                self._remove_file(name)
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove_file(name)
+            total -= size
+
+        live = {_entry_digest(name) for name in self._entry_names()}
+        for record_path, record in self._records():
+            if record["digest"] not in live:
+                _remove_path(record_path)
+
+    def clear(self) -> None:
+        for name in self._entry_names():
+            self._remove_file(name)
+        for record_path, _ in self._records():
+            _remove_path(record_path)
+
+    def _entry_names(self) -> list[str]:
+        try:
+            return [n for n in os.listdir(self.cache_dir) if n.endswith(_ENTRY_SUFFIX)]
+        except OSError:
+            return []
+
+    def _entry_path(self, digest: str, fields: frozenset[str] | None = None) -> str:
+        return os.path.join(self.cache_dir, digest + projection_tag(fields) + _ENTRY_SUFFIX)
+
+    def _read_entry(self, digest: str, fields: frozenset[str] | None = None) -> Any:
+        entry_path = self._entry_path(digest, fields)
+        gc_enabled = gc.isenabled()
+        # The cyclic GC repeatedly rescans the freshly built message dicts;
+        # pausing it makes loading several times faster.
+        gc.disable()
+        try:
+            with open(entry_path, "rb") as f:
+                fmt, data = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove_file(os.path.basename(entry_path))
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if fmt != CACHE_FORMAT:
+            self._remove_file(os.path.basename(entry_path))
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return data
+
+    def _write_entry(self, digest: str, data: Any, fields: frozenset[str] | None = None) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(digest, fields)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((CACHE_FORMAT, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remove_entry(self, digest: str) -> None:
+        """Remove the entries of ``digest``, complete and projected."""
+        for name in self._entry_names():
+            if _entry_digest(name) == digest:
+                self._remove_file(name)
+
+    def _remove_file(self, name: str) -> None:
+        _remove_path(os.path.join(self.cache_dir, name))
+
+    def _record_path(self, key: str) -> str:
+        name = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, _INDEX_DIR, name + _INDEX_SUFFIX)
+
+    def _read_record(self, key: str) -> dict[str, Any] | None:
+        record = _load_record(self._record_path(key))
+        return record if record is not None and record.get("path") == key else None
+
+    def _records(self) -> list[tuple[str, dict[str, Any]]]:
+        index_dir = os.path.join(self.cache_dir, _INDEX_DIR)
+        try:
+            names = [n for n in os.listdir(index_dir) if n.endswith(_INDEX_SUFFIX)]
+        except OSError:
+            return []
+        records = []
+        for name in names:
+            record_path = os.path.join(index_dir, name)
+            record = _load_record(record_path)
+            if record is not None:
+                records.append((record_path, record))
+        return records
+
+    def _digest_in_use(self, digest: str) -> bool:
+        return any(record["digest"] == digest for _, record in self._records())
+
+    def _remove_record(self, key: str) -> None:
+        _remove_path(self._record_path(key))
+
+    def _write_record(self, key: str, record: dict[str, Any]) -> None:
+        record_path = self._record_path(key)
+        index_dir = os.path.dirname(record_path)
+        os.makedirs(index_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, record_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remember(
+        self, key: str, previous: dict[str, Any] | None, st: os.stat_result, digest: str
+    ) -> None:
+        record = {"path": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        if previous == record:
+            return
+        try:
+            self._write_record(key, record)
+        except OSError:
+            return
+        if previous and previous["digest"] != digest and not self._digest_in_use(previous["digest"]):
+            self._remove_entry(previous["digest"])
+
+
+def _load_record(record_path: str) -> dict[str, Any] | None:
+    try:
+        with open(record_path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(record, dict) or not isinstance(record.get("digest"), str):
+        return None
+    return record
+
+
+def _remove_path(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _entry_digest(name: str) -> str:
+    return name[: -len(_ENTRY_SUFFIX)].split("-", 1)[0]
+
+
+_default_cache: SourceCache | None = None
+
+
+def get_default_cache() -> SourceCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SourceCache()
+    return _default_cache
+
+
+def load_source(path: str, use_cache: bool = True, fields: frozenset[str] | None = None) -> Any:
+    """Parse a source export, going through the default cache when enabled.
+
+    ``fields`` limits messages to the fields a conversion needs
+    (see required_message_fields).
+    """
+    if not use_cache:
+        return load_json_file(path, fields)
+    return get_default_cache().load(path, fields)
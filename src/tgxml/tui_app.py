@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -11,12 +12,22 @@ ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from jsontoxml import (  # noqa: E402
-    load_json_file,
-    get_available_authors,
-    get_date_range_from_messages,
-)
+from jsontoxml import ConversionCancelled  # noqa: E402
 from src.tgxml.cli_flow import build_conversion_payload, write_xml  # noqa: E402
+from src.tgxml.session import SourceSession  # noqa: E402
+
+# Minimum seconds between export progress updates.
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+
+class _WorkerCancelFlag:
+    """Exposes a Textual worker's cancellation as a cancel_event for write_xml."""
+
+    def __init__(self, worker):
+        self._worker = worker
+
+    def is_set(self) -> bool:
+        return self._worker.is_cancelled
 
 
 class TgXmlTextualApp:
@@ -29,6 +40,7 @@ class TgXmlTextualApp:
             from textual.containers import Horizontal, Vertical, Container
             from textual.screen import ModalScreen
             from textual.widgets import Header, Footer, Input, Checkbox, Button, Static, Label
+            from textual.worker import get_current_worker
             from rich.console import Group
             from rich.panel import Panel
             from rich.table import Table
@@ -54,6 +66,7 @@ class TgXmlTextualApp:
         self._Panel = Panel
         self._Table = Table
         self._Text = Text
+        self._get_current_worker = get_current_worker
 
     def build(self):
         App = self._App
@@ -74,6 +87,7 @@ class TgXmlTextualApp:
         Panel = self._Panel
         Table = self._Table
         Text = self._Text
+        get_current_worker = self._get_current_worker
 
         class HelpScreen(ModalScreen):
             CSS = """
@@ -98,6 +112,7 @@ class TgXmlTextualApp:
                         "Ctrl+R  Dry Run\n"
                         "Ctrl+E  Export\n"
                         "Ctrl+I  Inspect\n"
+                        "Ctrl+G  Cancel running action\n"
                         "Ctrl+Q  Quit\n"
                         "F1      Help\n"
                         "H       Go to Hub\n"
@@ -120,6 +135,7 @@ class TgXmlTextualApp:
                 Binding("ctrl+r", "run_dry", "Dry Run", show=True),
                 Binding("ctrl+e", "run_export", "Export", show=True),
                 Binding("ctrl+i", "run_inspect", "Inspect", show=True),
+                Binding("ctrl+g", "cancel_action", "Cancel", show=True),
                 Binding("f1", "show_help", "Help", show=True),
                 Binding("h", "go_hub", "Hub", show=True),
                 Binding("ctrl+q", "quit", "Quit", show=True),
@@ -177,6 +193,10 @@ class TgXmlTextualApp:
             def __init__(self, *args, **kwargs):
                 super().__init__(*args, **kwargs)
                 self.activity = []
+                self.session = SourceSession()
+                # (source stats, options) of the last prepared payload, and the payload
+                self._prepared_key = None
+                self._prepared = None
 
             def compose(self) -> ComposeResult:
                 yield Header(show_clock=False)
@@ -225,6 +245,7 @@ class TgXmlTextualApp:
                                 yield Button("Inspect", id="inspect", variant="default")
                                 yield Button("Dry Run", id="dry_run", variant="warning")
                                 yield Button("Export", id="export", variant="success")
+                                yield Button("Cancel", id="cancel", variant="default")
                                 yield Button("Hub", id="go_hub", variant="default")
                                 yield Button("Quit", id="quit", variant="error")
 
@@ -300,14 +321,18 @@ class TgXmlTextualApp:
                 date_start, date_end = result["date_range"]
                 date_text = f"{date_start} .. {date_end}" if date_start and date_end else "n/a"
                 overview.add_row("Sources", str(len(result["sources"])))
+                overview.add_row("Items", str(result["items_count"]))
                 overview.add_row("Authors", str(result["authors_count"]))
                 overview.add_row("Date range", date_text)
+                if result["reactions"]:
+                    overview.add_row("Reactions", "  ".join(f"{e} {c}" for e, c in result["reactions"]))
                 overview.add_row("Output", result["estimated_output"])
 
                 authors_table = Table(show_header=True, header_style="bold #7dd3fc", box=None)
                 authors_table.add_column("Top authors", overflow="fold")
-                for author in result["authors"][:12]:
-                    authors_table.add_row(author)
+                authors_table.add_column("Messages", justify="right")
+                for author, count in result["authors"][:12]:
+                    authors_table.add_row(author, str(count))
                 if not result["authors"]:
                     authors_table.add_row("No message authors found")
 
@@ -329,6 +354,7 @@ class TgXmlTextualApp:
                 stats_table.add_row("Excluded by author", str(stats["excluded_author"]))
                 stats_table.add_row("Excluded empty text", str(stats["excluded_empty_text"]))
                 stats_table.add_row("Excluded by date", str(stats["excluded_date"]))
+                stats_table.add_row("Excluded duplicates", str(stats.get("excluded_duplicate", 0)))
 
                 validation = payload["validation_issues"]
                 validation_text = "\n".join(validation[:8]) if validation else "No validation issues"
@@ -356,93 +382,175 @@ class TgXmlTextualApp:
                     )
                 )
 
-            def _collect_data(self):
+            def _read_form(self):
                 sources = self._sources()
                 if not sources:
                     raise ValueError("Add at least one source path")
 
-                output_path = self.query_one("#output", Input).value.strip()
-                selected_authors = self._authors()
-                start_date = self.query_one("#start_date", Input).value.strip()
-                end_date = self.query_one("#end_date", Input).value.strip()
+                return {
+                    "sources": tuple(sources),
+                    "output_path": self.query_one("#output", Input).value.strip(),
+                    "selected_authors": frozenset(self._authors()),
+                    "start_date": self.query_one("#start_date", Input).value.strip(),
+                    "end_date": self.query_one("#end_date", Input).value.strip(),
+                    "use_date_filter": self.query_one("#use_date_filter", Checkbox).value,
+                    "human_readable": self.query_one("#human_readable", Checkbox).value,
+                    "include_reactions": self.query_one("#include_reactions", Checkbox).value,
+                    "include_service": self.query_one("#include_service", Checkbox).value,
+                    "include_media": self.query_one("#include_media", Checkbox).value,
+                    "include_entities": self.query_one("#include_entities", Checkbox).value,
+                    "anonymize": self.query_one("#anonymize", Checkbox).value,
+                    "validate_input": self.query_one("#validate_input", Checkbox).value,
+                }
 
-                use_date_filter = self.query_one("#use_date_filter", Checkbox).value
-                human_readable = self.query_one("#human_readable", Checkbox).value
-                include_reactions = self.query_one("#include_reactions", Checkbox).value
-                include_service = self.query_one("#include_service", Checkbox).value
-                include_media = self.query_one("#include_media", Checkbox).value
-                include_entities = self.query_one("#include_entities", Checkbox).value
-                anonymize = self.query_one("#anonymize", Checkbox).value
-                validate_input = self.query_one("#validate_input", Checkbox).value
+            def _collect_data(self, options):
+                """Prepared payload for ``options``; reused while sources and options are unchanged."""
+                key = (
+                    tuple((st.st_size, st.st_mtime_ns) for st in map(os.stat, options["sources"])),
+                    tuple(sorted(options.items())),
+                )
+                if key == self._prepared_key:
+                    return self._prepared
 
                 prepared = build_conversion_payload(
-                    source_paths=sources,
-                    output_path=output_path or None,
+                    source_paths=list(options["sources"]),
+                    output_path=options["output_path"] or None,
                     output_dir=None,
-                    selected_authors=selected_authors,
-                    start_date=start_date,
-                    end_date=end_date,
-                    use_date_range=use_date_filter,
-                    include_service=include_service,
-                    include_media_meta=include_media,
-                    include_entities=include_entities,
-                    include_reactions=include_reactions,
-                    human_readable=human_readable,
-                    anonymize=anonymize,
-                    validate_input=validate_input,
+                    selected_authors=set(options["selected_authors"]),
+                    start_date=options["start_date"],
+                    end_date=options["end_date"],
+                    use_date_range=options["use_date_filter"],
+                    include_service=options["include_service"],
+                    include_media_meta=options["include_media"],
+                    include_entities=options["include_entities"],
+                    include_reactions=options["include_reactions"],
+                    human_readable=options["human_readable"],
+                    anonymize=options["anonymize"],
+                    validate_input=options["validate_input"],
+                    session=self.session,
                 )
-                return {
+                payload = {
                     "sources": prepared["source_paths"],
                     "output_path": prepared["output_path"],
-                    "include_reactions": include_reactions,
-                    "include_media": include_media,
-                    "include_entities": include_entities,
-                    "human_readable": human_readable,
+                    "include_reactions": options["include_reactions"],
+                    "include_media": options["include_media"],
+                    "include_entities": options["include_entities"],
+                    "human_readable": options["human_readable"],
                     "validation_issues": prepared["validation_issues"],
                     "stats": prepared["filter_stats"],
                     "conversion_payload": prepared,
                 }
+                self._prepared_key, self._prepared = key, payload
+                return payload
 
-            def _do_inspect(self):
-                payload = self._collect_data()
-                first = load_json_file(payload["sources"][0])
-                authors = get_available_authors(first.get("messages", []))
-                min_date, max_date = get_date_range_from_messages(first.get("messages", []))
+            def _report(self, message: str):
+                """Add an activity line from a worker thread."""
+                self.call_from_thread(self._push_activity, message)
+
+            def _do_inspect(self, options, worker):
+                self._report("Inspect: loading source")
+                payload = self._collect_data(options)
+                if worker.is_cancelled:
+                    return
+                profile = self.session.profile(payload["sources"][0])
                 result = {
                     "sources": payload["sources"],
-                    "authors_count": len(authors),
-                    "authors": authors[:50],
-                    "date_range": [min_date, max_date],
+                    "items_count": profile.total_items,
+                    "authors_count": len(profile.author_counts),
+                    "authors": profile.top_authors(50),
+                    "date_range": [profile.min_date, profile.max_date],
+                    "reactions": profile.top_reactions(8),
                     "estimated_output": payload["output_path"],
                 }
-                self._summary_inspect(result)
-                self._push_activity("Inspect completed")
+                self.call_from_thread(self._summary_inspect, result)
+                self._report("Inspect completed")
 
-            def _do_dry_run(self):
-                payload = self._collect_data()
+            def _do_dry_run(self, options, worker):
+                self._report("Dry run: loading and filtering sources")
+                payload = self._collect_data(options)
+                if worker.is_cancelled:
+                    return
                 result = {
                     "output_path": payload["output_path"],
                     "included_messages": payload["stats"]["included"],
                     "stats": payload["stats"],
                     "validation_issues": payload["validation_issues"],
                 }
-                self._summary_dry_run(result)
-                self._push_activity("Dry run completed")
+                self.call_from_thread(self._summary_dry_run, result)
+                self._report("Dry run completed")
+
+            def _do_export(self, options, worker):
+                self._report("Export: preparing payload")
+                payload = self._collect_data(options)
+                if worker.is_cancelled:
+                    return
+                total = payload["stats"]["included"]
+                started = time.monotonic()
+                last_report = started
+
+                def _progress(count):
+                    nonlocal last_report
+                    now = time.monotonic()
+                    if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                        last_report = now
+                        rate = count / (now - started)
+                        self.call_from_thread(self._summary_progress, "Export", count, total, rate)
+
+                write_xml(
+                    payload["conversion_payload"],
+                    progress=_progress,
+                    cancel_event=_WorkerCancelFlag(worker),
+                )
+                self.call_from_thread(self._summary_export, payload)
+                self._report(f"Export completed -> {payload['output_path']}")
 
-            def _do_export(self):
-                payload = self._collect_data()
-                write_xml(payload["conversion_payload"])
-                self._summary_export(payload)
-                self._push_activity(f"Export completed -> {payload['output_path']}")
+            def _summary_progress(self, label, count, total, rate):
+                eta = (total - count) / rate if rate else 0
+                percent = (count / total) * 100 if total else 100
+                self._set_summary(
+                    Panel(
+                        Text(
+                            f"{count:,}/{total:,} messages ({percent:.0f}%)\n"
+                            f"{rate:,.0f} msg/s, ETA {eta:.0f}s\n\nCtrl+G to cancel",
+                            style="#cbd5e1",
+                        ),
+                        title=f"{label} running",
+                        border_style="#f59e0b",
+                    )
+                )
 
             def _run_workspace_action(self, action, label: str):
                 if not self._is_workspace_visible():
                     self._show_workspace()
                 try:
-                    action()
+                    options = self._read_form()
                 except Exception as exc:
                     self._summary_error(exc)
                     self._push_activity(f"{label} failed: {exc}")
+                    return
+
+                def _work():
+                    worker = get_current_worker()
+                    try:
+                        action(options, worker)
+                    except ConversionCancelled:
+                        self._report(f"{label} cancelled")
+                    except Exception as exc:
+                        if not worker.is_cancelled:
+                            self.call_from_thread(self._summary_error, exc)
+                            self._report(f"{label} failed: {exc}")
+
+                self._set_summary(
+                    Panel(Text(f"{label} running...", style="#9ca3af"), title="Working", border_style="#f59e0b")
+                )
+                # Starting an action cancels the one still running.
+                self.run_worker(_work, name=label, group="workspace", exclusive=True, thread=True)
+
+            def action_cancel_action(self):
+                running = [w for w in self.workers if w.group == "workspace" and w.is_running]
+                if running:
+                    self.workers.cancel_group(self, "workspace")
+                    self._push_activity(f"Cancelling {running[0].name}")
 
             def on_button_pressed(self, event: Button.Pressed) -> None:
                 button_id = event.button.id
@@ -470,6 +578,9 @@ class TgXmlTextualApp:
                 if button_id == "export":
                     self._run_workspace_action(self._do_export, "Export")
                     return
+                if button_id == "cancel":
+                    self.action_cancel_action()
+                    return
 
             def action_run_dry(self):
                 self._run_workspace_action(self._do_dry_run, "Dry run")
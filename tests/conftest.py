@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def make_messages():
+    """Messages covering every shape the converter handles."""
+    return [
+        {"id": 1, "type": "service", "date": "2023-12-31T23:59:00", "actor": "Alice", "actor_id": "user1",
+         "action": "create_group", "text": ""},
+        {"id": 2, "type": "message", "date": "2024-01-01T10:00:00", "from": "Alice", "from_id": "user1",
+         "text": "plain & <tagged> \"quoted\" 'single' ✓", "reactions": [{"type": "emoji", "emoji": "❤", "count": 3}]},
+        {"id": 3, "type": "message", "date": "2024-01-01T11:30:00", "from": "Bob", "from_id": "user2",
+         "text": ["rich ", {"type": "bold", "text": "bold\nline"}, " tail\t\r", {"type": "link", "text": "http://x?a=1&b=2"}],
+         "text_entities": [{"type": "plain", "text": "rich "}, {"type": "bold", "text": "bold\nline"}]},
+        {"id": 4, "type": "message", "date": "2024-01-02T09:00:00", "from": "Bob", "from_id": "user2", "text": ""},
+        {"id": 5, "type": "message", "date": "2024-01-15T08:00:00", "from": "A&B <x> \"q\"", "from_id": "user3",
+         "text": "emoji \U0001F600 and a tab\t", "photo": "photos/p5.jpg", "width": 640, "height": 480,
+         "reply_to_message_id": 2},
+        {"id": 6, "type": "message", "date": "2024-02-01T12:00:00", "from": "Alice", "from_id": "user1",
+         "text": "february", "file": "files/doc.pdf", "mime_type": "application/pdf", "media_type": "document",
+         "reactions": [{"type": "emoji", "emoji": "\U0001F44D", "count": 1}, {"type": "custom_emoji", "count": 2}]},
+        {"id": 7, "type": "message", "date": "2024-03-10T18:45:00", "from": "", "text": "no sender"},
+        "not a message",
+        {"id": 8, "type": "message", "date": "2024-12-31T23:59:59", "from": "Carol", "from_id": "user4",
+         "text": "last of the year"},
+    ]
+
+
+def make_export(messages=None, chat_id=42):
+    return {"name": "Test chat", "type": "private_group", "id": chat_id,
+            "messages": make_messages() if messages is None else messages}
+
+
+@pytest.fixture
+def export_data():
+    return make_export()
+
+
+@pytest.fixture
+def write_export(tmp_path):
+    """Write an export dict (or raw JSON text) to a file and return its path."""
+    counter = iter(range(1_000_000))
+
+    def _write(data=None, name=None, **dump_kwargs):
+        path = tmp_path / (name or f"export_{next(counter)}.json")
+        text = data if isinstance(data, str) else json.dumps(make_export() if data is None else data,
+                                                             ensure_ascii=False, **dump_kwargs)
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    return _write
@@ -0,0 +1,87 @@
+import os
+import stat
+import sys
+
+import pytest
+
+import jsontoxml
+from jsontoxml import Anonymizer, anonymize_messages, default_anonymize_key, user_app_dir
+from tests.conftest import make_messages
+
+
+@pytest.fixture(autouse=True)
+def config_home(monkeypatch, tmp_path):
+    monkeypatch.delenv("TGXML_ANON_KEY", raising=False)
+    monkeypatch.setattr(jsontoxml, "user_app_dir", lambda kind: str(tmp_path / kind / "tgxml"))
+    return tmp_path / "config"
+
+
+def test_same_key_gives_same_output():
+    key = b"k" * 32
+    first = anonymize_messages(make_messages(), Anonymizer(key=key))
+    second = anonymize_messages(make_messages(), Anonymizer(key=key))
+    assert first == second
+    other = anonymize_messages(make_messages(), Anonymizer(key=b"x" * 32))
+    assert [m.get("from_id") for m in first if isinstance(m, dict)] != [
+        m.get("from_id") for m in other if isinstance(m, dict)
+    ]
+
+
+def test_aliases_follow_first_appearance_and_ids_are_pseudonymized():
+    anonymizer = Anonymizer(key=b"k" * 32)
+    messages = anonymize_messages(make_messages(), anonymizer)
+    assert messages[0]["actor"] == "user_001"
+    assert messages[1]["from"] == "user_001"
+    assert messages[2]["from"] == "user_002"
+    assert messages[1]["from_id"] == messages[0]["actor_id"] == anonymizer.pseudonym("user1")
+    assert messages[1]["from_id"].startswith("id_") and "user1" not in messages[1]["from_id"]
+    assert messages[7] == "not a message"
+
+
+def test_source_messages_are_not_modified():
+    source = make_messages()
+    anonymize_messages(source, Anonymizer(key=b"k" * 32))
+    assert source == make_messages()
+
+
+def test_pseudonyms_use_the_whole_digest():
+    anonymizer = Anonymizer(key=b"k" * 32)
+    values = {anonymizer.pseudonym(f"user{n}") for n in range(20_000)}
+    assert len(values) == 20_000
+    assert max(int(v[3:]) for v in values) > 10_000_000
+
+
+def test_default_key_is_random_private_and_persistent(config_home):
+    key = default_anonymize_key()
+    path = config_home / "tgxml" / jsontoxml.ANONYMIZE_KEY_FILE
+    assert len(key) == 32
+    assert default_anonymize_key() == key
+    assert Anonymizer().key == key
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    path.unlink()
+    assert default_anonymize_key() != key
+
+
+def test_env_key_overrides_default(monkeypatch, config_home):
+    monkeypatch.setenv("TGXML_ANON_KEY", "secret")
+    assert Anonymizer().key == b"secret"
+    assert not (config_home / "tgxml").exists()
+
+
+def test_alias_map_round_trip(tmp_path):
+    path = str(tmp_path / "aliases.json")
+    first = Anonymizer.load(path)
+    before = anonymize_messages(make_messages(), first)
+    first.save(path)
+    second = Anonymizer.load(path)
+    assert second.key == first.key
+    assert anonymize_messages(make_messages()[::-1], second)[::-1] == before
+
+
+@pytest.mark.skipif(sys.platform in ("win32", "darwin"), reason="XDG directories are used on other platforms")
+def test_user_app_dir_follows_xdg(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "xdg-config"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg-cache"))
+    assert user_app_dir("config") == str(tmp_path / "xdg-config" / "tgxml")
+    assert user_app_dir("cache") == str(tmp_path / "xdg-cache" / "tgxml")
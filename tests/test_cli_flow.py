@@ -0,0 +1,79 @@
+import pytest
+
+from jsontoxml import PipelineHooks, convert_json_to_xml_file
+from src.tgxml.cli_flow import build_conversion_payload, build_replay_command, write_xml
+from src.tgxml.session import SourceSession
+from tests.conftest import make_export
+
+
+def _payload(source_paths, output_path, **overrides):
+    options = dict(
+        source_paths=source_paths,
+        output_path=output_path,
+        output_dir=None,
+        selected_authors=set(),
+        start_date="2024-01",
+        end_date="2024-12",
+        use_date_range=True,
+        include_service=False,
+        include_media_meta=True,
+        include_entities=True,
+        include_reactions=True,
+        human_readable=True,
+        anonymize=False,
+        validate_input=True,
+    )
+    options.update(overrides)
+    return build_conversion_payload(**options)
+
+
+@pytest.fixture
+def sources(write_export):
+    first = make_export()
+    second = make_export(first["messages"][4:] + [{"id": 20, "type": "message", "date": "2024-06-01T00:00:00",
+                                                   "from": "Dan", "text": "extra"}])
+    return [write_export(first), write_export(second)]
+
+
+@pytest.mark.parametrize("hooks", [None, PipelineHooks()], ids=["plain", "hooks"])
+@pytest.mark.parametrize("anonymize", [False, True])
+def test_payload_matches_convert_json_to_xml_file(sources, tmp_path, monkeypatch, hooks, anonymize):
+    monkeypatch.setenv("TGXML_ANON_KEY", "test")
+    expected = convert_json_to_xml_file(sources, str(tmp_path / "expected.xml"), start_date="2024-01",
+                                        end_date="2024-12", use_date_range=True, include_media_meta=True,
+                                        include_entities=True, anonymize=anonymize, validate_input=True)
+    payload = _payload(sources, str(tmp_path / "payload.xml"), anonymize=anonymize, hooks=hooks)
+    assert payload["filter_stats"] == expected["filter_stats"]
+    assert payload["validation_issues"] == expected["validation_issues"]
+    assert write_xml(payload) == expected["messages"]
+    assert (tmp_path / "payload.xml").read_bytes() == (tmp_path / "expected.xml").read_bytes()
+
+
+def test_replay_command_keeps_worker_options(sources, tmp_path):
+    payload = _payload(sources, str(tmp_path / "out.xml"), workers=2, load_workers=3)
+    command = build_replay_command(payload, no_color=False, plain=True)
+    assert "--workers 2" in command and "--load-workers 3" in command
+    assert "--workers" not in build_replay_command(_payload(sources, str(tmp_path / "out.xml")),
+                                                   no_color=False, plain=True)
+
+
+@pytest.mark.parametrize("duplicates", [False, True])
+def test_session_payload_matches_plain_payload(write_export, tmp_path, duplicates):
+    messages = make_export()["messages"]
+    if duplicates:
+        messages = messages + messages[3:6]
+    source = write_export(make_export(messages))
+    plain = _payload([source], str(tmp_path / "plain.xml"))
+    stats = {}
+
+    class StageCounts(PipelineHooks):
+        def stage_end(self, stage, seconds, messages=0, nbytes=0):
+            stats[stage] = messages
+
+    session = _payload([source], str(tmp_path / "session.xml"), session=SourceSession(use_cache=False),
+                       hooks=StageCounts())
+    assert session["filter_stats"] == plain["filter_stats"]
+    assert plain["filter_stats"]["excluded_duplicate"] == (3 if duplicates else 0)
+    assert write_xml(session) == write_xml(plain)
+    assert (tmp_path / "session.xml").read_bytes() == (tmp_path / "plain.xml").read_bytes()
+    assert stats["filter"] == len(make_export()["messages"])
@@ -0,0 +1,33 @@
+import pytest
+
+import src.tgxml.columnar as columnar
+from jsontoxml import filter_messages
+from src.tgxml.columnar import NO_AUTHOR, MessageTable
+from src.tgxml.message_index import MessageIndex
+from tests.test_message_index import QUERIES, _messages
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar, "np", None)
+    return request.param
+
+
+def test_message_table_matches_filter_messages(backend):
+    messages = _messages()
+    table = MessageTable(messages)
+    for query in QUERIES:
+        expected = filter_messages(messages, return_stats=True, **query)
+        assert table.filter_messages(return_stats=True, **query) == expected, query
+
+
+def test_author_codes(backend):
+    messages = _messages()
+    table = MessageTable(messages, MessageIndex(messages))
+    assert len(table) == len(messages)
+    assert table.author_names == ["Alice", "Bob", "A&B <x> \"q\"", "Carol"]
+    names = [table.author_names[code] if code != NO_AUTHOR else None for code in table.author]
+    assert names[:9] == [None, "Alice", "Bob", "Bob", "A&B <x> \"q\"", "Alice", None, None, "Carol"]
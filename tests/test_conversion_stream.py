@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from jsontoxml import ConversionCancelled, convert_json_to_xml_file
+from src.tgxml.conversion_stream import ConversionStream
+from src.tgxml.models import ConversionOptions
+from tests.conftest import ROOT
+
+
+def _options(source, output, **overrides):
+    options = dict(source_paths=[source], output_path=str(output), use_date_range=True, start_date="2024-01",
+                   end_date="2024-02", include_entities=True)
+    options.update(overrides)
+    return options
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_conversion_stream_matches_file(write_export, tmp_path, streaming, workers):
+    source = write_export()
+    output = tmp_path / "file.xml"
+    options = _options(source, output)
+    result = convert_json_to_xml_file(**{k: v for k, v in options.items() if k != "source_paths"},
+                                      source_path=source)
+    stream = ConversionStream(ConversionOptions(**options), chunk_size=64, streaming=streaming, workers=workers)
+    chunks = list(stream)
+    assert len(chunks) > 1
+    assert b"".join(chunks) == output.read_bytes()
+    assert stream.result.messages == result["messages"]
+    assert stream.result.filter_stats == result["filter_stats"]
+
+
+def test_cancel_event_stops_the_stream(write_export, tmp_path):
+    class Cancelled:
+        def is_set(self):
+            return True
+
+    stream = ConversionStream(ConversionOptions(**_options(write_export(), tmp_path / "x.xml")),
+                              cancel_event=Cancelled())
+    with pytest.raises(ConversionCancelled):
+        list(stream)
+    assert stream.result is None
+
+
+def test_package_imports_do_not_duplicate_modules():
+    # Imported as the ``tgxml`` package (PYTHONPATH=src), the stream must
+    # come from that package, not a second ``src.tgxml`` copy.
+    code = (
+        "import sys, tgxml, tgxml.models\n"
+        "assert tgxml.ConversionStream.__module__ == 'tgxml.conversion_stream'\n"
+        "assert not [m for m in sys.modules if m.startswith('src.')], sorted(sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=str(ROOT / "scripts"), env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from jsontoxml import (
+    TelegramExportStream,
+    iter_export_messages,
+    load_json_file,
+    project_message,
+    required_message_fields,
+    validate_telegram_export,
+)
+
+
+def _read_all(path, chunk_size, fields=None):
+    with TelegramExportStream(path, chunk_size=chunk_size, fields=fields) as stream:
+        messages = list(stream.iter_messages())
+        return dict(stream.header), messages
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_chunk_size_matches_json_load(write_export, export_data, indent):
+    path = write_export(export_data, indent=indent)
+    expected_header = {k: v for k, v in export_data.items() if k != "messages"}
+    for chunk_size in range(1, 80):
+        header, messages = _read_all(path, chunk_size)
+        assert messages == export_data["messages"], chunk_size
+        assert header == expected_header, chunk_size
+
+
+def test_number_split_across_reads(write_export):
+    # Every possible split point of a long number, at the end of a message and of the header.
+    data = {"id": 1234567890123, "messages": [{"id": 9876543210, "date": "2024-01-01T00:00:00", "type": "message",
+                                               "count": -12.5e3}, 314159265358979]}
+    path = write_export(json.dumps(data, separators=(",", ":")))
+    for chunk_size in range(1, 40):
+        header, messages = _read_all(path, chunk_size)
+        assert header == {"id": 1234567890123}
+        assert messages == data["messages"]
+
+
+def test_fields_after_messages_are_in_header_once_iterated(write_export):
+    messages = [{"id": 1, "type": "message", "date": "2024-01-01T00:00:00", "text": "x"}]
+    path = write_export('{"name": "late", "messages": ' + json.dumps(messages) + ', "id": 77, "type": "x"}')
+    for chunk_size in (1, 7, 1 << 20):
+        with TelegramExportStream(path, chunk_size=chunk_size) as stream:
+            assert "id" not in stream.header
+            assert list(stream.iter_messages()) == messages
+            assert stream.header == {"name": "late", "id": 77, "type": "x"}
+    header = {}
+    assert list(iter_export_messages(path, header=header)) == messages
+    assert header["id"] == 77
+    assert load_json_file(path, required_message_fields())["id"] == 77
+
+
+def test_empty_and_missing_messages(write_export):
+    header, messages = _read_all(write_export({"id": 1, "messages": []}), 3)
+    assert messages == [] and header == {"id": 1}
+    issues = []
+    assert list(iter_export_messages(write_export({"id": 1}), validation_issues=issues)) == []
+    assert issues == ["Missing required field: messages"]
+
+
+def test_streamed_validation_matches_validate_telegram_export(write_export, export_data):
+    export_data["messages"].append({"id": 99})
+    path = write_export(export_data)
+    issues = []
+    list(iter_export_messages(path, validation_issues=issues))
+    assert issues == validate_telegram_export(export_data)
+
+
+def test_projected_load_keeps_only_needed_fields(write_export, export_data):
+    path = write_export(export_data)
+    fields = required_message_fields(include_reactions=False)
+    expected = [project_message(msg, fields) for msg in export_data["messages"]]
+    assert load_json_file(path, fields)["messages"] == expected
+    assert all("reactions" not in msg for msg in expected if isinstance(msg, dict))
+    header, messages = _read_all(path, 5, fields=fields)
+    assert messages == expected
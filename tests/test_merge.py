@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+from jsontoxml import (
+    SourceOrderError,
+    convert_json_to_xml_file,
+    iter_streamed_messages,
+    merge_message_streams,
+    messages_in_date_order,
+    new_filter_stats,
+)
+from src.tgxml.cli_flow import build_conversion_payload, write_xml
+from tests.conftest import make_export
+
+
+def _msg(msg_id, date, text="x"):
+    return {"id": msg_id, "type": "message", "date": f"{date}T12:00:00", "from": "Alice", "text": text}
+
+
+def _merge(sources, chat_id=1, ordered=None):
+    stats = new_filter_stats()
+    streams = [[(chat_id, msg) for msg in messages] for messages in sources]
+    merged = list(merge_message_streams(streams, stats=stats, ordered=ordered))
+    return [msg["id"] for msg in merged], stats["excluded_duplicate"]
+
+
+def test_overlapping_exports_merge_in_order_once():
+    first = [_msg(1, "2024-01-01"), _msg(2, "2024-01-02"), _msg(3, "2024-01-03")]
+    second = [_msg(2, "2024-01-02"), _msg(3, "2024-01-03"), _msg(4, "2024-01-04")]
+    assert _merge([second, first]) == ([1, 2, 3, 4], 2)
+    assert _merge([first, second], ordered=True) == ([1, 2, 3, 4], 2)
+
+
+def test_same_id_with_another_date_is_kept():
+    assert _merge([[_msg(1, "2024-01-01")], [_msg(1, "2024-01-05")]]) == ([1, 1], 0)
+
+
+def test_different_chats_are_not_duplicates():
+    stats = new_filter_stats()
+    streams = [[(1, _msg(1, "2024-01-01"))], [(2, _msg(1, "2024-01-01"))]]
+    assert len(list(merge_message_streams(streams, stats=stats))) == 2
+    assert stats["excluded_duplicate"] == 0
+
+
+def test_duplicates_within_one_source():
+    sorted_source = [_msg(1, "2024-01-01"), _msg(2, "2024-01-02"), _msg(2, "2024-01-02")]
+    assert _merge([sorted_source]) == ([1, 2], 1)
+    unsorted = [_msg(1, "2024-01-01"), _msg(2, "2024-01-03"), _msg(3, "2024-01-02"), _msg(2, "2024-01-03")]
+    assert not messages_in_date_order(unsorted)
+    assert _merge([unsorted], ordered=False) == ([1, 2, 3], 1)
+    with pytest.raises(SourceOrderError):
+        _merge([unsorted])
+
+
+def test_disorder_before_any_date_is_left_keeps_every_key():
+    source = [_msg(1, "2024-01-02"), _msg(2, "2024-01-01"), _msg(1, "2024-01-02")]
+    assert _merge([source]) == ([1, 2], 1)
+
+
+def test_known_disorder_finds_duplicates_of_dates_already_left():
+    source = [_msg(1, "2024-01-01"), _msg(2, "2024-01-02"), _msg(1, "2024-01-01")]
+    assert _merge([source], ordered=messages_in_date_order(source)) == ([1, 2], 1)
+
+
+def test_non_messages_pass_through():
+    stats = new_filter_stats()
+    merged = list(merge_message_streams([[(1, "junk"), (1, _msg(1, "2024-01-01"))], [(1, _msg(1, "2024-01-01"))]],
+                                        stats=stats))
+    assert merged[0] == "junk" and len(merged) == 2
+    assert stats["excluded_duplicate"] == 1
+
+
+@pytest.mark.parametrize("id_last", [False, True])
+def test_streamed_merge_matches_in_memory(write_export, tmp_path, id_last):
+    first = make_export()
+    second = make_export([msg for msg in first["messages"][3:]] + [_msg(100, "2025-01-01")])
+    if id_last:
+        messages = json.dumps(first["messages"], ensure_ascii=False)
+        first_path = write_export('{"name": "Test chat", "messages": ' + messages + ', "id": 42}')
+    else:
+        first_path = write_export(first)
+    second_path = write_export(second)
+
+    stats = new_filter_stats()
+    streamed = list(iter_streamed_messages([first_path, second_path], stats=stats))
+    result = convert_json_to_xml_file([first_path, second_path], str(tmp_path / "out.xml"))
+    if id_last:
+        # The chat id is only known after the messages, so the source is keyed by path.
+        assert stats["excluded_duplicate"] == 0
+    else:
+        assert stats == result["filter_stats"]
+        assert len(streamed) == result["messages"]
+    overlap = sum(isinstance(msg, dict) for msg in second["messages"]) - 1
+    assert result["filter_stats"]["excluded_duplicate"] == overlap
+
+
+def test_streamed_merge_drops_repeated_source(write_export):
+    path = write_export()
+    stats = new_filter_stats()
+    once = list(iter_streamed_messages([path]))
+    twice = list(iter_streamed_messages([path, path], stats=stats))
+    assert twice == once
+    assert stats["excluded_duplicate"] == sum(isinstance(msg, dict) for msg in make_export()["messages"])
+
+
+def test_streamed_unordered_source_matches_in_memory(write_export, tmp_path):
+    messages = make_export()["messages"]
+    # Goes back to earlier dates, repeating messages of dates already left.
+    source = write_export(make_export(messages + messages[1:4] + [_msg(60, "2024-01-01")]))
+    expected = convert_json_to_xml_file(source, str(tmp_path / "memory.xml"), include_service=True)
+    assert expected["filter_stats"]["excluded_duplicate"] == 3
+    with pytest.raises(SourceOrderError):
+        list(iter_streamed_messages([source], include_service=True))
+
+    payload = build_conversion_payload(
+        source_paths=[source], output_path=str(tmp_path / "stream.xml"), output_dir=None,
+        selected_authors=set(), start_date="", end_date="", use_date_range=False, include_service=True,
+        include_media_meta=False, include_entities=False, include_reactions=True, human_readable=True,
+        anonymize=False, validate_input=True, streaming=True,
+    )
+    assert payload["ordered"] is False
+    assert payload["filter_stats"] == expected["filter_stats"]
+    assert write_xml(payload) == expected["messages"]
+    assert (tmp_path / "stream.xml").read_bytes() == (tmp_path / "memory.xml").read_bytes()
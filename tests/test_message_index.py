@@ -0,0 +1,91 @@
+import itertools
+
+import pytest
+
+from jsontoxml import filter_messages, normalize_date_bound
+from src.tgxml.message_index import MessageIndex
+from tests.conftest import make_messages
+
+AUTHORS = [None, {"Alice"}, {"Bob", "Carol"}, {"Nobody"}]
+RANGES = [
+    ("", ""),
+    ("2024-01-01", "2024-01-01"),
+    ("2024-01", "2024-02"),
+    ("2024", ""),
+    ("", "2023-12-31"),
+    ("2024-03-11", "2024-12-30"),
+    ("not a date", "2024-02"),
+]
+QUERIES = [
+    dict(selected_authors=authors, start_date=start, end_date=end, use_date_range=use_range,
+         require_text=require_text, include_service=include_service)
+    for authors, (start, end), use_range, require_text, include_service in itertools.product(
+        AUTHORS, RANGES, [True, False], [True, False], [True, False]
+    )
+]
+
+
+def _messages():
+    messages = make_messages()
+    # Merged sources are not in date order; neither are some exports.
+    messages.append({"id": 9, "type": "message", "date": "2023-06-01T00:00:00", "from": "Bob", "text": "late"})
+    messages.append({"id": 10, "type": "message", "from": "Alice", "text": "no date"})
+    return messages
+
+
+def test_message_index_matches_filter_messages():
+    messages = _messages()
+    index = MessageIndex(messages)
+    for query in QUERIES:
+        expected = filter_messages(messages, return_stats=True, **query)
+        assert index.filter_messages(return_stats=True, **query) == expected, query
+
+
+def test_irregular_dates_fall_back_to_filter_messages():
+    messages = _messages() + [{"id": 11, "type": "message", "date": "2024/05/05", "from": "Bob", "text": "odd"}]
+    index = MessageIndex(messages)
+    for query in QUERIES:
+        assert index.filter_messages(return_stats=True, **query) == filter_messages(
+            messages, return_stats=True, **query
+        ), query
+
+
+@pytest.mark.parametrize("value, is_end, expected", [
+    ("2024-12", True, "2024-12-31"),
+    ("2024-02", True, "2024-02-29"),
+    ("2023-2", True, "2023-02-28"),
+    ("2024-12", False, "2024-12-01"),
+    ("2024", False, "2024-01-01"),
+    ("2024", True, "2024-12-31"),
+    (" 2024-1-5 ", True, "2024-01-05"),
+    ("2024-13", True, "2024-13"),
+    ("not a date", False, "not a date"),
+    ("", True, ""),
+])
+def test_normalize_date_bound(value, is_end, expected):
+    assert normalize_date_bound(value, is_end=is_end) == expected
+
+
+def test_month_end_bound_keeps_the_whole_month():
+    messages = _messages()
+    kept = filter_messages(messages, start_date="2024-12", end_date="2024-12", use_date_range=True)
+    assert [msg["id"] for msg in kept] == [8]
+    assert MessageIndex(messages).filter_messages(start_date="2024-12", end_date="2024-12",
+                                                  use_date_range=True) == kept
+
+
+@pytest.mark.parametrize("sort", [True, False])
+def test_positions_for_authors(sort):
+    messages = [msg for msg in _messages() if isinstance(msg, dict)]
+    messages = messages[:-2] if sort else messages
+    index = MessageIndex(messages)
+    assert index.dates.is_sorted == sort
+    for authors in (["Alice"], ["Bob", "Carol"], ["Alice", "Nobody"], []):
+        for start, end in ((None, None), (index.dates.ordinals[2], None), (None, index.dates.ordinals[5])):
+            expected = [
+                pos for pos, msg in enumerate(messages)
+                if msg.get("from") in authors
+                and (start is None or index.dates.ordinals[pos] >= start)
+                and (end is None or index.dates.ordinals[pos] <= end)
+            ]
+            assert index.positions_for_authors(authors, start, end) == expected, (authors, start, end)
@@ -0,0 +1,59 @@
+import socket
+
+import pytest
+
+from jsontoxml import convert_json_to_xml_file
+from src.tgxml.metrics import MetricsHooks
+
+
+def test_statsd_file_lines(tmp_path):
+    target = tmp_path / "metrics.statsd"
+    hooks = MetricsHooks(str(target), prefix="my-app")
+    hooks.stage_start("parse")
+    hooks.progress("parse", 10, 2048)
+    hooks.stage_end("parse", 0.25, messages=12, nbytes=4096)
+    hooks.close()
+    assert target.read_text().splitlines() == [
+        "my_app.progress.parse.messages:10|g",
+        "my_app.progress.parse.bytes:2048|g",
+        "my_app.stage.parse.duration:250.000|ms",
+        "my_app.stage.parse.messages:12|c",
+        "my_app.stage.parse.bytes:4096|c",
+    ]
+
+
+def test_statsd_udp_datagrams():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    try:
+        hooks = MetricsHooks(f"udp://127.0.0.1:{receiver.getsockname()[1]}")
+        hooks.stage_end("filter", 0.001, messages=3)
+        hooks.close()
+        assert receiver.recv(4096).decode().splitlines() == [
+            "tgxml.stage.filter.duration:1.000|ms",
+            "tgxml.stage.filter.messages:3|c",
+            "tgxml.stage.filter.bytes:0|c",
+        ]
+    finally:
+        receiver.close()
+
+
+def test_openmetrics_file_tracks_every_stage(write_export, tmp_path):
+    target = tmp_path / "tgxml.prom"
+    hooks = MetricsHooks(str(target), fmt="openmetrics")
+    result = convert_json_to_xml_file(write_export(), str(tmp_path / "out.xml"), use_cache=False, hooks=hooks)
+    hooks.close()
+    text = target.read_text()
+    assert text.endswith("# EOF\n")
+    assert "# TYPE tgxml_stage_duration_seconds gauge" in text
+    for stage in ("parse", "merge", "filter", "serialize"):
+        assert f'tgxml_stage_duration_seconds{{stage="{stage}"}}' in text
+    assert f'tgxml_stage_messages{{stage="serialize"}} {result["messages"]}' in text
+
+
+def test_invalid_targets():
+    with pytest.raises(ValueError):
+        MetricsHooks("metrics.txt", fmt="json")
+    with pytest.raises(ValueError):
+        MetricsHooks("udp://127.0.0.1:8125", fmt="openmetrics")
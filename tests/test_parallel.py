@@ -0,0 +1,34 @@
+import os
+
+from jsontoxml import convert_json_to_xml_file, load_json_file, required_message_fields, validate_telegram_export
+from src.tgxml.parallel import load_sources, resolve_workers
+from tests.conftest import make_export
+
+
+def test_resolve_workers():
+    assert resolve_workers(1) == 1
+    assert resolve_workers(-3) == 1
+    assert resolve_workers(0) == resolve_workers(None) == (os.cpu_count() or 1)
+
+
+def test_load_sources_keeps_path_order_in_every_mode(write_export):
+    broken = make_export()
+    del broken["messages"][0]["type"]
+    paths = [write_export(), write_export(broken), write_export(make_export(chat_id=7))]
+    fields = required_message_fields(include_reactions=False)
+    expected = [(load_json_file(path, fields), validate_telegram_export(load_json_file(path, fields)))
+                for path in paths]
+    assert expected[1][1]
+    for workers in (1, 2, 0):
+        assert load_sources(paths, workers, use_cache=False, fields=fields, validate=True) == expected
+    assert load_sources(paths, 2, use_cache=False, fields=fields) == [(data, []) for data, _ in expected]
+
+
+def test_load_workers_give_the_same_output(write_export, tmp_path):
+    first = make_export()
+    paths = [write_export(first), write_export(make_export(first["messages"][2:]))]
+    serial = convert_json_to_xml_file(paths, str(tmp_path / "serial.xml"), use_cache=False, validate_input=True)
+    loaded = convert_json_to_xml_file(paths, str(tmp_path / "loaded.xml"), use_cache=False, validate_input=True,
+                                      load_workers=2)
+    assert {**loaded, "output_path": None} == {**serial, "output_path": None}
+    assert (tmp_path / "loaded.xml").read_bytes() == (tmp_path / "serial.xml").read_bytes()
@@ -0,0 +1,33 @@
+from jsontoxml import get_available_authors, get_date_range_from_messages
+from src.tgxml.profiler import profile_messages
+from tests.conftest import make_messages
+
+
+def test_profile_matches_the_per_question_helpers():
+    messages = make_messages()
+    profile = profile_messages(messages)
+    assert profile.authors == get_available_authors(messages)
+    dated = [msg for msg in messages if isinstance(msg, dict)]
+    assert (profile.min_date, profile.max_date) == get_date_range_from_messages(dated)
+
+
+def test_profile_counts():
+    profile = profile_messages(make_messages())
+    assert profile.total_items == 9
+    assert profile.non_dict_items == 1
+    assert profile.type_counts == {"service": 1, "message": 7}
+    assert profile.top_authors() == [("Alice", 2), ("Bob", 2), ("A&B <x> \"q\"", 1), ("Carol", 1)]
+    assert profile.top_authors(1) == [("Alice", 2)]
+    assert profile.message_date_range == ("2024-01-01", "2024-12-31")
+    assert profile.years == ["2024"]
+    assert profile.day_counts["2024-01-01"] == 2
+    assert profile.author_day_counts["Bob"] == {"2024-01-01": 1, "2024-01-02": 1}
+    # Custom emoji reactions have no emoji and are not tallied.
+    assert profile.top_reactions() == [("❤", 3), ("\U0001F44D", 1)]
+    assert profile.to_dict()["date_range"] == ["2023-12-31", "2024-12-31"]
+
+
+def test_empty_profile():
+    profile = profile_messages([])
+    assert profile.authors == [] and profile.years == []
+    assert profile.message_date_range == ("", "")
@@ -0,0 +1,73 @@
+import pickle
+
+import pytest
+
+from jsontoxml import Anonymizer, anonymize_messages, filter_messages, normalize_message_text, write_xml_stream
+from src.tgxml.records import MessageRecord, compact_messages
+from tests.conftest import make_messages
+
+
+def _expected(message):
+    """What a record keeps of ``message``: normalized text, (emoji, count) reactions."""
+    expected = normalize_message_text(dict(message))
+    if "reactions" in expected:
+        expected["reactions"] = [{"emoji": r.get("emoji", ""), "count": r.get("count", 0)}
+                                 for r in expected["reactions"]]
+    return expected
+
+
+@pytest.mark.parametrize("message", [m for m in make_messages() if isinstance(m, dict)], ids=lambda m: str(m["id"]))
+def test_round_trip(message):
+    record = MessageRecord.from_message(message)
+    assert record.to_dict() == _expected(message)
+    assert dict(record) == record.to_dict()
+    assert len(record) == len(record.to_dict())
+    assert MessageRecord.from_message(record.to_dict()).to_dict() == record.to_dict()
+
+
+def test_unread_fields_are_dropped():
+    record = MessageRecord.from_message({"id": 1, "type": "message", "date_unixtime": "1700000000", "edited": "x"})
+    assert record.to_dict() == {"id": 1, "type": "message"}
+    assert "edited" not in record and record.get("edited", 0) == 0
+    with pytest.raises(KeyError):
+        record["edited"]
+
+
+def test_copy_and_assignment_do_not_touch_the_original():
+    original = MessageRecord.from_message(make_messages()[4])
+    copy = original.copy()
+    copy["from"] = "someone"
+    copy["width"] = 1
+    assert original["from"] == "A&B <x> \"q\"" and original["width"] == 640
+    with pytest.raises(KeyError):
+        copy["unknown"] = 1
+
+
+def test_records_pickle():
+    record = MessageRecord.from_message(make_messages()[2])
+    assert pickle.loads(pickle.dumps(record)).to_dict() == record.to_dict()
+
+
+def test_compact_messages_filter_and_anonymize_like_dicts():
+    messages = make_messages()
+    records = compact_messages(make_messages())
+    assert isinstance(records[1], MessageRecord) and records[7] == "not a message"
+    filtered, stats = filter_messages(messages, return_stats=True, include_service=True)
+    filtered_records, record_stats = filter_messages(records, return_stats=True, include_service=True)
+    assert record_stats == stats
+    assert [r.to_dict() for r in filtered_records] == [_expected(m) for m in filtered]
+    key = b"k" * 32
+    anonymized = anonymize_messages(records, Anonymizer(key=key))
+    expected = anonymize_messages(messages, Anonymizer(key=key))
+    assert [m.to_dict() if isinstance(m, MessageRecord) else m for m in anonymized] == [
+        _expected(m) if isinstance(m, dict) else m for m in expected
+    ]
+
+
+def test_records_serialize_like_dicts(tmp_path):
+    messages = [msg for msg in make_messages() if isinstance(msg, dict)]
+    for human_readable, include_entities in ((True, True), (False, False)):
+        options = dict(human_readable=human_readable, include_entities=include_entities, include_media_meta=True)
+        write_xml_stream(messages, str(tmp_path / "dicts.xml"), **options)
+        write_xml_stream(compact_messages(list(messages)), str(tmp_path / "records.xml"), **options)
+        assert (tmp_path / "records.xml").read_bytes() == (tmp_path / "dicts.xml").read_bytes()
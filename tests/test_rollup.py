@@ -0,0 +1,40 @@
+import itertools
+
+from jsontoxml import filter_messages, write_xml_stream
+from src.tgxml.rollup import SIZE_VARIANTS, RollupCube
+from tests.test_message_index import AUTHORS, RANGES, _messages
+
+
+def _reaction_totals(messages):
+    totals = {}
+    for msg in messages:
+        for reaction in msg.get("reactions") or ():
+            if reaction.get("emoji") and reaction.get("count", 0) > 0:
+                totals[reaction["emoji"]] = totals.get(reaction["emoji"], 0) + reaction["count"]
+    return totals
+
+
+def test_rollup_matches_filtered_messages(tmp_path):
+    messages = _messages()
+    cube = RollupCube(messages)
+    path = tmp_path / "out.xml"
+    for authors, (start, end), use_range in itertools.product(AUTHORS, RANGES[:-1], [True, False]):
+        query = dict(selected_authors=authors, start_date=start, end_date=end, use_date_range=use_range)
+        kept = filter_messages(messages, **query)
+        selection = cube.query(**query)
+        assert selection.messages == len(kept), query
+        assert selection.reactions == _reaction_totals(kept), query
+        dates = [msg["date"] for msg in kept if msg.get("date")]
+        assert (selection.first_date, selection.last_date) == (min(dates, default=""), max(dates, default=""))
+        for human_readable, include_reactions in SIZE_VARIANTS:
+            expected = 0
+            if kept:
+                write_xml_stream(kept, str(path), human_readable=human_readable,
+                                 include_reactions=include_reactions)
+                expected = path.stat().st_size
+            assert selection.xml_size(human_readable, include_reactions) == expected, query
+
+
+def test_authors_of_exportable_messages_only():
+    cube = RollupCube(_messages())
+    assert sorted(author for author in cube.authors if author) == ["A&B <x> \"q\"", "Alice", "Bob", "Carol"]
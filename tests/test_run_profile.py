@@ -0,0 +1,68 @@
+import json
+import os
+import pstats
+import subprocess
+import sys
+
+import pytest
+
+from jsontoxml import convert_json_to_xml_file
+from src.tgxml.run_profile import RunProfile, format_profile_report
+from tests.conftest import ROOT
+
+STAGES = ["parse", "compact", "merge", "filter", "serialize"]
+
+
+def _run_cli(args, tmp_path, stdin=""):
+    env = dict(os.environ, TGXML_CACHE_DIR=str(tmp_path / "cache"), TGXML_ANON_KEY="test")
+    return subprocess.run([sys.executable, str(ROOT / "jsontoxml.py"), *args], input=stdin, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_stages_accumulate_and_split():
+    profile = RunProfile()
+    for _ in range(2):
+        profile.stage_start("serialize")
+        profile.stage_end("serialize", 0.0, messages=5, nbytes=100)
+    profile.split("serialize", "write", 0.0)
+    profile.finish()
+    report = profile.as_dict()
+    assert report["stages"]["serialize"]["messages"] == 10
+    assert report["stages"]["serialize"]["bytes"] == 200
+    assert "write" in report["stages"]
+    assert report["pstats"] is None
+    assert "serialize" in format_profile_report(report)
+
+
+def test_profile_dump_holds_the_slowest_stage(write_export, tmp_path):
+    dump = tmp_path / "run.pstats"
+    profile = RunProfile(dump_path=str(dump))
+    convert_json_to_xml_file(write_export(), str(tmp_path / "out.xml"), use_cache=False, hooks=profile)
+    profile.finish()
+    report = profile.as_dict()
+    assert list(report["stages"]) == STAGES
+    assert report["pstats"]["stage"] in STAGES
+    assert pstats.Stats(str(dump)).total_calls > 0
+
+
+def test_cli_profile_report(write_export, tmp_path):
+    result = _run_cli(["--cli", "--run", "--plain", "--no-date-filter", "--source", write_export(),
+                       "--output", str(tmp_path / "out.xml"), "--report-json", "--profile"], tmp_path)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert list(report["profile"]["stages"]) == STAGES + ["write"]
+    assert report["profile"]["stages"]["write"]["bytes"] == os.path.getsize(tmp_path / "out.xml")
+
+
+@pytest.mark.parametrize("extra", [[], ["--profile"]], ids=["plain", "profile"])
+def test_interactive_quick_convert(write_export, tmp_path, extra):
+    source = write_export()
+    output = tmp_path / "interactive.xml"
+    # Quick convert, default output directory, do not save a preset.
+    result = _run_cli(["--interactive", "--plain", "--source", source, "--output", str(output), *extra],
+                      tmp_path, stdin="1\n\n\n")
+    assert result.returncode == 0, result.stderr
+    assert "Converted successfully" in result.stdout
+    assert output.exists()
+    if extra:
+        assert "Profile:" in result.stdout and "serialize" in result.stdout
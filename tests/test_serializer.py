@@ -0,0 +1,43 @@
+import itertools
+
+import pytest
+
+from jsontoxml import build_xml_tree, write_xml_stream
+from tests.conftest import make_messages
+
+OPTION_NAMES = ("include_reactions", "human_readable", "include_media_meta", "include_entities")
+OPTION_SETS = [dict(zip(OPTION_NAMES, values)) for values in itertools.product([True, False], repeat=4)]
+
+
+def _tree_bytes(messages, tmp_path, **options):
+    path = tmp_path / "tree.xml"
+    build_xml_tree(messages, **options).write(path, encoding="utf-8", xml_declaration=True)
+    return path.read_bytes()
+
+
+def _stream_bytes(messages, tmp_path, **options):
+    path = tmp_path / "stream.xml"
+    write_xml_stream(messages, str(path), **options)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("options", OPTION_SETS, ids=lambda o: "-".join(k for k, v in o.items() if v) or "none")
+def test_direct_serializer_matches_elementtree(tmp_path, options):
+    messages = [msg for msg in make_messages() if isinstance(msg, dict)]
+    assert _stream_bytes(messages, tmp_path, **options) == _tree_bytes(messages, tmp_path, **options)
+
+
+def test_empty_output_matches_elementtree(tmp_path):
+    for human_readable in (True, False):
+        assert _stream_bytes([], tmp_path, human_readable=human_readable) == _tree_bytes(
+            [], tmp_path, human_readable=human_readable
+        )
+
+
+def test_parallel_serializer_matches(tmp_path):
+    messages = [msg for msg in make_messages() if isinstance(msg, dict)] * 50
+    for human_readable in (True, False):
+        expected = _stream_bytes(messages, tmp_path, human_readable=human_readable)
+        path = tmp_path / "parallel.xml"
+        write_xml_stream(messages, str(path), workers=2, human_readable=human_readable)
+        assert path.read_bytes() == expected
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import src.tgxml.session as session_module
+from jsontoxml import load_json_file, normalize_message_text, normalize_text_content
+from src.tgxml.session import SourceSession
+from tests.conftest import make_export
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+
+    def counting_load(path, use_cache=True, fields=None):
+        calls.append(path)
+        return load_json_file(path, fields)
+
+    monkeypatch.setattr(session_module, "load_source", counting_load)
+    return calls
+
+
+def test_source_is_parsed_once(parse_count, write_export):
+    path = write_export()
+    session = SourceSession()
+    messages = session.messages(path)
+    assert session.load(path)["messages"] is messages
+    assert session.messages(path) is messages
+    assert len(parse_count) == 1
+    assert len(messages) == len(make_export()["messages"])
+
+
+def test_derived_values_are_memoized_by_key(parse_count, write_export):
+    path = write_export()
+    session = SourceSession()
+    built = []
+
+    def factory(data):
+        built.append(1)
+        return len(data["messages"])
+
+    assert session.derived(path, "count", factory) == 9
+    assert session.derived(path, "count", factory) == 9
+    assert len(built) == 1
+    session.derived(path, "count", factory, key="other")
+    assert len(built) == 2
+
+
+def test_changed_source_is_reparsed_with_fresh_derived_data(parse_count, write_export):
+    path = write_export()
+    session = SourceSession()
+    assert session.derived(path, "count", lambda data: len(data["messages"])) == 9
+    changed = make_export()
+    changed["messages"].append({"id": 50, "type": "message", "date": "2025-01-01T00:00:00", "from": "Dan",
+                                "text": "new"})
+    write_export(changed, name=os.path.basename(path))
+    assert session.derived(path, "count", lambda data: len(data["messages"])) == 10
+    assert len(parse_count) == 2
+    session.invalidate(path)
+    session.load(path)
+    assert len(parse_count) == 3
+
+
+def test_rich_text_is_normalized_once_at_load(parse_count, write_export):
+    path = write_export()
+    messages = SourceSession().messages(path)
+    expected = [normalize_message_text(m) if isinstance(m, dict) else m for m in make_export()["messages"]]
+    assert messages == expected
+    assert messages[2]["text"] == normalize_text_content(make_export()["messages"][2]["text"])
@@ -0,0 +1,40 @@
+import itertools
+
+import pytest
+
+from jsontoxml import write_xml_stream
+from src.tgxml.size_model import XmlSizeModel, encoded_size
+from tests.conftest import make_messages
+
+OPTION_NAMES = ("human_readable", "include_reactions", "include_media_meta", "include_entities")
+OPTION_SETS = [dict(zip(OPTION_NAMES, values)) for values in itertools.product([True, False], repeat=4)]
+
+
+def _messages():
+    return [msg for msg in make_messages() if isinstance(msg, dict)]
+
+
+@pytest.mark.parametrize("options", OPTION_SETS, ids=lambda o: "-".join(k for k, v in o.items() if v) or "none")
+def test_total_size_is_the_written_file_size(tmp_path, options):
+    messages = _messages()
+    model = XmlSizeModel(messages)
+    path = tmp_path / "out.xml"
+    for positions in ([], [0], [1, 4, 5], range(len(messages))):
+        positions = list(positions)
+        write_xml_stream([messages[pos] for pos in positions], str(path), **options)
+        assert model.total_size(positions, **options) == path.stat().st_size, positions
+
+
+def test_message_sizes_add_up_to_the_body():
+    messages = _messages()
+    model = XmlSizeModel(messages)
+    for options in OPTION_SETS:
+        everything = model.total_size(range(len(messages)), **options)
+        one = model.total_size([0], **options)
+        rest = sum(model.message_size(pos, **options) for pos in range(1, len(messages)))
+        assert everything == one + rest, options
+
+
+def test_encoded_size_counts_utf8_bytes():
+    assert encoded_size("abc") == 3
+    assert encoded_size("✓\U0001F600") == 7
@@ -0,0 +1,133 @@
+import os
+
+import pytest
+
+import src.tgxml.source_cache as source_cache
+from jsontoxml import load_json_file, required_message_fields
+from src.tgxml.source_cache import SourceCache, default_cache_dir, file_digest
+from tests.conftest import make_export
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SourceCache(str(tmp_path / "cache"), min_source_bytes=0)
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+
+    def counting_load(path, fields=None):
+        calls.append(fields)
+        return load_json_file(path, fields)
+
+    monkeypatch.setattr(source_cache, "load_json_file", counting_load)
+    return calls
+
+
+def _entries(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".pickle"))
+
+
+def test_unchanged_file_is_parsed_once(cache, parse_count, write_export):
+    path = write_export()
+    assert cache.load(path) == load_json_file(path)
+    assert cache.load(path) == load_json_file(path)
+    assert len(parse_count) == 1
+
+
+def test_size_change_invalidates(cache, parse_count, write_export):
+    path = write_export()
+    cache.load(path)
+    changed = make_export()
+    changed["messages"].append({"id": 50, "type": "message", "date": "2025-01-01T00:00:00", "text": "new"})
+    write_export(changed, name=os.path.basename(path))
+    assert cache.load(path)["messages"][-1]["id"] == 50
+    assert len(parse_count) == 2
+    assert len(_entries(cache)) == 1
+
+
+def test_mtime_change_with_same_size_invalidates(cache, parse_count, write_export):
+    path = write_export()
+    cache.load(path)
+    st = os.stat(path)
+    with open(path, "r+", encoding="utf-8") as f:
+        text = f.read().replace("Test chat", "Best chat")
+        f.seek(0)
+        f.write(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert os.path.getsize(path) == st.st_size
+    assert cache.load(path)["name"] == "Best chat"
+    assert len(parse_count) == 2
+
+
+def test_touched_file_with_same_content_reuses_entry(cache, parse_count, write_export):
+    path = write_export()
+    cache.load(path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert cache.load(path) == load_json_file(path)
+    assert len(parse_count) == 1
+
+
+def test_projected_loads_are_cached_separately(cache, parse_count, write_export):
+    path = write_export()
+    fields = required_message_fields(include_reactions=False)
+    assert cache.load(path, fields) == load_json_file(path, fields)
+    assert parse_count == [fields]
+    assert cache.load(path, fields) == load_json_file(path, fields)
+    assert cache.load(path) == load_json_file(path)
+    assert parse_count == [fields, None]
+    assert len(_entries(cache)) == 2
+    cache.invalidate(path)
+    assert _entries(cache) == []
+
+
+def test_corrupt_entry_is_reparsed(cache, parse_count, write_export):
+    path = write_export()
+    cache.load(path)
+    (entry,) = _entries(cache)
+    with open(os.path.join(cache.cache_dir, entry), "wb") as f:
+        f.write(b"not a pickle")
+    assert cache.load(path) == load_json_file(path)
+    assert len(parse_count) == 2
+
+
+def test_small_sources_bypass_the_cache(tmp_path, parse_count, write_export):
+    cache = SourceCache(str(tmp_path / "cache"))
+    cache.load(write_export())
+    assert not os.path.exists(cache.cache_dir)
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("TGXML_CACHE_DIR", str(tmp_path / "override"))
+    assert default_cache_dir() == str(tmp_path / "override")
+    monkeypatch.delenv("TGXML_CACHE_DIR")
+    monkeypatch.setattr(source_cache, "user_app_dir", lambda kind: str(tmp_path / kind / "tgxml"))
+    assert default_cache_dir() == str(tmp_path / "cache" / "tgxml")
+
+
+def test_concurrent_runs_keep_each_others_index_records(tmp_path, monkeypatch, write_export):
+    first, second = (SourceCache(str(tmp_path / "cache"), min_source_bytes=0) for _ in range(2))
+    first_path, second_path = write_export(), write_export(make_export(chat_id=7))
+    parsed, hashed = [], []
+
+    def racing_load(path, fields=None):
+        # While the second run parses its source, the first run records its own.
+        parsed.append(path)
+        if path == second_path:
+            first.load(first_path)
+        return load_json_file(path, fields)
+
+    def counting_digest(path):
+        hashed.append(path)
+        return file_digest(path)
+
+    monkeypatch.setattr(source_cache, "load_json_file", racing_load)
+    monkeypatch.setattr(source_cache, "file_digest", counting_digest)
+    second.load(second_path)
+    first.load(first_path)
+    second.load(second_path)
+    # Both files are recognised without re-hashing or re-parsing.
+    assert parsed == [second_path, first_path]
+    assert hashed == [second_path, first_path]